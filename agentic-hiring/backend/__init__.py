@@ -0,0 +1,5 @@
+"""
+HR Portal backend (FastAPI app in api.py, run from this directory).
+Also importable as a package: the standard-library-only modules (highlights,
+taxonomy, score_cache) are shared with the Streamlit dashboard.
+"""
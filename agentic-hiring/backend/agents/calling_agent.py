@@ -18,7 +18,10 @@ if backend_dir not in sys.path:
 
 # Import utils and llm from parent directory
 import llm
+import llm_metrics
 import utils
+import prompt_budget
+import prompt_templates
 
 
 class CallingAgent:
@@ -33,6 +36,7 @@ class CallingAgent:
         self.twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER")
         self.use_real_calls = bool(self.twilio_account_sid and self.twilio_auth_token)
         
+    @llm_metrics.for_job
     async def make_call(
         self,
         job_id: str,
@@ -75,44 +79,22 @@ class CallingAgent:
         call_type: str
     ) -> Dict[str, Any]:
         """Generate AI-powered call script based on JD and resume."""
-        prompt = f"""
-        Generate a structured call script for a {call_type} call with candidate {candidate_name}.
-        
-        Return JSON:
-        {{
-            "greeting": "opening line",
-            "questions": [
-                {{"question": "...", "purpose": "...", "expected_response": "..."}},
-                ...
-            ],
-            "closing": "closing statement",
-            "key_points_to_verify": ["...", "..."],
-            "red_flags_to_watch": ["...", "..."]
-        }}
-        
-        Job Description:
-        {jd_text[:2000]}
-        
-        Candidate Resume (excerpt):
-        {resume_text[:1500]}
-        
-        Focus on:
-        - Experience verification
-        - Location/remote availability
-        - Notice period
-        - Salary expectations
-        - Cultural fit questions
-        """
+        prompt, _ = prompt_templates.render("call_script", [
+            prompt_budget.Block("jd_text", jd_text, priority=1, min_tokens=250, max_tokens=550),
+            prompt_budget.Block("resume_text", resume_text, priority=2, min_tokens=200, max_tokens=400),
+        ], values={"call_type": call_type, "candidate_name": candidate_name})
         
         try:
             script = llm.call_llm_json(
                 prompt,
                 system="Generate a professional, conversational call script. JSON only.",
                 max_tokens=1200,
-                temperature=0.3
+                temperature=0.3,
+                site="call_script",
             )
             return script
         except Exception as e:
+            llm_metrics.record_fallback("call_script", e)
             # Fallback script
             return {
                 "greeting": f"Hi {candidate_name}, this is an AI recruiter calling about the position.",
@@ -202,41 +184,18 @@ class CallingAgent:
     ) -> Dict[str, Any]:
         """Simulate a call for development/testing."""
         # Generate realistic transcript using LLM
-        prompt = f"""
-        Simulate a realistic phone call transcript between an AI recruiter and candidate {candidate_name}.
-        The candidate might be a perfect match, or might have issues like:
-        - Location mismatch (e.g. Pune vs Gurgaon)
-        - Salary expectations higher than budget
-        - Shift preferences (e.g. only weeks, but job needs rotational)
-        - Tech skills that don't perfectly align with the script.
-        
-        Call Script:
-        {json.dumps(call_script, indent=2)}
-        
-        Return JSON:
-        {{
-            "transcript": "full conversation transcript",
-            "duration_seconds": number,
-            "key_findings": ["...", "..."],
-            "verification_results": {{
-                "experience_verified": boolean,
-                "location_match": boolean,
-                "notice_period": "string",
-                "salary_expectation": "string",
-                "shift_preference": "string"
-            }},
-            "overall_assessment": "short paragraph"
-        }}
-        
-        Make it realistic, professional, and slightly varying based on candidate quality.
-        """
+        prompt, _ = prompt_templates.render("call_simulation", [
+            prompt_budget.Block("call_script", json.dumps(call_script, indent=2)),
+        ], values={"candidate_name": candidate_name})
         
         try:
             result = llm.call_llm_json(
                 prompt,
                 system="Generate a realistic call simulation. JSON only.",
                 max_tokens=2000,
-                temperature=0.4
+                temperature=0.4,
+                # Each simulated call should play out differently
+                cache=False,
             )
             
             transcript = result.get("transcript", "")
@@ -273,6 +232,7 @@ class CallingAgent:
             }
             
         except Exception as e:
+            llm_metrics.record_fallback("call_simulation", e)
             # Fallback to basic simulation
             transcript = f"""
 --- AI RECRUITER CALL TRANSCRIPT ---
@@ -19,7 +19,10 @@ if backend_dir not in sys.path:
 
 # Import utils and llm from parent directory
 import llm
+import llm_metrics
 import utils
+import prompt_budget
+import prompt_templates
 
 
 class InterviewAssistAgent:
@@ -37,6 +40,7 @@ class InterviewAssistAgent:
         
         self.active_interviews = {}  # Track active interview sessions
     
+    @llm_metrics.for_job
     async def join_interview(
         self,
         job_id: str,
@@ -113,42 +117,24 @@ class InterviewAssistAgent:
         guide: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate pre-interview briefing for interviewer."""
-        prompt = f"""
-        Generate a concise interview briefing for the interviewer.
-        
-        Return JSON:
-        {{
-            "candidate_summary": "2-3 sentence summary",
-            "key_strengths": ["...", "..."],
-            "areas_to_probe": ["...", "..."],
-            "red_flags_to_watch": ["...", "..."],
-            "recommended_questions": ["...", "..."],
-            "evaluation_criteria": {{
-                "technical_skills": "what to assess",
-                "communication": "what to assess",
-                "cultural_fit": "what to assess"
-            }}
-        }}
-        
-        Job Description:
-        {jd_text[:2000]}
-        
-        Candidate Resume:
-        {resume_text[:1500]}
-        
-        Interview Guide:
-        {json.dumps(guide, indent=2)[:1000]}
-        """
+        prompt, _ = prompt_templates.render("interview_briefing", [
+            prompt_budget.Block("jd_text", jd_text, priority=1, min_tokens=250, max_tokens=550),
+            prompt_budget.Block("resume_text", resume_text, priority=2, min_tokens=200, max_tokens=400),
+            # One line per question, so a cut guide drops whole questions
+            prompt_budget.Block("guide", json.dumps(guide, indent=2), priority=3, max_tokens=300),
+        ])
         
         try:
             briefing = llm.call_llm_json(
                 prompt,
                 system="Generate a focused, actionable interview briefing. JSON only.",
                 max_tokens=1000,
-                temperature=0.2
+                temperature=0.2,
+                site="interview_briefing",
             )
             return briefing
         except Exception as e:
+            llm_metrics.record_fallback("interview_briefing", e)
             return {
                 "candidate_summary": f"Candidate {candidate_name} applying for the position.",
                 "key_strengths": ["Review resume for details"],
@@ -160,11 +146,13 @@ class InterviewAssistAgent:
         self,
         session_id: str,
         transcript_chunk: str,
-        speaker: str = "candidate"  # "candidate" or "interviewer"
+        speaker: str = "candidate",  # "candidate" or "interviewer"
+        on_partial=None
     ) -> Dict[str, Any]:
         """
         Process real-time transcript and provide feedback.
-        Called during the interview as conversation happens.
+        Called during the interview as conversation happens; on_partial, if given,
+        receives the insights as they stream in.
         """
         if session_id not in self.active_interviews:
             return {"error": "Session not found"}
@@ -188,7 +176,8 @@ class InterviewAssistAgent:
             session["job_id"],
             session["candidate_name"],
             transcript_chunk,
-            session
+            session,
+            on_partial=on_partial
         )
         
         session["real_time_notes"].append({
@@ -203,12 +192,14 @@ class InterviewAssistAgent:
             "red_flags_detected": insights.get("red_flags", [])
         }
     
+    @llm_metrics.for_job
     async def _generate_real_time_insights(
         self,
         job_id: str,
         candidate_name: str,
         latest_response: str,
-        session: Dict[str, Any]
+        session: Dict[str, Any],
+        on_partial=None
     ) -> Dict[str, Any]:
         """Generate real-time insights from candidate response."""
         jd_text = utils.load_job_artifact(job_id, "jd.txt") or ""
@@ -217,42 +208,31 @@ class InterviewAssistAgent:
         recent_q = session["questions_asked"][-2:] if session["questions_asked"] else []
         recent_a = session["candidate_responses"][-3:] if session["candidate_responses"] else []
         
-        prompt = f"""
-        Analyze the latest candidate response in real-time and provide insights.
-        
-        Return JSON:
-        {{
-            "response_quality": "excellent|good|fair|poor",
-            "key_points_mentioned": ["...", "..."],
-            "strengths_demonstrated": ["...", "..."],
-            "concerns": ["...", "..."],
-            "suggested_followup": "next question to ask",
-            "red_flags": ["..."],
-            "confidence_score": 0-10
-        }}
-        
-        Job Description:
-        {jd_text[:1500]}
-        
-        Recent Questions:
-        {json.dumps(recent_q, indent=2)}
-        
-        Latest Candidate Response:
-        {latest_response}
-        
-        Previous Responses:
-        {json.dumps(recent_a[:-1] if len(recent_a) > 1 else [], indent=2)}
-        """
-        
+        prompt, _ = prompt_templates.render("interview_insights", [
+            prompt_budget.Block("latest_response", latest_response, priority=1, min_tokens=200),
+            prompt_budget.Block("recent_q", json.dumps(recent_q, indent=2), priority=2, max_tokens=150),
+            prompt_budget.Block("jd_text", jd_text, priority=3, min_tokens=150, max_tokens=300),
+            prompt_budget.Block("previous", json.dumps(recent_a[:-1] if len(recent_a) > 1 else [], indent=2), priority=4),
+        ])
+        
+        request = dict(
+            system="Provide quick, actionable real-time insights. JSON only.",
+            max_tokens=600,
+            temperature=0.3,
+            site="interview_insights",
+        )
         try:
-            insights = llm.call_llm_json(
-                prompt,
-                system="Provide quick, actionable real-time insights. JSON only.",
-                max_tokens=600,
-                temperature=0.3
-            )
+            if on_partial is None:
+                return llm.call_llm_json(prompt, **request)
+            insights = None
+            async for kind, value in llm.astream_llm_json(prompt, **request):
+                if kind == "partial":
+                    on_partial(value)
+                else:
+                    insights = value
             return insights
         except Exception as e:
+            llm_metrics.record_fallback("interview_insights", e)
             return {
                 "response_quality": "good",
                 "key_points_mentioned": [],
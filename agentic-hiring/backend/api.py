@@ -1,10 +1,12 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 import sys
+import json
+import time
 import asyncio
 import pandas as pd
 from urllib.parse import quote
@@ -12,6 +14,11 @@ from urllib.parse import quote
 # Add current directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import utils
+import llm
+import llm_cache
+import llm_metrics
+import prompt_budget
+import prompt_templates
 
 # Import agents and integrations with graceful fallback
 get_calling_agent = None
@@ -51,6 +58,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- SERVER-SENT EVENTS ---
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _sse_events(fn, *args):
+    """
+    fn(*args, on_partial=...) as SSE: a "partial" event for each partial result it
+    reports, then "done" with its return value (or "error" with the failure detail).
+    Sync functions run in a worker thread; coroutine functions on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def push(event, data):
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    async def work():
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn(*args, on_partial=lambda v: push("partial", v))
+            else:
+                result = await asyncio.to_thread(fn, *args, on_partial=lambda v: push("partial", v))
+            push("done", result)
+        except HTTPException as e:
+            push("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            push("error", {"status_code": 500, "detail": str(e)})
+
+    # Not cancelled on disconnect: the work persists its results either way
+    task = asyncio.create_task(work())
+    while True:
+        event, data = await queue.get()
+        yield _sse(event, data)
+        if event != "partial":
+            break
+    await task
+
+def _sse_response(fn, *args) -> StreamingResponse:
+    return StreamingResponse(_sse_events(fn, *args), media_type="text/event-stream", headers=SSE_HEADERS)
+
 class JobCreate(BaseModel):
     title: str
     jd_text: Optional[str] = ""  # Job description text
@@ -103,6 +152,7 @@ def agents_status():
     """Check status of all agents and integrations"""
     import os
     llm_configured = bool(os.getenv("LITELLM_API_KEY") or os.getenv("GEMINI_API_KEY"))
+    cache = llm_cache.get_cache()
     
     return {
         "calling_agent": get_calling_agent is not None,
@@ -111,10 +161,40 @@ def agents_status():
         "google_meet_integration": get_google_meet_integration is not None,
         "llm_configured": llm_configured,
         "jd_improve_agent": True,  # JD improve is part of utils
+        "llm_cache": cache.stats() if cache is not None else {"enabled": False},
+        "llm_circuit": llm.breaker.status(),
+        "prompt_budget": prompt_budget.stats(),
+        "prompt_templates": prompt_templates.stats(),
         "message": "Agents status check",
         "note": "JD Improve agent requires LITELLM_API_KEY to function"
     }
 
+@app.get("/metrics/llm")
+def llm_metrics_summary(by: Optional[str] = "site", hours: float = 24, job_id: Optional[str] = None, site: Optional[str] = None):
+    """LLM call telemetry grouped by job, site, template or model (by=all for one total) over the last `hours` (0 = all)"""
+    store = llm_metrics.get_store()
+    if store is None:
+        return {"enabled": False}
+    since = time.time() - hours * 3600 if hours > 0 else None
+    try:
+        groups = store.aggregate(None if by == "all" else by, since=since, job_id=job_id, site=site)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"enabled": True, "by": by, "hours": hours, "groups": groups}
+
+@app.get("/jobs/{job_id}/metrics/llm")
+def job_llm_metrics(job_id: str, hours: float = 0):
+    """LLM calls made for this job: totals plus a breakdown per call site"""
+    store = llm_metrics.get_store()
+    if store is None:
+        return {"enabled": False}
+    since = time.time() - hours * 3600 if hours > 0 else None
+    return {
+        "enabled": True,
+        "total": store.aggregate(None, since=since, job_id=job_id).get("all"),
+        "sites": store.aggregate("site", since=since, job_id=job_id),
+    }
+
 @app.get("/jobs")
 def get_jobs(include_archived: bool = False):
     """List all jobs with metadata"""
@@ -181,6 +261,17 @@ def get_candidates(job_id: str):
         "phone": ""
     })
     
+    # Percentile rank + "top 10%" badge from the job's score sketch
+    sketch = utils.get_score_sketch(job_id)
+    if 'score' in df.columns:
+        df['score_percentile'] = sketch.percentile_ranks(df['score'])
+        threshold = sketch.top_threshold()
+        df['top_percent'] = (df['score'] >= threshold) if threshold is not None else False
+    
+    # Shadow scorer columns are for evaluation only, not for recruiters
+    shadow_cols = [utils.scorers.get_scorer(sid).column for sid in utils.get_scoring_config(job_id)["shadow"]]
+    df = df.drop(columns=[c for c in shadow_cols if c in df.columns and c != "score"])
+    
     # Replace NaN with None for JSON serializability
     df = df.astype(object).where(pd.notnull(df), None)
     
@@ -211,6 +302,18 @@ def get_candidate_contact(job_id: str, candidate_name: str):
     email, phone = utils._get_contact(job_id, candidate_name)
     return {"email": email or "", "phone": phone or ""}
 
+@app.get("/jobs/{job_id}/candidates/{candidate_name}/highlights")
+def get_candidate_highlights(job_id: str, candidate_name: str, context: int = 80, limit: int = 5, full: bool = False):
+    """Matched keywords/skills and pre-highlighted resume snippets, from offsets stored at scoring time"""
+    try:
+        result = utils.resume_highlights(job_id, candidate_name, context=max(0, min(context, 500)),
+                                         limit=max(1, min(limit, 50)), full=full)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load highlights: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return result
+
 @app.get("/jobs/{job_id}/candidates/{candidate_name}/transcript")
 def get_candidate_transcript(job_id: str, candidate_name: str):
     """Fetch the latest call transcript for a candidate"""
@@ -228,12 +331,15 @@ def get_metrics(job_id: str):
     screened = len(df[df['score'] > 0])
     interviewing = len(df[df['status'].str.contains('Interview', na=False)])
     offers = len(df[df['status'].str.contains('Offer', na=False)])
+    sketch = utils.get_score_sketch(job_id)
     
     return {
         "total": total,
         "screened": screened,
         "interviewing": interviewing,
-        "offers": offers
+        "offers": offers,
+        "median_score": sketch.quantile(0.5),
+        "top_percent_threshold": sketch.top_threshold()
     }
 
 @app.post("/candidates/action")
@@ -253,6 +359,20 @@ def candidate_action(payload: CandidateAction):
     utils.update_candidate_status(payload.job_id, payload.candidate_name, new_status)
     return {"status": "success", "new_candidate_status": new_status}
 
+class BulkCandidateAction(BaseModel):
+    job_id: str
+    candidate_names: List[str]
+    action: str  # "shortlist", "reject", "interview", "restore"
+
+@app.post("/candidates/bulk_action")
+def bulk_candidate_action(payload: BulkCandidateAction):
+    """Apply one action to many candidates with a single CSV write"""
+    new_status = utils.rules.ACTIONS.get("shortlist" if payload.action == "restore" else payload.action)
+    if not new_status:
+        raise HTTPException(status_code=400, detail="Invalid action")
+    changed = utils.bulk_update_candidate_status(payload.job_id, {n: new_status for n in payload.candidate_names})
+    return {"status": "success", "new_candidate_status": new_status, "changed": changed}
+
 @app.post("/screen")
 def screen_candidate(payload: CandidateAction):
     """Trigger AI Screening Call (Legacy - use /call for new calling agent)"""
@@ -284,15 +404,20 @@ class SlotSuggestRequest(BaseModel):
     job_id: str
     candidate_name: str
 
-@app.post("/interview/guide")
-def get_interview_guide(payload: InterviewGuideRequest):
-    """Generate interview guide/questions"""
+def _interview_guide(payload: InterviewGuideRequest, on_partial=None):
     try:
-        guide = utils.generate_interview_guide(payload.job_id, payload.candidate_name, payload.round_type)
+        guide = utils.generate_interview_guide(payload.job_id, payload.candidate_name, payload.round_type, on_partial=on_partial)
         return {"guide": guide, "status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Guide generation failed: {str(e)}")
 
+@app.post("/interview/guide")
+def get_interview_guide(payload: InterviewGuideRequest, stream: bool = False):
+    """Generate interview guide/questions (stream=true: SSE with the guide's sections as they are parsed)"""
+    if stream:
+        return _sse_response(_interview_guide, payload)
+    return _interview_guide(payload)
+
 @app.post("/interview/evaluate")
 def evaluate_interview_round(payload: InterviewEvalRequest):
     """Evaluate an interview round transcript"""
@@ -320,65 +445,19 @@ def suggest_schedule_slots(payload: SlotSuggestRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Slot suggestion failed: {str(e)}")
 
-@app.post("/screen/assess")
-def assess_candidate(payload: AssessRequest):
-    """AI Assessment of candidate based on transcript"""
+def _assess_candidate(payload: AssessRequest, on_partial=None):
     try:
-        result = utils.screening_assess(payload.job_id, payload.candidate_name, payload.transcript)
+        result = utils.screening_assess(payload.job_id, payload.candidate_name, payload.transcript, on_partial=on_partial)
         return {"assessment": result, "status": "success"}
     except Exception as e:
         error_msg = str(e)
         # If LLM fails, provide heuristic fallback
         if "api_key" in error_msg.lower() or "authentication" in error_msg.lower() or "llm" in error_msg.lower():
-            # Heuristic assessment fallback
-            jd_text = utils.load_job_artifact(payload.job_id, "jd.txt") or ""
-            cand = utils._get_candidate_row(payload.job_id, payload.candidate_name)
-            score = cand.get("score", 0) if cand else 0
-            
-            # Simple heuristic assessment
-            transcript_lower = payload.transcript.lower()
-            
-            # Check for specific mismatches
-            loc_mismatch = "pune" in transcript_lower and "gurgaon" not in transcript_lower
-            salary_concern = "expectation" in transcript_lower or "budget" in transcript_lower
-            shift_match = "shift" in transcript_lower or "night" in transcript_lower
-            
-            positive_indicators = ["yes", "available", "interested", "experience", "skills", "ready"]
-            negative_indicators = ["no", "not available", "cannot", "unable"]
-            
-            positive_count = sum(1 for word in positive_indicators if word in transcript_lower)
-            negative_count = sum(1 for word in negative_indicators if word in transcript_lower)
-            
-            # Weighted calculation
-            h_score = 5.0 # baseline
-            if not loc_mismatch: h_score += 2.0
-            if positive_count > negative_count: h_score += 2.0
-            if shift_match: h_score += 1.0
-            
-            h_score = max(min(h_score, 10.0), 0.0)
-            
-            if h_score >= 7:
-                recommendation = "yes"
-            elif h_score >= 5:
-                recommendation = "maybe"
-            else:
-                recommendation = "no"
-            
-            result_obj = {
-                    "assessment": f"LLM unavailable. Heuristic analysis suggests {recommendation} ({h_score}/10). Transcript mentions {positive_count} positive and {negative_count} negative keywords.",
-                    "hire_recommendation": recommendation,
-                    "score": h_score,
-                    "criteria_breakdown": {
-                        "location": "Mismatch detected" if loc_mismatch else "Confirmed/Neutral",
-                        "salary": "Discussed" if salary_concern else "Not explicitly mentioned",
-                        "shift": "Mentioned" if shift_match else "Not explicitly mentioned",
-                        "tech": f"{positive_count} matches found"
-                    },
-                    "risks": ["LLM unavailable - using heuristic assessment"] + (["Location mismatch hinted"] if loc_mismatch else []),
-                    "next_questions": ["Verify experience details", "Confirm relocation availability"]
-                }
-            
-            utils.update_candidate_status(payload.job_id, payload.candidate_name, "AI Screened", screening_score=h_score)
+            # Heuristic assessment fallback: deterministic transcript facts (city, salary, notice, shift, skills)
+            result_obj = utils.heuristic_screening_assess(
+                payload.job_id, payload.candidate_name, payload.transcript, note="LLM unavailable."
+            )
+            result_obj["risks"].append("LLM unavailable - using heuristic assessment")
 
             return {
                 "assessment": result_obj,
@@ -387,6 +466,13 @@ def assess_candidate(payload: AssessRequest):
             }
         raise HTTPException(status_code=500, detail=f"Assessment failed: {str(e)}")
 
+@app.post("/screen/assess")
+def assess_candidate(payload: AssessRequest, stream: bool = False):
+    """AI Assessment of candidate based on transcript (stream=true: SSE with the model's fields as they are parsed)"""
+    if stream:
+        return _sse_response(_assess_candidate, payload)
+    return _assess_candidate(payload)
+
 @app.post("/call")
 async def make_call(payload: CallRequest):
     """Make AI-powered call to candidate using Calling Agent"""
@@ -424,23 +510,28 @@ async def join_interview(payload: InterviewJoinRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to join interview: {str(e)}")
 
-@app.post("/interview/transcript")
-async def process_transcript(payload: TranscriptRequest):
-    """Process real-time interview transcript"""
-    if get_interview_assist is None:
-        raise HTTPException(status_code=503, detail="Interview assist agent not available. Check /agents/status")
-    
+async def _process_transcript(payload: TranscriptRequest, on_partial=None):
     try:
         agent = get_interview_assist()
         result = await agent.process_interview_transcript(
             payload.session_id,
             payload.transcript_chunk,
-            payload.speaker
+            payload.speaker,
+            on_partial=on_partial,
         )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process transcript: {str(e)}")
 
+@app.post("/interview/transcript")
+async def process_transcript(payload: TranscriptRequest, stream: bool = False):
+    """Process real-time interview transcript (stream=true: SSE with insights as they are parsed)"""
+    if get_interview_assist is None:
+        raise HTTPException(status_code=503, detail="Interview assist agent not available. Check /agents/status")
+    if stream:
+        return _sse_response(_process_transcript, payload)
+    return await _process_transcript(payload)
+
 @app.post("/interview/end")
 async def end_interview(session_id: str, full_transcript: Optional[str] = None):
     """End interview session and get evaluation"""
@@ -628,11 +719,9 @@ def get_jd(job_id: str):
 class ImproveJDRequest(BaseModel):
     job_id: str
 
-@app.post("/jd/improve")
-def improve_jd_endpoint(payload: ImproveJDRequest):
-    """AI Improve JD endpoint"""
+def _improve_jd(payload: ImproveJDRequest, on_partial=None):
     try:
-        result = utils.improve_jd(payload.job_id)
+        result = utils.improve_jd(payload.job_id, on_partial=on_partial)
         
         # Check if improvement was successful (even if using heuristic fallback)
         improved_jd = result.get("improved_jd", "")
@@ -689,6 +778,13 @@ def improve_jd_endpoint(payload: ImproveJDRequest):
             }
         raise HTTPException(status_code=500, detail=f"Failed to improve JD: {str(e)}")
 
+@app.post("/jd/improve")
+def improve_jd_endpoint(payload: ImproveJDRequest, stream: bool = False):
+    """AI Improve JD endpoint (stream=true: SSE with the improved draft as it is written)"""
+    if stream:
+        return _sse_response(_improve_jd, payload)
+    return _improve_jd(payload)
+
 class SaveJDRequest(BaseModel):
     jd_text: str
 
@@ -699,6 +795,7 @@ def save_jd(job_id: str, jd_data: SaveJDRequest):
     try:
         jd_text = jd_data.jd_text or ""
         utils.save_job_artifact(job_id, "jd.txt", jd_text)
+        utils.refresh_jd_analysis(job_id)
         utils._append_log(job_id, "JD_UPDATED", "Job description updated")
         return {"status": "success", "message": "JD saved", "jd_text": jd_text}
     except Exception as e:
@@ -716,8 +813,8 @@ def rescore_candidates(job_id: str):
                 "message": "No candidates found. Please upload resumes first."
             }
         
-        # Run scoring
-        utils.trigger_simulation_step(job_id, "score_cvs")
+        # Run scoring (unchanged resume/JD pairs are served from the score cache)
+        cache_stats = utils.trigger_simulation_step(job_id, "score_cvs") or {}
         
         # Verify scores were updated
         df = pd.read_csv(csv_path)
@@ -726,14 +823,31 @@ def rescore_candidates(job_id: str):
         return {
             "status": "success",
             "message": f"Candidates rescored using JD keywords. {scored_count} candidates scored.",
-            "candidates_scored": scored_count
+            "candidates_scored": scored_count,
+            "cache_hits": cache_stats.get("cache_hits", 0),
+            "cache_misses": cache_stats.get("cache_misses", 0),
+            "incremental": cache_stats.get("incremental", False)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to rescore: {str(e)}")
 
+class LLMRescoreRequest(BaseModel):
+    gated: Optional[bool] = False
+    top_n: Optional[int] = None
+    top_percent: Optional[float] = None
+    explore: Optional[float] = None  # fraction of gated-out candidates still sent to the LLM
+    batch_size: Optional[int] = None  # resumes per LLM call (default LLM_SCORE_BATCH_SIZE)
+
 @app.post("/jobs/{job_id}/rescore_llm")
-def rescore_candidates_llm(job_id: str):
-    """Rescore candidates using LLM or heuristic fallback"""
+def rescore_candidates_llm(job_id: str, payload: Optional[LLMRescoreRequest] = None):
+    """Rescore candidates using LLM or heuristic fallback; gated=true sends only the top candidates to the LLM"""
+    gate = payload or LLMRescoreRequest()
+    if gate.top_percent is not None and not 0 <= gate.top_percent <= 100:
+        raise HTTPException(status_code=400, detail="top_percent must be between 0 and 100")
+    if gate.explore is not None and not 0 <= gate.explore <= 1:
+        raise HTTPException(status_code=400, detail="explore must be a fraction between 0 and 1")
+    if gate.batch_size is not None and not 1 <= gate.batch_size <= 50:
+        raise HTTPException(status_code=400, detail="batch_size must be between 1 and 50")
     try:
         # Check if candidates exist
         csv_path = os.path.join("jobs", job_id, "cv_scores.csv")
@@ -753,7 +867,10 @@ def rescore_candidates_llm(job_id: str):
                 "message": "No job description found. Please add a JD first."
             }
         
-        result = utils.llm_score_candidates(job_id)
+        result = utils.llm_score_candidates(
+            job_id, gated=bool(gate.gated), top_n=gate.top_n, top_percent=gate.top_percent, explore=gate.explore,
+            batch_size=gate.batch_size,
+        )
         
         # Always return success if candidates were updated (even if using heuristic)
         if result.get("updated", 0) > 0:
@@ -790,3 +907,163 @@ def rescore_candidates_llm(job_id: str):
                 "message": "LLM API key not configured. Using heuristic scoring instead."
             }
         raise HTTPException(status_code=500, detail=f"Failed to rescore: {str(e)}")
+
+class ScoringConfigRequest(BaseModel):
+    primary: Optional[str] = None
+    scorers: Optional[List[str]] = []
+    shadow: Optional[List[str]] = []
+
+@app.get("/scorers")
+def list_scorers():
+    """Registered scorers with id, version and cost class"""
+    return {"scorers": utils.scorers.list_scorers()}
+
+@app.get("/scorers/distilled")
+def get_distilled_scorer():
+    """Distilled scorer version, training size and calibration report against LLM scores"""
+    return utils.distilled_scorer_report()
+
+@app.post("/scorers/distilled/train")
+def train_distilled_scorer():
+    """Harvest cached LLM scores from every job and retrain the distilled scorer"""
+    try:
+        return {**utils.train_distilled_scorer(), "status": "success"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to train distilled scorer: {str(e)}")
+
+@app.get("/jobs/{job_id}/scoring")
+def get_scoring(job_id: str):
+    """Scoring config (primary / active / shadow scorers) and the last multi-scorer report"""
+    return {
+        "config": utils.get_scoring_config(job_id),
+        "report": utils.load_job_artifact(job_id, "scoring_report.json"),
+    }
+
+@app.put("/jobs/{job_id}/scoring")
+def set_scoring(job_id: str, payload: ScoringConfigRequest):
+    """Choose which scorers run for this job, which is primary and which run in shadow"""
+    try:
+        config = utils.set_scoring_config(job_id, {"primary": payload.primary, "scorers": payload.scorers, "shadow": payload.shadow})
+        return {"status": "success", "config": config}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save scoring config: {str(e)}")
+
+@app.post("/jobs/{job_id}/rescore_scorers")
+def rescore_with_scorers(job_id: str):
+    """Run every configured scorer (primary + shadows) concurrently"""
+    try:
+        csv_path = os.path.join("jobs", job_id, "cv_scores.csv")
+        if not os.path.exists(csv_path):
+            return {"status": "error", "message": "No candidates found. Please upload resumes first."}
+        result = utils.run_job_scorers(job_id)
+        return {**result, "status": "success"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to run scorers: {str(e)}")
+
+@app.get("/jobs/{job_id}/semantic_matches")
+def get_semantic_matches(job_id: str, k: int = 10):
+    """Top-k candidates by offline semantic similarity to the JD (approximate nearest neighbour)"""
+    try:
+        matches = utils.semantic_top_matches(job_id, k=max(1, min(k, 500)))
+        return {"matches": matches, "count": len(matches)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Semantic matching failed: {str(e)}")
+
+@app.post("/matching/run")
+def run_match_matrix(top: Optional[int] = None, min_score: Optional[float] = None):
+    """Score every open job's resumes against every open JD and store each candidate's best alternative requisitions"""
+    try:
+        return {**utils.build_match_matrix(top=top, min_score=min_score), "status": "success"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Match matrix failed: {str(e)}")
+
+@app.get("/jobs/{job_id}/alternative_matches")
+def get_alternative_matches(job_id: str, candidate_name: Optional[str] = None):
+    """Other open requisitions this job's candidates fit, from the last match-matrix run"""
+    try:
+        return utils.get_alternative_matches(job_id, candidate_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load alternative matches: {str(e)}")
+
+class RulesRequest(BaseModel):
+    rules: Optional[List[dict]] = []
+    apply_to: Optional[List[str]] = None
+    auto_apply: Optional[bool] = True
+
+@app.get("/jobs/{job_id}/rules")
+def get_rules(job_id: str):
+    """Knockout / auto-shortlist rules for this job"""
+    return utils.get_candidate_rules(job_id)
+
+@app.put("/jobs/{job_id}/rules")
+def set_rules(job_id: str, payload: RulesRequest):
+    """Save this job's rules; they run automatically after ingest and rescoring when auto_apply is on"""
+    try:
+        config = utils.set_candidate_rules(job_id, {"rules": payload.rules, "apply_to": payload.apply_to, "auto_apply": payload.auto_apply})
+        return {"status": "success", "config": config}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save rules: {str(e)}")
+
+@app.post("/jobs/{job_id}/rules/apply")
+def apply_rules(job_id: str, dry_run: bool = True, payload: Optional[RulesRequest] = None):
+    """Evaluate rules over all candidates; dry_run (default) only reports counts. A body previews draft rules."""
+    try:
+        draft = None
+        if payload is not None:
+            draft = {"rules": payload.rules, "apply_to": payload.apply_to, "auto_apply": payload.auto_apply}
+        return {**utils.apply_candidate_rules(job_id, dry_run=dry_run, config=draft), "status": "success"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to apply rules: {str(e)}")
+
+@app.get("/jobs/{job_id}/score_distribution")
+def get_score_distribution(job_id: str, bucket: float = 1.0, score: Optional[float] = None):
+    """Score histogram, quantiles and (optionally) the percentile rank of `score`; constant time in job size"""
+    if not 0.1 <= bucket <= 10:
+        raise HTTPException(status_code=400, detail="bucket must be between 0.1 and 10")
+    try:
+        return utils.score_distribution(job_id, bucket=bucket, score=score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load score distribution: {str(e)}")
+
+@app.get("/jobs/{job_id}/facets")
+def get_facets(job_id: str, all: Optional[str] = None, any: Optional[str] = None, none: Optional[str] = None,
+               limit: int = 50, candidates: int = 0):
+    """Skill facet counts; all/any/none take comma-separated skills (AND / OR / NOT filters)"""
+    def split(value):
+        return [v.strip() for v in (value or "").split(",") if v.strip()]
+    try:
+        return utils.skill_facets(job_id, split(all), split(any), split(none),
+                                  limit=max(1, min(limit, 1000)), include_candidates=max(0, min(candidates, 1000)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute facets: {str(e)}")
+
+@app.get("/jobs/{job_id}/shortlist")
+def get_shortlist(job_id: str, k: int = 10, by: str = "score", status: Optional[str] = None,
+                  exclude: Optional[str] = None, stream: bool = False):
+    """Top-k candidates by a score column without sorting the whole job; status/exclude are comma-separated"""
+    statuses = [s.strip() for s in (status or "").split(",") if s.strip()]
+    excluded = [s.strip() for s in (exclude or "").split(",") if s.strip()]
+    k = max(1, min(k, 10000))
+    try:
+        rows = utils.top_candidates(job_id, k=k, column=by, statuses=statuses, exclude=excluded)
+        if stream:
+            # NDJSON: one candidate per line, best first
+            return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+        candidates = list(rows)
+        return {"by": by, "k": k, "count": len(candidates), "candidates": candidates}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build shortlist: {str(e)}")
@@ -0,0 +1,275 @@
+"""
+Synthetic Corpus Generator - deterministic resumes and JDs for benchmarks
+Every document is a pure function of (seed, index), so runs on different
+machines score byte-identical inputs. Resumes can be written as plain text,
+PDF (hand-built, no extra dependency) or DOCX (minimal OOXML zip).
+"""
+import os
+import json
+import random
+import zipfile
+from typing import Dict, List, Optional
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skill_taxonomy.json")
+FORMATS = ("txt", "pdf", "docx")
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Sneha", "Vikram", "Ananya", "Karan", "Meera", "Arjun", "Divya",
+               "John", "Maria", "Wei", "Fatima", "Lucas", "Aisha", "Daniel", "Yuki", "Omar", "Elena"]
+LAST_NAMES = ["Sharma", "Verma", "Iyer", "Patel", "Reddy", "Gupta", "Nair", "Singh", "Das", "Menon",
+              "Smith", "Garcia", "Chen", "Khan", "Silva", "Okafor", "Mueller", "Tanaka", "Haddad", "Rossi"]
+CITIES = ["Gurgaon", "Bangalore", "Pune", "Hyderabad", "Chennai", "Noida", "Mumbai", "Kolkata", "Remote"]
+TITLES = ["QA Engineer", "SDET", "Test Automation Engineer", "Backend Engineer", "Data Engineer",
+          "DevOps Engineer", "Full Stack Developer", "Performance Test Engineer", "Mobile QA Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Systems", "Hooli", "Stark Industries", "Wayne Tech",
+             "Cyberdyne", "Soylent Labs", "Tyrell Digital"]
+VERBS = ["Built", "Designed", "Maintained", "Led", "Automated", "Migrated", "Optimized", "Owned", "Introduced", "Scaled"]
+OBJECTS = ["regression suites", "CI pipelines", "API test frameworks", "release dashboards", "microservices",
+           "data pipelines", "load test harnesses", "mobile test labs", "flaky test triage", "contract tests"]
+OUTCOMES = ["cutting release time by {n}%", "reducing escaped defects by {n}%", "covering {n} services",
+            "for a team of {n} engineers", "saving {n} hours per sprint", "across {n} product lines"]
+FILLER = ["Collaborated closely with product and design.", "Mentored junior engineers on best practices.",
+          "Participated in on-call rotation and incident reviews.", "Wrote technical documentation and runbooks.",
+          "Presented quarterly quality metrics to leadership.", "Drove adoption of shift-left testing."]
+
+
+def _skill_names() -> List[str]:
+    with open(TAXONOMY_PATH, "r") as f:
+        data = json.load(f)
+    return [s["name"] for s in data.get("skills", [])]
+
+
+_SKILLS: Optional[List[str]] = None
+
+
+def skills() -> List[str]:
+    global _SKILLS
+    if _SKILLS is None:
+        _SKILLS = _skill_names()
+    return _SKILLS
+
+
+def candidate_name(index: int) -> str:
+    """Unique, prefix-free file-safe name (fixed width, so 'cand_1' never prefixes 'cand_10')."""
+    return f"cand_{index:07d}"
+
+
+def generate_resume(index: int, seed: int = 0) -> str:
+    rng = random.Random(f"resume:{seed}:{index}")
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    years = rng.randint(0, 15)
+    skill_pool = skills()
+    core = rng.sample(skill_pool, rng.randint(5, 14))
+    lines = [
+        f"{first} {last}",
+        f"{rng.choice(TITLES)} | {rng.choice(CITIES)}",
+        f"{first.lower()}.{last.lower()}{index}@example.com | +91 9{rng.randint(100000000, 999999999)}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} with {years} years of experience in {', '.join(core[:3])}.",
+        "",
+        "Skills",
+        ", ".join(core),
+        "",
+        "Experience",
+    ]
+    for _ in range(rng.randint(2, 5)):
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({rng.randint(2008, 2025)})")
+        for _ in range(rng.randint(2, 5)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 60))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(core)}, {outcome}.")
+        lines.append(rng.choice(FILLER))
+    lines += ["", "Education", f"B.Tech, {rng.choice(['Computer Science', 'Electronics', 'IT', 'Mechanical'])}"]
+    return "\n".join(lines)
+
+
+def generate_jd(seed: int = 0, structured: bool = False) -> str:
+    """A JD in either free-text form or the 'Key Requirements:' form written by improve_jd."""
+    rng = random.Random(f"jd:{seed}")
+    title = rng.choice(TITLES)
+    must = rng.sample(skills(), 8)
+    years = rng.randint(2, 8)
+    city = rng.choice(CITIES[:-1])
+    if structured:
+        bullets = "\n".join(f"• Proficiency in {s}" for s in must)
+        return (
+            f"{title}\n\nWe are seeking an experienced {title.lower()} with {years} years of experience. "
+            f"The ideal candidate should have strong expertise in {', '.join(must[:5])}.\n\n"
+            f"Key Requirements:\n• {years} years of relevant experience\n{bullets}"
+        )
+    return (
+        f"{title} ({years}+ years)\nLocation: {city}. Hybrid, general shift.\n"
+        f"We are looking for a {title.lower()} to join our platform team. You will own quality for "
+        f"customer-facing services and work with {', '.join(must[:4])}.\n"
+        f"Must have: {', '.join(must)}.\nNice to have: {', '.join(rng.sample(skills(), 4))}.\n"
+        f"Requires {years} years of hands-on experience and strong communication skills."
+    )
+
+
+# --- TAXONOMY ---
+
+# Word lists for synthetic skills: product-style names ("Nimbus Gateway") and
+# practice phrases ("event stream contract testing"), as in a full skills graph.
+TAXONOMY_BRANDS = ["Nimbus", "Atlas", "Helix", "Quasar", "Vertex", "Orion", "Cobalt", "Zephyr", "Aurora", "Falcon",
+                   "Granite", "Lumen", "Nova", "Pulsar", "Sierra", "Tundra", "Vega", "Willow", "Apex", "Beacon",
+                   "Cinder", "Delta", "Ember", "Fjord", "Glacier", "Harbor", "Iris", "Juniper", "Krypton", "Lattice",
+                   "Mosaic", "Nebula", "Onyx", "Prism", "Quartz", "Raven", "Saffron", "Titan", "Umbra", "Vortex"]
+TAXONOMY_PRODUCTS = ["Gateway", "Queue", "Mesh", "Vault", "Studio", "Engine", "Runner", "Lens", "Forge", "Pipeline",
+                     "Monitor", "Catalog", "Ledger", "Scheduler", "Proxy", "Cache", "Registry", "Notebook",
+                     "Warehouse", "Console", "Tracer", "Compiler", "Broker", "Designer", "Analyzer"]
+TAXONOMY_DOMAINS = ["event stream", "payment", "search index", "mobile release", "feature flag", "data lake",
+                    "identity", "edge network", "container", "message bus", "recommendation", "billing",
+                    "telemetry", "checkout", "workflow", "geospatial", "media transcoding", "fraud detection"]
+TAXONOMY_PRACTICES = ["contract testing", "chaos engineering", "capacity planning", "schema migration",
+                      "load modelling", "canary analysis", "observability", "threat modelling", "test data management",
+                      "performance tuning", "release automation", "incident response", "cost optimization",
+                      "accessibility auditing", "synthetic monitoring", "disaster recovery"]
+
+
+def _acronym(phrase: str) -> str:
+    return "".join(w[0] for w in phrase.split())
+
+
+def generate_taxonomy(n_skills: int, seed: int = 0) -> Dict:
+    """
+    n_skills synthetic skills (same format as data/skill_taxonomy.json, meant to be
+    merged on top of it) with 2-4 aliases each: spelling variants, acronyms and
+    multi-word phrases.
+    """
+    rng = random.Random(f"taxonomy:{seed}")
+    products = [f"{b} {p}" for b in TAXONOMY_BRANDS for p in TAXONOMY_PRODUCTS]
+    practices = [f"{d} {p}" for d in TAXONOMY_DOMAINS for p in TAXONOMY_PRACTICES]
+    rng.shuffle(products)
+    rng.shuffle(practices)
+    names = []
+    # Two products per practice; versioned products make up the rest at large sizes
+    while len(names) < n_skills and (products or practices):
+        if practices and (len(names) % 3 == 2 or not products):
+            names.append((practices.pop(), "practice"))
+        else:
+            names.append((products.pop(), "tools"))
+    version = 1
+    while len(names) < n_skills:
+        names.extend((f"{b} {p} {version}", "tools") for b in TAXONOMY_BRANDS for p in TAXONOMY_PRODUCTS)
+        version += 1
+    skills = []
+    for name, category in names[:n_skills]:
+        low = name.lower()
+        aliases = [low.replace(" ", "-"), low.replace(" ", "")]
+        if len(low.split()) >= 3:
+            aliases.append(_acronym(low))
+        if category == "tools" and rng.random() < 0.5:
+            aliases.append(f"{low} {rng.choice(['platform', 'framework', 'tooling'])}")
+        skills.append({"name": name, "aliases": aliases, "category": category})
+    return {"version": f"synthetic-{n_skills}-{seed}", "skills": skills}
+
+
+def write_taxonomy(path: str, n_skills: int, seed: int = 0) -> Dict:
+    """Write generate_taxonomy(...) to path (for SKILL_TAXONOMY_PATH); returns it."""
+    data = generate_taxonomy(n_skills, seed)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return data
+
+
+# --- FILE WRITERS ---
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", errors="replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = 50):
+    """Minimal text-only PDF (Helvetica, one Tj per line) that pypdf can extract."""
+    lines = text.split("\n") or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects: List[bytes] = []
+    # 1: catalog, 2: pages, 3: font, then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, page_lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({_pdf_escape(l)}) Tj T*\n" for l in page_lines) + "ET"
+        data = stream.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(data)).encode() + b" >>\nstream\n" + data + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+
+
+def _xml_escape(s: str) -> str:
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def write_docx(path: str, text: str):
+    """Minimal DOCX: one paragraph per line."""
+    paras = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{_xml_escape(l)}</w:t></w:r></w:p>" for l in text.split("\n"))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paras}</w:body></w:document>"
+    )
+    # Fixed timestamps keep the bytes (and so the content hashes) deterministic
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in (("[Content_Types].xml", _DOCX_CONTENT_TYPES), ("_rels/.rels", _DOCX_RELS),
+                           ("word/document.xml", document)):
+            info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            z.writestr(info, data)
+
+
+def write_resume(directory: str, index: int, seed: int = 0, fmt: str = "txt") -> str:
+    """Write resume `index` in the given format; returns the file path."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    text = generate_resume(index, seed)
+    path = os.path.join(directory, f"{candidate_name(index)}.{fmt}")
+    if fmt == "pdf":
+        write_pdf(path, text)
+    elif fmt == "docx":
+        write_docx(path, text)
+    else:
+        with open(path, "w") as f:
+            f.write(text)
+    return path
+
+
+def write_corpus(directory: str, count: int, seed: int = 0, formats=("txt",)) -> List[Dict[str, str]]:
+    """Write `count` resumes, cycling through `formats`. Returns [{name, path, format}]."""
+    os.makedirs(directory, exist_ok=True)
+    out = []
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        out.append({"name": candidate_name(i), "path": write_resume(directory, i, seed, fmt), "format": fmt})
+    return out
@@ -0,0 +1,402 @@
+"""
+LLM Stub Server - local OpenAI-compatible stand-in for the LiteLLM endpoint
+Answers /v1/chat/completions with deterministic, schema-valid content for each
+prompt template (the same prompt always gets the same answer), with a
+configurable latency distribution, token-rate streaming, 429/500 injection and
+malformed-JSON injection, so every LLM path can be load-tested without network.
+
+Usage (from the backend directory):
+    python -m benchmarks.llm_stub --port 8900 --profile realistic
+    LITELLM_BASE_URL=http://127.0.0.1:8900/v1 LITELLM_API_KEY=stub uvicorn api:app
+GET /stub/stats reports traffic and injected failures; POST /stub/profile changes
+the profile at runtime (JSON with any Profile field); POST /stub/reset clears stats.
+"""
+import os
+import re
+import sys
+import copy
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import taxonomy
+import prompt_templates
+
+CHARS_PER_TOKEN = 4  # token estimate for usage and timing; no tokenizer needed
+PREFIX_CACHE_ENTRIES = 1024
+
+
+# --- PROFILES ---
+
+class Profile:
+    """
+    latency: "fixed:MS", "uniform:LO_MS,HI_MS" or "lognormal:MEDIAN_MS,SIGMA" per request,
+    plus prompt_token_ms per uncached prompt token and completion tokens at tokens_per_s.
+    error_429 / error_500 / malformed are per-request probabilities.
+    """
+
+    FIELDS = ("latency", "prompt_token_ms", "tokens_per_s", "error_429", "error_500", "malformed", "seed")
+
+    def __init__(self, latency: str = "fixed:5", prompt_token_ms: float = 0.0, tokens_per_s: float = 0.0,
+                 error_429: float = 0.0, error_500: float = 0.0, malformed: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.prompt_token_ms = float(prompt_token_ms)
+        self.tokens_per_s = float(tokens_per_s)  # 0 = completion tokens are free
+        self.error_429 = float(error_429)
+        self.error_500 = float(error_500)
+        self.malformed = float(malformed)
+        self.seed = int(seed)
+        self._dist, self._params = self._parse_latency(latency)
+
+    @staticmethod
+    def _parse_latency(spec: str) -> Tuple[str, List[float]]:
+        kind, _, args = str(spec).partition(":")
+        params = [float(a) for a in args.split(",") if a.strip()]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec {spec!r}; use fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+        return kind, params
+
+    def sample_latency_s(self, rng: random.Random) -> float:
+        if self._dist == "fixed":
+            ms = self._params[0]
+        elif self._dist == "uniform":
+            ms = rng.uniform(*self._params)
+        else:
+            ms = self._params[0] * math.exp(rng.gauss(0.0, self._params[1]))
+        return max(ms, 0.0) / 1000.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+
+PROFILES = {
+    "fast": {},
+    "realistic": {"latency": "lognormal:700,0.35", "prompt_token_ms": 0.05, "tokens_per_s": 80},
+    "flaky": {"latency": "lognormal:700,0.35", "prompt_token_ms": 0.05, "tokens_per_s": 80,
+              "error_429": 0.05, "error_500": 0.02, "malformed": 0.02},
+}
+
+
+# --- RESPONSES ---
+
+# First instruction line of every registered template -> template name
+_TEMPLATE_MARKERS = {t.instructions.format().splitlines()[0]: name for name, t in prompt_templates.REGISTRY.items()}
+_SECTION_RE = r"{}:?\n(.*?)(?=\n\n[A-Z][^\n]*:\n|\n*\Z)"
+
+
+def prompt_type(prompt: str) -> str:
+    head = prompt.lstrip().split("\n", 1)[0]
+    return _TEMPLATE_MARKERS.get(head, "unknown")
+
+
+def _section(prompt: str, header: str) -> str:
+    m = re.search(_SECTION_RE.format(re.escape(header)), prompt, flags=re.S)
+    return m.group(1).strip() if m else ""
+
+
+def _skills(text: str) -> List[str]:
+    return [taxonomy.skill_name(s) for s in taxonomy.extract_skills(text)]
+
+
+def _score(resume: str, jd_skills: List[str], rng: random.Random) -> Dict[str, Any]:
+    have = set(_skills(resume))
+    matched = [s for s in jd_skills if s in have]
+    share = len(matched) / len(jd_skills) if jd_skills else 0.5
+    score = round(min(max(2 + 6 * share + rng.uniform(-1, 1), 0), 10), 1)
+    return {"score_0_10": score, "matched_keywords": matched[:10],
+            "rationale": f"Matches {len(matched)} of {len(jd_skills)} required skills."}
+
+
+def _questions(rng: random.Random, topic: str, skills: List[str], n: int = 3) -> List[str]:
+    pool = skills or ["the core stack"]
+    return [f"{topic}: walk me through your experience with {rng.choice(pool)}." for _ in range(n)]
+
+
+def _respond_json(kind: str, prompt: str, rng: random.Random) -> Any:
+    jd = next((_section(prompt, h) for h in ("JD Requirements", "JD (truncated)", "JD", "Job Description") if _section(prompt, h)), "")
+    jd_skills = _skills(jd)
+    if kind == "resume_score":
+        return _score(_section(prompt, "Resume"), jd_skills, rng)
+    if kind == "resume_score_batch":
+        resumes = dict(re.findall(r"^### (c\d+)\n(.*?)(?=\n\n### c\d+\n|\n*\Z)", prompt, flags=re.S | re.M))
+        return {"results": [{"id": cid, **_score(text, jd_skills, rng)} for cid, text in resumes.items()]}
+    if kind == "interview_guide":
+        guide = {section: _questions(rng, section.replace("_", " ").title(), jd_skills)
+                 for section in ("fundamentals", "depth", "design_or_system", "behavioral")}
+        guide["red_flags"] = ["Cannot explain past design decisions.", "Vague about own contribution."]
+        return guide
+    if kind == "interview_evaluation":
+        overall = round(rng.uniform(4, 9), 1)
+        return {"overall_score_0_10": overall, "skill_scores": {s: round(rng.uniform(3, 9), 1) for s in jd_skills[:4]},
+                "strengths": ["Clear communication"], "concerns": ["Limited depth in one area"],
+                "hire_recommendation": "yes" if overall >= 7 else "maybe" if overall >= 5 else "no",
+                "rationale": "Stub evaluation.", "matched_keywords": jd_skills[:5]}
+    if kind == "interview_summary":
+        overall = round(rng.uniform(4, 9), 1)
+        return {"final_recommendation": "yes" if overall >= 7 else "maybe", "overall_score_0_10": overall,
+                "strengths": ["Consistent across rounds"], "concerns": [], "risks": [], "next_steps": ["Reference check"]}
+    if kind == "improve_jd":
+        return {"improved_jd": _section(prompt, "JD"), "must_have_keywords": jd_skills[:8], "risks": []}
+    if kind == "screening_assess":
+        criteria = {}
+        for name, max_points in re.findall(r"^- (.+?) \(max ([\d.]+) points\)", _section(prompt, "Open criteria to assess"), flags=re.M):
+            criteria[name] = {"points": round(rng.uniform(0, float(max_points)), 1), "finding": f"Stub finding for {name}."}
+        return {"criteria": criteria, "assessment": "Stub assessment.", "hire_recommendation": rng.choice(["yes", "maybe", "no"]),
+                "risks": [], "next_questions": _questions(rng, "Follow-up", jd_skills, 2)}
+    if kind == "offer_assist":
+        return {"summary": "Stub offer summary.", "risks": ["Competing offer"], "negotiation_points": ["Start date"],
+                "salary_recommendation": "Within the budgeted band."}
+    if kind == "suggest_slots":
+        days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+        return {"slots": [{"day": rng.choice(days), "time": f"{rng.randint(9, 16)}:00", "timezone": "local", "note": "stub"}
+                          for _ in range(4)]}
+    if kind == "call_script":
+        return {"greeting": "Hi, this is the recruiting team calling about the role.",
+                "questions": [{"question": q, "purpose": "verify", "expected_response": "specific example"}
+                              for q in _questions(rng, "Screening", jd_skills)],
+                "closing": "Thanks for your time.", "key_points_to_verify": ["Notice period", "Location"],
+                "red_flags_to_watch": ["Salary far above band"]}
+    if kind == "call_simulation":
+        return {"transcript": "Recruiter: Hi!\nCandidate: Hello, happy to talk.", "duration_seconds": rng.randint(120, 600),
+                "key_findings": ["Available in 30 days"],
+                "verification_results": {"experience_verified": True, "location_match": rng.random() > 0.3,
+                                         "notice_period": "30 days", "salary_expectation": "Within band",
+                                         "shift_preference": "Day"},
+                "overall_assessment": "Stub call."}
+    if kind == "interview_briefing":
+        return {"candidate_summary": "Stub candidate summary.", "key_strengths": jd_skills[:3], "areas_to_probe": jd_skills[3:6],
+                "red_flags_to_watch": [], "recommended_questions": _questions(rng, "Probe", jd_skills),
+                "evaluation_criteria": {"technical_skills": "depth", "communication": "clarity", "cultural_fit": "ownership"}}
+    if kind == "interview_insights":
+        return {"response_quality": rng.choice(["excellent", "good", "fair"]), "key_points_mentioned": [],
+                "strengths_demonstrated": [], "concerns": [], "suggested_followup": _questions(rng, "Follow-up", jd_skills, 1)[0],
+                "red_flags": [], "confidence_score": rng.randint(4, 9)}
+    return {"result": "ok"}
+
+
+def respond(prompt: str, system: str = "", json_mode: bool = True) -> Tuple[str, str]:
+    """(prompt type, content) for a prompt; a pure function of its inputs."""
+    kind = prompt_type(prompt)
+    rng = random.Random(hashlib.sha256((system + "\x00" + prompt).encode("utf-8")).hexdigest())
+    if not json_mode and kind == "improve_jd":
+        # improve_jd's plain-text rewrite: the JD back, plus the Keywords line it parses
+        jd = _section(prompt, "JD")
+        return kind, f"{jd}\nKeywords: {', '.join(_skills(jd)[:8])}"
+    if not json_mode and kind == "unknown":
+        return kind, "OK"
+    return kind, json.dumps(_respond_json(kind, prompt, rng))
+
+
+# --- SERVER ---
+
+def _tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _text(content) -> Tuple[str, str]:
+    """(full text, cache_control prefix) of a message's content (string or parts)."""
+    if isinstance(content, str):
+        return content, ""
+    parts = [p for p in content or [] if isinstance(p, dict)]
+    prefix = "".join(p.get("text", "") for p in parts[:1] if p.get("cache_control"))
+    return "".join(p.get("text", "") for p in parts), prefix
+
+
+class StubState:
+    def __init__(self, profile: Profile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self._prefixes: "OrderedDict[str, None]" = OrderedDict()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {"requests": 0, "streamed": 0, "in_flight": 0, "peak_in_flight": 0,
+                          "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                          "injected": {"429": 0, "500": 0, "malformed": 0}, "types": {}}
+
+    def set_profile(self, profile: Profile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+
+    def cached_tokens(self, prefix: str) -> int:
+        """Tokens of a cache_control prefix already seen (it is remembered either way)."""
+        if not prefix:
+            return 0
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self._lock:
+            hit = key in self._prefixes
+            self._prefixes[key] = None
+            self._prefixes.move_to_end(key)
+            while len(self._prefixes) > PREFIX_CACHE_ENTRIES:
+                self._prefixes.popitem(last=False)
+        return _tokens(prefix) if hit else 0
+
+    def count(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+
+    def count_type(self, kind: str):
+        with self._lock:
+            self.stats["types"][kind] = self.stats["types"].get(kind, 0) + 1
+
+    def inject(self) -> Optional[str]:
+        """Which failure (if any) this request gets."""
+        p = self.profile
+        with self._lock:
+            roll = self.rng.random()
+            for name, rate in (("429", p.error_429), ("500", p.error_500), ("malformed", p.malformed)):
+                if roll < rate:
+                    self.stats["injected"][name] += 1
+                    return name
+                roll -= rate
+        return None
+
+
+def _error(status: int, message: str, kind: str) -> JSONResponse:
+    headers = {"Retry-After": "1"} if status == 429 else None
+    return JSONResponse({"error": {"message": message, "type": kind, "code": status}}, status_code=status, headers=headers)
+
+
+def create_app(profile: Optional[Profile] = None) -> FastAPI:
+    app = FastAPI(title="LLM Stub")
+    state = StubState(profile or Profile())
+    app.state.stub = state
+
+    @app.get("/v1/models")
+    @app.get("/models")
+    def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        system = "".join(_text(m.get("content"))[0] for m in messages if m.get("role") == "system")
+        user, prefix = _text(next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), ""))
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        model = body.get("model") or "stub"
+        stream = bool(body.get("stream"))
+        profile = state.profile
+
+        state.count(requests=1, in_flight=1, streamed=int(stream))
+        try:
+            failure = state.inject()
+            kind, content = respond(user, system, json_mode)
+            state.count_type(kind)
+            if failure == "malformed":
+                content = content[:max(1, len(content) // 2)]
+            prompt_tokens = _tokens(system) + _tokens(user)
+            cached = state.cached_tokens(prefix)
+            completion_tokens = _tokens(content)
+            # Time to first token: per-request latency plus uncached prompt processing
+            ttft = profile.sample_latency_s(state.rng) + (prompt_tokens - cached) * profile.prompt_token_ms / 1000.0
+            if failure in ("429", "500"):
+                await asyncio.sleep(ttft if failure == "500" else 0)
+                return _error(int(failure), f"Injected {failure} from LLM stub",
+                              "rate_limit_error" if failure == "429" else "server_error")
+            state.count(prompt_tokens=prompt_tokens, cached_tokens=cached, completion_tokens=completion_tokens)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens,
+                     "prompt_tokens_details": {"cached_tokens": cached}}
+            rid, created = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time())
+            per_token = 1.0 / profile.tokens_per_s if profile.tokens_per_s > 0 else 0.0
+            if not stream:
+                await asyncio.sleep(ttft + completion_tokens * per_token)
+                return {"id": rid, "object": "chat.completion", "created": created, "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                        "usage": usage}
+        finally:
+            state.count(in_flight=-1)
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events():
+            state.count(in_flight=1)
+            try:
+                await asyncio.sleep(ttft)
+                pieces = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+                for i, piece in enumerate(pieces):
+                    delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+                    chunk = {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if per_token:
+                        await asyncio.sleep(per_token)
+                final = {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model,
+                         "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                if include_usage:
+                    final["usage"] = usage
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+            finally:
+                state.count(in_flight=-1)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stub/stats")
+    def stub_stats():
+        with state._lock:
+            return {"profile": state.profile.as_dict(), **copy.deepcopy(state.stats)}
+
+    @app.post("/stub/profile")
+    async def stub_profile(request: Request):
+        updates = await request.json()
+        try:
+            state.set_profile(Profile(**{**state.profile.as_dict(), **updates}))
+        except (TypeError, ValueError) as e:
+            return _error(400, str(e), "invalid_request_error")
+        return state.profile.as_dict()
+
+    @app.post("/stub/reset")
+    def stub_reset():
+        state.reset()
+        return {"status": "reset"}
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible LLM stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("LLM_STUB_PORT", "8900")))
+    parser.add_argument("--profile", default="fast", choices=sorted(PROFILES), help="preset; the flags below override it")
+    for field, kind in (("latency", str), ("prompt_token_ms", float), ("tokens_per_s", float), ("error_429", float),
+                        ("error_500", float), ("malformed", float), ("seed", int)):
+        parser.add_argument("--" + field.replace("_", "-"), dest=field, type=kind)
+    args = parser.parse_args(argv)
+    settings = dict(PROFILES[args.profile])
+    settings.update({f: getattr(args, f) for f in Profile.FIELDS if getattr(args, f) is not None})
+    try:
+        profile = Profile(**settings)
+    except ValueError as e:
+        parser.error(str(e))
+
+    import uvicorn
+    print(f"LLM stub on http://{args.host}:{args.port}/v1 ({json.dumps(profile.as_dict())})", file=sys.stderr)
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,452 @@
+"""
+Scoring Benchmarks - throughput, latency percentiles and peak memory per scoring path
+Runs every (path, size) case in its own subprocess on a deterministic synthetic
+corpus, so peak RSS is per case and warm caches never leak between cases.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks --sizes 100,10000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench_baseline.json --tolerance 0.25
+    python -m benchmarks.run_benchmarks --paths llm_score_single,llm_score_batched --sizes 200
+Every case runs with a synthetic taxonomy of BENCH_TAXONOMY_SKILLS skills merged
+on top of the bundled one (SKILL_TAXONOMY_PATH), so matcher cost is measured
+at production taxonomy scale; BENCH_TAXONOMY_SKILLS=0 uses the bundled file only.
+LLM paths run against a simulated provider (fixed latency plus a per-token cost)
+and also report prompt tokens and seconds per candidate. With BENCH_LLM_BASE_URL
+set they go through llm.py over HTTP instead, e.g. to the local stub server:
+    python -m benchmarks.llm_stub --profile realistic &
+    BENCH_LLM_BASE_URL=http://127.0.0.1:8900/v1 python -m benchmarks.run_benchmarks --paths llm_score_single
+"""
+import os
+import re
+import sys
+import json
+import math
+import random
+import time
+import asyncio
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+BENCH_VERSION = 2
+DEFAULT_SIZES = (100, 10000, 100000)
+DEFAULT_BUDGET_S = float(os.getenv("BENCH_BUDGET_S", "600"))
+DEFAULT_TOLERANCE = 0.25
+# Synthetic skills merged into the taxonomy for every case (the bundled file alone has a few hundred)
+BENCH_TAXONOMY_SKILLS = int(os.getenv("BENCH_TAXONOMY_SKILLS", "5000"))
+# Memory regressions smaller than this are allocator noise
+MEMORY_NOISE_MB = 8.0
+
+# Per-candidate paths time each call; job paths time one whole rescore
+PER_CANDIDATE_PATHS = (
+    "extract_text_txt", "extract_text_pdf", "extract_text_docx",
+    "calculate_score", "get_matching_keywords", "heuristic_score", "extract_skills",
+)
+JOB_PATHS = ("trigger_full", "trigger_cached", "trigger_incremental")
+# LLM rescore, one resume per call vs BENCH_LLM_BATCH resumes per call
+LLM_PATHS = ("llm_score_single", "llm_score_batched")
+ALL_PATHS = PER_CANDIDATE_PATHS + JOB_PATHS + LLM_PATHS
+
+# Simulated provider: seconds per call, per prompt token and per completion token
+SIM_LLM_BASE_S = float(os.getenv("BENCH_LLM_BASE_S", "0.3"))
+SIM_LLM_PROMPT_TOKEN_S = float(os.getenv("BENCH_LLM_PROMPT_TOKEN_S", "0.00002"))
+SIM_LLM_COMPLETION_TOKEN_S = float(os.getenv("BENCH_LLM_COMPLETION_TOKEN_S", "0.002"))
+SIM_LLM_BATCH = int(os.getenv("BENCH_LLM_BATCH", "8"))
+# OpenAI-compatible endpoint for the LLM paths instead of the in-process simulation
+BENCH_LLM_BASE_URL = os.getenv("BENCH_LLM_BASE_URL")
+
+
+# --- MEASUREMENT HELPERS ---
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size (Linux /proc), None where unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark (Linux) so imports/setup don't count towards the case."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except Exception:
+        pass
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(math.ceil(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _time_each(fn, items) -> List[float]:
+    """Per-item latencies in milliseconds."""
+    clock = time.perf_counter_ns
+    out = []
+    for item in items:
+        t0 = clock()
+        fn(item)
+        out.append((clock() - t0) / 1e6)
+    return out
+
+
+# --- CASES (run inside the worker subprocess) ---
+
+def _setup_job(utils, corpus, size: int, seed: int, formats) -> str:
+    """Job with JD, resumes on disk and a candidates CSV, without running ingest's own scoring."""
+    import pandas as pd
+    jid = utils.create_new_job_with_resumes("Benchmark", corpus.generate_jd(seed), [])
+    resumes_dir = os.path.join(utils.JOBS_DIR, jid, "resumes")
+    files = corpus.write_corpus(resumes_dir, size, seed, formats)
+    rows = [{"name": f["name"], "score": 0.0, "status": "New", "id": f"cand_{i}", "matching_keywords": "",
+             "email": "", "phone": ""} for i, f in enumerate(files)]
+    pd.DataFrame(rows).to_csv(os.path.join(utils.JOBS_DIR, jid, "cv_scores.csv"), index=False)
+    return jid
+
+
+def _prime_incremental(utils, jid: str):
+    """Build the postings, embeddings and scoring state a previous full rescore would have left behind."""
+    job_dir = utils._job_dir(jid)
+    resumes_dir = os.path.join(job_dir, "resumes")
+    index_items, embed_items = [], []
+    for fname in sorted(os.listdir(resumes_dir)):
+        path = os.path.join(resumes_dir, fname)
+        text = utils.extract_text(path)
+        content_hash = utils.score_cache.file_hash(path)
+        name = fname.rsplit(".", 1)[0]
+        index_items.append((name, path, content_hash, text))
+        embed_items.append((name, content_hash, text))
+    utils.resume_index.upsert_resumes(job_dir, index_items)
+    utils.semantic.upsert_resumes(job_dir, embed_items)
+    analysis = utils.load_jd_analysis(jid)
+    utils.resume_index.build_state(job_dir, analysis["keyword_view"], analysis["analysis_hash"])
+
+
+class _SimulatedLLM:
+    """Stand-in for litellm.acompletion that answers scoring prompts and counts tokens."""
+
+    _ITEM_RE = re.compile(r"^### (c\d+)$", re.MULTILINE)
+
+    def __init__(self, count_tokens):
+        self.count_tokens = count_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def __call__(self, **kwargs):
+        prompt = "".join(m["content"] for m in kwargs["messages"])
+        ids = self._ITEM_RE.findall(prompt)
+        item = lambda i: {"score_0_10": (len(prompt) + i) % 11, "matched_keywords": ["python", "sql"], "rationale": "Solid overlap with the requirements."}
+        body = {"results": [{"id": cid, **item(i)} for i, cid in enumerate(ids)]} if ids else item(0)
+        content = json.dumps(body)
+        prompt_tokens = self.count_tokens(prompt)
+        completion_tokens = self.count_tokens(content)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        await asyncio.sleep(SIM_LLM_BASE_S + prompt_tokens * SIM_LLM_PROMPT_TOKEN_S + completion_tokens * SIM_LLM_COMPLETION_TOKEN_S)
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def _stub_stats(base_url: str) -> Dict[str, Any]:
+    """Traffic counters of an llm_stub server (empty for other endpoints)."""
+    root = re.sub(r"/v1/?$", "", base_url.rstrip("/"))
+    try:
+        with urllib.request.urlopen(root + "/stub/stats", timeout=5) as resp:
+            return json.loads(resp.read())
+    except Exception:
+        return {}
+
+
+def run_case(path: str, size: int, seed: int, formats) -> Dict[str, Any]:
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    if path in LLM_PATHS:
+        # Every call must reach the (simulated) provider
+        os.environ.setdefault("LITELLM_API_KEY", "benchmark")
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        if BENCH_LLM_BASE_URL:
+            os.environ["LITELLM_BASE_URL"] = BENCH_LLM_BASE_URL
+    workdir = tempfile.mkdtemp(prefix="agentic_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # JOBS_DIR is relative to the working directory
+    try:
+        from benchmarks import corpus
+        taxonomy_names: List[str] = []
+        if BENCH_TAXONOMY_SKILLS > 0:
+            # Read by taxonomy at import time
+            taxonomy_path = os.path.join(workdir, "skill_taxonomy.json")
+            taxonomy_names = [s["name"] for s in corpus.write_taxonomy(taxonomy_path, BENCH_TAXONOMY_SKILLS, seed)["skills"]]
+            os.environ["SKILL_TAXONOMY_PATH"] = taxonomy_path
+        import utils
+
+        latencies: Optional[List[float]] = None
+        extra: Dict[str, Any] = {}
+        if path.startswith("extract_text_"):
+            fmt = path.rsplit("_", 1)[1]
+            files = corpus.write_corpus(os.path.join(workdir, "corpus"), size, seed, (fmt,))
+            paths = [f["path"] for f in files]
+            setup_rss = _rss_mb()
+            _reset_peak_rss()
+            started = time.perf_counter()
+            latencies = _time_each(utils.extract_text, paths)
+        elif path in ("calculate_score", "get_matching_keywords", "heuristic_score"):
+            texts = [corpus.generate_resume(i, seed) for i in range(size)]
+            analysis = utils.jd_analysis.analyze_jd(corpus.generate_jd(seed))
+            if path == "heuristic_score":
+                view = analysis["llm_view"]
+                fn = lambda t: utils._heuristic_score_resume(t, view["text"], jd_view=view)
+            else:
+                view = analysis["keyword_view"]
+                target = utils.calculate_score if path == "calculate_score" else utils.get_matching_keywords
+                fn = lambda t: target(t, view["text"], jd_view=view)
+            setup_rss = _rss_mb()
+            _reset_peak_rss()
+            started = time.perf_counter()
+            latencies = _time_each(fn, texts)
+        elif path == "extract_skills":
+            # Resumes that also name some of the synthetic skills, as real ones name tools the bundled file lacks
+            rng = random.Random(f"mentions:{seed}")
+            texts = [corpus.generate_resume(i, seed) + "\nTools: " + ", ".join(rng.sample(taxonomy_names, min(6, len(taxonomy_names))))
+                     for i in range(size)]
+            utils.taxonomy.get_matcher.cache_clear()
+            built = time.perf_counter()
+            matcher = utils.taxonomy.get_matcher()
+            extra = {"build_s": round(time.perf_counter() - built, 4), "taxonomy_patterns": matcher.pattern_count}
+            setup_rss = _rss_mb()
+            _reset_peak_rss()
+            started = time.perf_counter()
+            latencies = _time_each(utils.taxonomy.extract_skills, texts)
+        elif path in JOB_PATHS:
+            jid = _setup_job(utils, corpus, size, seed, formats)
+            if path == "trigger_cached":
+                # Warm score cache, but no incremental state: exercises the cached full path
+                utils.trigger_simulation_step(jid, "score_cvs")
+                shutil.rmtree(os.path.join(utils._job_dir(jid), utils.resume_index.INDEX_DIRNAME), ignore_errors=True)
+            elif path == "trigger_incremental":
+                _prime_incremental(utils, jid)
+                # One-line JD edit, as through PUT /jobs/{id}/jd
+                utils.save_job_artifact(jid, "jd.txt", corpus.generate_jd(seed) + "\nExperience with Kubernetes is a plus.")
+                utils.refresh_jd_analysis(jid)
+            setup_rss = _rss_mb()
+            _reset_peak_rss()
+            started = time.perf_counter()
+            utils.trigger_simulation_step(jid, "score_cvs")
+        elif path in LLM_PATHS:
+            jid = _setup_job(utils, corpus, size, seed, formats)
+            if BENCH_LLM_BASE_URL:
+                before = _stub_stats(BENCH_LLM_BASE_URL)
+            else:
+                sim = _SimulatedLLM(utils.prompt_budget.count_tokens)
+                utils.llm.litellm.acompletion = sim
+            batch = SIM_LLM_BATCH if path == "llm_score_batched" else 1
+            setup_rss = _rss_mb()
+            _reset_peak_rss()
+            started = time.perf_counter()
+            scored = utils.llm_score_candidates(jid, batch_size=batch)
+            elapsed = time.perf_counter() - started
+            if BENCH_LLM_BASE_URL:
+                after = _stub_stats(BENCH_LLM_BASE_URL)
+                traffic = {k: after.get(k, 0) - before.get(k, 0) for k in ("requests", "prompt_tokens", "completion_tokens")}
+                calls, prompt_tokens, completion_tokens = traffic["requests"], traffic["prompt_tokens"], traffic["completion_tokens"]
+            else:
+                calls, prompt_tokens, completion_tokens = sim.calls, sim.prompt_tokens, sim.completion_tokens
+            extra = {
+                "batch_size": batch,
+                "scored": scored.get("updated", 0),
+                "llm_calls": calls,
+                "prompt_tokens_per_candidate": round(prompt_tokens / max(size, 1), 1),
+                "completion_tokens_per_candidate": round(completion_tokens / max(size, 1), 1),
+                "s_per_candidate": round(elapsed / max(size, 1), 4),
+            }
+        else:
+            raise ValueError(f"Unknown benchmark path: {path}")
+        wall_s = time.perf_counter() - started
+
+        result = {
+            "path": path,
+            "size": size,
+            "wall_s": round(wall_s, 4),
+            "throughput_per_s": round(size / wall_s, 1) if wall_s > 0 else None,
+            "p50_ms": None,
+            "p99_ms": None,
+            "peak_rss_mb": None,
+            "peak_rss_delta_mb": None,
+            **extra,
+        }
+        if latencies:
+            ordered = sorted(latencies)
+            result["p50_ms"] = round(_percentile(ordered, 50), 4)
+            result["p99_ms"] = round(_percentile(ordered, 99), 4)
+        peak = _peak_rss_mb()
+        if peak is not None:
+            result["peak_rss_mb"] = round(peak, 1)
+            if setup_rss is not None:
+                result["peak_rss_delta_mb"] = round(max(peak - setup_rss, 0.0), 1)
+        return result
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# --- DRIVER ---
+
+def _run_in_subprocess(path: str, size: int, seed: int, formats, timeout: Optional[float]) -> Dict[str, Any]:
+    cmd = [sys.executable, "-m", "benchmarks.run_benchmarks", "--worker", path, str(size),
+           "--seed", str(seed), "--formats", ",".join(formats)]
+    try:
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"path": path, "size": size, "skipped": f"timed out after {timeout}s"}
+    lines = [l for l in proc.stdout.strip().splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"path": path, "size": size, "error": (proc.stderr or proc.stdout).strip()[-500:]}
+    return json.loads(lines[-1])
+
+
+def _estimate_seconds(history: List[Dict[str, Any]], size: int) -> Optional[float]:
+    """Extrapolate wall time from earlier sizes of the same path (at least linear growth)."""
+    done = [h for h in history if h.get("wall_s")]
+    if not done:
+        return None
+    last = done[-1]
+    exponent = 1.0
+    if len(done) >= 2:
+        prev = done[-2]
+        if prev["wall_s"] > 0 and last["size"] > prev["size"]:
+            exponent = max(1.0, math.log(last["wall_s"] / prev["wall_s"]) / math.log(last["size"] / prev["size"]))
+    return last["wall_s"] * (size / last["size"]) ** exponent
+
+
+def run_suite(paths, sizes, seed: int = 0, formats=("txt",), budget_s: float = DEFAULT_BUDGET_S,
+              log=print) -> Dict[str, Any]:
+    results = []
+    for path in paths:
+        history: List[Dict[str, Any]] = []
+        for size in sorted(sizes):
+            estimate = _estimate_seconds(history, size)
+            if budget_s and estimate is not None and estimate > budget_s:
+                entry = {"path": path, "size": size, "skipped": f"estimated {estimate:.0f}s exceeds budget {budget_s:.0f}s"}
+            else:
+                log(f"running {path} @ {size}")
+                entry = _run_in_subprocess(path, size, seed, formats, timeout=budget_s * 3 if budget_s else None)
+            history.append(entry)
+            results.append(entry)
+            log(json.dumps(entry))
+    return {
+        "meta": {
+            "bench_version": BENCH_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "sizes": sorted(sizes),
+            "formats": list(formats),
+            "taxonomy_skills": BENCH_TAXONOMY_SKILLS,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """Flag cases that got slower, less steady or heavier than the baseline by more than `tolerance`."""
+    base = {(r["path"], r["size"]): r for r in baseline.get("results", []) if "wall_s" in r}
+    regressions, improvements, compared = [], [], 0
+    for r in current.get("results", []):
+        b = base.get((r["path"], r["size"]))
+        if b is None or "wall_s" not in r:
+            continue
+        compared += 1
+        checks = (
+            ("throughput_per_s", -1, 0.0),   # lower is worse
+            ("p99_ms", 1, 0.0),              # higher is worse
+            ("peak_rss_delta_mb", 1, MEMORY_NOISE_MB),
+        )
+        for metric, direction, floor in checks:
+            now, then = r.get(metric), b.get(metric)
+            if now is None or then is None or then == 0:
+                continue
+            change = (now - then) / then
+            entry = {"path": r["path"], "size": r["size"], "metric": metric,
+                     "baseline": then, "current": now, "change": round(change, 3)}
+            if change * direction > tolerance and abs(now - then) > floor:
+                regressions.append(entry)
+            elif -change * direction > tolerance and abs(now - then) > floor:
+                improvements.append(entry)
+    return {"tolerance": tolerance, "compared": compared, "regressions": regressions, "improvements": improvements}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the candidate scoring paths.")
+    parser.add_argument("--paths", default=",".join(ALL_PATHS), help="comma-separated subset of: " + ", ".join(ALL_PATHS))
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", default="txt,pdf,docx", help="resume formats cycled through by the job paths")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S,
+                        help="skip cases whose extrapolated runtime exceeds this many seconds (0 = no limit)")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    formats = tuple(f for f in args.formats.split(",") if f)
+
+    if args.worker:
+        print(json.dumps(run_case(args.worker[0], int(args.worker[1]), args.seed, formats)))
+        return 0
+
+    paths = [p for p in args.paths.split(",") if p]
+    unknown = [p for p in paths if p not in ALL_PATHS]
+    if unknown:
+        parser.error(f"unknown paths: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = run_suite(paths, sizes, args.seed, formats, args.budget, log=lambda m: print(m, file=sys.stderr))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["comparison"]["regressions"] else 0
+
+    out = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+    else:
+        print(out)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+Distilled Scorer - local approximation of the LLM resume score
+A ridge-regression model over cheap token, skill and experience features,
+trained offline from accumulated (resume, JD, LLM score) samples harvested
+from the per-job score caches. Predicts in microseconds once features are
+extracted and ships with a calibration report measured on held-out samples.
+"""
+import os
+import json
+import math
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import jd_analysis
+    from . import taxonomy
+except ImportError:
+    import jd_analysis
+    import taxonomy
+
+DISTILLED_VERSION = 1
+MODELS_DIR = os.getenv("DISTILLED_MODEL_DIR", "models")
+MODEL_FILENAME = "distilled_scorer.json"
+SAMPLES_FILENAME = "distilled_samples.jsonl"
+RIDGE_LAMBDA = float(os.getenv("DISTILLED_RIDGE_LAMBDA", "1.0"))
+MIN_TRAIN_SAMPLES = int(os.getenv("DISTILLED_MIN_SAMPLES", "30"))
+HOLDOUT_FRACTION = 0.2
+
+FEATURE_NAMES = [
+    "token_overlap_ratio",
+    "token_overlap_log",
+    "skill_match_ratio",
+    "skill_match_count",
+    "category_match_ratio",
+    "extra_skills_log",
+    "relevance_overlap_ratio",
+    "experience_known",
+    "experience_years",
+    "experience_required",
+    "experience_gap",
+    "experience_meets",
+    "resume_length_log",
+]
+
+
+def features(resume_text: str, jd_view: Dict[str, Any]) -> List[float]:
+    """Feature vector for one (resume, JD view) pair; same order as FEATURE_NAMES."""
+    resume_text = str(resume_text or "")
+    jd_tokens = jd_view.get("tokens") or []
+    r_tokens = set(jd_analysis.scoring_tokens(resume_text))
+    overlap = sum(1 for t in jd_tokens if t in r_tokens)
+
+    jd_skills = set(jd_view.get("skills") or [])
+    r_skills = set(taxonomy.extract_skills(resume_text))
+    skill_hits = len(jd_skills & r_skills)
+    jd_cats = {taxonomy.skill_category(s) for s in jd_skills} - {None}
+    r_cats = {taxonomy.skill_category(s) for s in r_skills} - {None}
+
+    jd_rel = set(jd_view.get("relevance_words") or [])
+    r_rel = jd_analysis.relevance_words(resume_text)
+
+    r_exp = jd_analysis.required_experience(resume_text)
+    req = jd_view.get("required_experience")
+    gap = float(max(min((r_exp or 0) - (req or 0), 10), -10)) if r_exp is not None and req else 0.0
+
+    return [
+        overlap / max(len(jd_tokens), 1),
+        math.log1p(overlap),
+        skill_hits / max(len(jd_skills), 1),
+        float(skill_hits),
+        len(jd_cats & r_cats) / max(len(jd_cats), 1),
+        math.log1p(len(r_skills - jd_skills)),
+        len(jd_rel & r_rel) / max(len(jd_rel), 1),
+        1.0 if r_exp is not None else 0.0,
+        float(min(r_exp or 0, 30)),
+        float(req or 0),
+        gap,
+        1.0 if (r_exp is not None and req and r_exp >= req) else 0.0,
+        math.log1p(len(resume_text.split())),
+    ]
+
+
+class DistilledModel:
+    """Standardized ridge regression; predictions are clipped to the 0-10 score scale."""
+
+    def __init__(self, weights: List[float], bias: float, means: List[float], stds: List[float],
+                 model_id: str = "", meta: Optional[Dict] = None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.stds = np.asarray(stds, dtype=np.float64)
+        self.model_id = model_id
+        self.meta = meta or {}
+
+    def predict_features(self, x) -> np.ndarray:
+        x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+        raw = ((x - self.means) / self.stds) @ self.weights + self.bias
+        return np.round(np.clip(raw, 0.0, 10.0), 1)
+
+    def predict(self, resume_text: str, jd_view: Dict[str, Any]) -> float:
+        return float(self.predict_features(features(resume_text, jd_view))[0])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": DISTILLED_VERSION,
+            "model_id": self.model_id,
+            "feature_names": FEATURE_NAMES,
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "means": self.means.tolist(),
+            "stds": self.stds.tolist(),
+            **self.meta,
+        }
+
+
+def fit(x: np.ndarray, y: np.ndarray, ridge_lambda: float = RIDGE_LAMBDA) -> DistilledModel:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    means = x.mean(axis=0)
+    stds = x.std(axis=0)
+    stds[stds < 1e-9] = 1.0
+    z = (x - means) / stds
+    bias = float(y.mean())
+    a = z.T @ z + ridge_lambda * np.eye(z.shape[1])
+    weights = np.linalg.solve(a, z.T @ (y - bias))
+    return DistilledModel(weights, bias, means, stds)
+
+
+# --- SAMPLES ---
+
+def _models_dir() -> str:
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    return MODELS_DIR
+
+
+def load_samples() -> Dict[str, Dict[str, Any]]:
+    """All accumulated samples keyed by their score-cache key (newest wins)."""
+    path = os.path.join(MODELS_DIR, SAMPLES_FILENAME)
+    samples: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    s = json.loads(line)
+                except ValueError:
+                    continue
+                if len(s.get("x", [])) == len(FEATURE_NAMES):
+                    samples[s["key"]] = s
+    return samples
+
+
+def append_samples(new_samples: List[Dict[str, Any]]) -> int:
+    """Persist samples so they survive JD edits and cache trimming. Returns how many were new."""
+    known = load_samples()
+    fresh = [s for s in new_samples if s["key"] not in known]
+    if fresh:
+        with open(os.path.join(_models_dir(), SAMPLES_FILENAME), "a") as f:
+            for s in fresh:
+                f.write(json.dumps(s) + "\n")
+    return len(fresh)
+
+
+def make_sample(key: str, resume_text: str, jd_view: Dict[str, Any], llm_score: float,
+                heuristic_score: Optional[float] = None) -> Dict[str, Any]:
+    return {
+        "key": key,
+        "x": features(resume_text, jd_view),
+        "y": float(llm_score),
+        "heuristic": heuristic_score,
+    }
+
+
+# --- TRAINING + CALIBRATION ---
+
+def _is_holdout(key: str) -> bool:
+    # Stable split: the same sample always lands on the same side
+    return (zlib.crc32(key.encode("utf-8")) % 1000) < HOLDOUT_FRACTION * 1000
+
+
+def _ranks(v: np.ndarray) -> np.ndarray:
+    order = np.argsort(v, kind="stable")
+    ranks = np.empty(len(v), dtype=np.float64)
+    ranks[order] = np.arange(len(v), dtype=np.float64)
+    return ranks
+
+
+def calibration_report(pred: np.ndarray, y: np.ndarray, heuristic: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    err = pred - y
+    report: Dict[str, Any] = {
+        "samples": int(len(y)),
+        "mae": round(float(np.abs(err).mean()), 3),
+        "rmse": round(float(np.sqrt((err ** 2).mean())), 3),
+        "bias": round(float(err.mean()), 3),
+        "within_1_point": round(float((np.abs(err) <= 1.0).mean()), 3),
+    }
+    if len(y) > 2 and pred.std() > 0 and y.std() > 0:
+        report["pearson"] = round(float(np.corrcoef(pred, y)[0, 1]), 3)
+        report["spearman"] = round(float(np.corrcoef(_ranks(pred), _ranks(y))[0, 1]), 3)
+    # Reliability table: for each predicted band, what the LLM actually said
+    bins = []
+    for lo in range(0, 10, 2):
+        mask = (pred >= lo) & (pred < lo + 2 if lo < 8 else pred <= 10)
+        if mask.any():
+            bins.append({
+                "predicted": f"{lo}-{lo + 2}",
+                "count": int(mask.sum()),
+                "mean_predicted": round(float(pred[mask].mean()), 2),
+                "mean_llm": round(float(y[mask].mean()), 2),
+            })
+    report["bins"] = bins
+    if heuristic is not None and len(heuristic) == len(y):
+        report["heuristic_mae"] = round(float(np.abs(heuristic - y).mean()), 3)
+    return report
+
+
+def train(samples: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Fit on accumulated samples, evaluate on a stable holdout, refit on everything and save."""
+    samples = samples if samples is not None else load_samples()
+    if len(samples) < MIN_TRAIN_SAMPLES:
+        raise ValueError(f"Need at least {MIN_TRAIN_SAMPLES} LLM-scored samples to train, have {len(samples)}")
+    keys = sorted(samples)
+    x = np.asarray([samples[k]["x"] for k in keys], dtype=np.float64)
+    y = np.asarray([samples[k]["y"] for k in keys], dtype=np.float64)
+    holdout = np.asarray([_is_holdout(k) for k in keys])
+    if holdout.all() or not holdout.any():
+        holdout = np.arange(len(keys)) % 5 == 0
+
+    model = fit(x[~holdout], y[~holdout])
+    heur = [samples[k].get("heuristic") for k in keys]
+    heur_holdout = None
+    if all(h is not None for h, m in zip(heur, holdout) if m):
+        heur_holdout = np.asarray([h for h, m in zip(heur, holdout) if m], dtype=np.float64)
+    report = calibration_report(model.predict_features(x[holdout]), y[holdout], heur_holdout)
+
+    final = fit(x, y)
+    final.model_id = f"{zlib.crc32(json.dumps([final.weights.tolist(), final.bias]).encode()):08x}"
+    final.meta = {
+        "trained_at": datetime.now().isoformat(),
+        "train_samples": int(len(keys)),
+        "ridge_lambda": RIDGE_LAMBDA,
+        "calibration": report,
+    }
+    save_model(final)
+    return final.to_dict()
+
+
+def save_model(model: DistilledModel):
+    path = os.path.join(_models_dir(), MODEL_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(model.to_dict(), f, indent=2)
+    os.replace(tmp_path, path)
+    _MODEL_CACHE.clear()
+
+
+_MODEL_CACHE: Dict[str, Tuple[float, DistilledModel]] = {}
+
+
+def load_model() -> Optional[DistilledModel]:
+    """Current model, re-read only when the file changes."""
+    path = os.path.join(MODELS_DIR, MODEL_FILENAME)
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _MODEL_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if data.get("version") != DISTILLED_VERSION or data.get("feature_names") != FEATURE_NAMES:
+        return None
+    meta = {k: v for k, v in data.items() if k in ("trained_at", "train_samples", "ridge_lambda", "calibration")}
+    model = DistilledModel(data["weights"], data["bias"], data["means"], data["stds"], data.get("model_id", ""), meta)
+    _MODEL_CACHE[path] = (mtime, model)
+    return model
+
+
+def model_version() -> str:
+    model = load_model()
+    return f"{DISTILLED_VERSION}:{model.model_id if model else 'untrained'}"
+
+
+if __name__ == "__main__":
+    # Offline training: python distilled.py (run from the backend dir that holds jobs/)
+    try:
+        import utils
+    except ImportError:
+        from . import utils
+    print(json.dumps(utils.train_distilled_scorer(), indent=2))
@@ -0,0 +1,177 @@
+"""
+Skill Facets - per-job skill dictionary and candidate bitsets
+Every taxonomy skill seen in a job's resumes gets an interned integer id and a
+packed bitset over the job's candidates (one bit per indexed resume), built
+from the resume index postings. Facet counts and AND/OR/NOT skill filters are
+then bitwise operations plus popcounts, independent of resume text.
+"""
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from . import resume_index
+    from . import taxonomy
+except ImportError:
+    import resume_index
+    import taxonomy
+
+FACETS_VERSION = 1
+FACETS_DIRNAME = "facets"
+META_FILENAME = "skills.json"
+BITSETS_FILENAME = "bitsets.npy"
+
+
+def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """Set bits per row of a 2-D uint8 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(bits, axis=1).sum(axis=1, dtype=np.int64)
+
+
+class FacetStore:
+    """skills[i] is the skill with interned id i; bitsets[i] marks the candidates that have it."""
+
+    def __init__(self, names: List[str], skills: List[str], bitsets: np.ndarray, stamp: str = ""):
+        self.names = names
+        self.skills = skills
+        self.skill_id = {s: i for i, s in enumerate(skills)}
+        self.bitsets = bitsets
+        self.stamp = stamp
+
+    def __len__(self):
+        return len(self.names)
+
+    def _empty(self, fill: bool = False) -> np.ndarray:
+        mask = np.zeros((len(self.names) + 7) // 8, dtype=np.uint8)
+        if fill and len(self.names):
+            mask = np.packbits(np.ones(len(self.names), dtype=bool))
+        return mask
+
+    def bitset(self, skill: str) -> np.ndarray:
+        i = self.skill_id.get(skill)
+        return self.bitsets[i] if i is not None else self._empty()
+
+    def filter(self, all_skills=(), any_skills=(), none_skills=()) -> np.ndarray:
+        """Packed candidate mask: has every skill in all_skills, at least one of any_skills, none of none_skills."""
+        mask = self._empty(fill=True)
+        for s in all_skills:
+            mask &= self.bitset(s)
+        if any_skills:
+            either = self._empty()
+            for s in any_skills:
+                either |= self.bitset(s)
+            mask &= either
+        for s in none_skills:
+            mask &= ~self.bitset(s)
+        return mask
+
+    def counts(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-skill candidate counts, within mask when given."""
+        if not len(self.skills):
+            return np.zeros(0, dtype=np.int64)
+        bits = self.bitsets if mask is None else self.bitsets & mask[None, :]
+        return _popcount_rows(bits)
+
+    def members(self, mask: np.ndarray, limit: Optional[int] = None) -> List[str]:
+        rows = np.flatnonzero(np.unpackbits(mask, count=len(self.names)))
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.names[r] for r in rows.tolist()]
+
+
+def _store_dir(job_dir: str) -> str:
+    return os.path.join(job_dir, FACETS_DIRNAME)
+
+
+def build(job_dir: str, names: List[str], index: resume_index.ResumeIndex, stamp: str = "") -> FacetStore:
+    """Intern every skill in the job's resume index and pack its postings into a bitset over `names`."""
+    n = len(names)
+    position = np.full(len(index) + 1, -1, dtype=np.int64)
+    for pos, name in enumerate(names):
+        r = index.row_of.get(name)
+        if r is not None:
+            position[r] = pos
+    skills = sorted(t[len(resume_index.SKILL_PREFIX):] for t in index.vocab if t.startswith(resume_index.SKILL_PREFIX))
+    bitsets = np.zeros((len(skills), (n + 7) // 8), dtype=np.uint8)
+    for i, skill in enumerate(skills):
+        rows = position[np.asarray(index.postings(resume_index.SKILL_PREFIX + skill), dtype=np.int64)]
+        rows = rows[rows >= 0]
+        if len(rows):
+            bits = np.zeros(n, dtype=bool)
+            bits[rows] = True
+            bitsets[i] = np.packbits(bits)
+    store = FacetStore(list(names), skills, bitsets, stamp)
+    save(job_dir, store)
+    return store
+
+
+# Last store per job, so repeated facet queries skip the disk read
+_CACHE: Dict[str, FacetStore] = {}
+
+
+def save(job_dir: str, store: FacetStore):
+    _CACHE[job_dir] = store
+    path = _store_dir(job_dir)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, BITSETS_FILENAME), store.bitsets)
+    with open(os.path.join(path, META_FILENAME), "w") as f:
+        json.dump({"version": FACETS_VERSION, "stamp": store.stamp, "names": store.names, "skills": store.skills}, f)
+
+
+def load(job_dir: str, stamp: str) -> Optional[FacetStore]:
+    """The stored facets if they were built for `stamp`, else None."""
+    cached = _CACHE.get(job_dir)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    path = _store_dir(job_dir)
+    try:
+        with open(os.path.join(path, META_FILENAME), "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != FACETS_VERSION or meta.get("stamp") != stamp:
+            return None
+        bitsets = np.load(os.path.join(path, BITSETS_FILENAME))
+        if bitsets.shape[0] != len(meta["skills"]):
+            return None
+        store = FacetStore(meta["names"], meta["skills"], bitsets, stamp)
+        _CACHE[job_dir] = store
+        return store
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def resolve_skills(values) -> List[str]:
+    """Canonical skill ids for user-supplied names ('K8s', 'Kubernetes' -> 'kubernetes')."""
+    out = []
+    for v in values or []:
+        v = str(v).strip()
+        if not v:
+            continue
+        found = taxonomy.extract_skills(v)
+        out.append(found[0] if found else v.lower())
+    return out
+
+
+def query(store: FacetStore, all_skills=(), any_skills=(), none_skills=(), limit: int = 50,
+          jd_skills=(), include_candidates: int = 0) -> Dict[str, Any]:
+    mask = store.filter(all_skills, any_skills, none_skills)
+    counts = store.counts(mask)
+    order = np.argsort(-counts, kind="stable")
+    jd = set(jd_skills)
+    facets = [{
+        "skill": store.skills[i],
+        "name": taxonomy.skill_name(store.skills[i]),
+        "count": int(counts[i]),
+        "jd_skill": store.skills[i] in jd,
+    } for i in order[:limit].tolist() if counts[i] > 0]
+    out = {
+        "total": len(store),
+        "matched": int(_popcount_rows(mask[None, :])[0]) if len(store) else 0,
+        "filters": {"all": list(all_skills), "any": list(any_skills), "none": list(none_skills)},
+        "skills": facets,
+    }
+    if include_candidates:
+        out["candidates"] = store.members(mask, include_candidates)
+    return out
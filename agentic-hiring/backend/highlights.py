@@ -0,0 +1,241 @@
+"""
+Resume Highlights - cached resume text with precomputed match offsets
+When a resume is scored its extracted text is stored once per candidate
+(gzip JSON) together with the (token, start, end) span of every word and
+taxonomy skill mention. Highlighting a candidate against the current JD is then
+a set lookup over those spans: no file parsing or regex work per view, and a JD
+edit does not invalidate anything.
+"""
+import os
+import json
+import gzip
+import html
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from . import taxonomy
+except ImportError:
+    import taxonomy
+
+HIGHLIGHTS_VERSION = 1
+HIGHLIGHTS_DIRNAME = "highlights"
+MANIFEST_FILENAME = "manifest.json"
+SNIPPET_CONTEXT = int(os.getenv("HIGHLIGHT_SNIPPET_CONTEXT", "80"))
+MAX_SNIPPETS = int(os.getenv("HIGHLIGHT_MAX_SNIPPETS", "5"))
+
+# Same word pattern the keyword scorers tokenize with, so highlighted words == matching_keywords
+_WORD_RE = re.compile(r"\b[a-zA-Z]{3,}\b")
+
+
+def _store_dir(job_dir: str) -> str:
+    return os.path.join(job_dir, HIGHLIGHTS_DIRNAME)
+
+
+def _record_path(job_dir: str, name: str) -> str:
+    # Candidate names come from file names; hash them so any name maps to one safe file
+    key = hashlib.sha1(str(name).encode("utf-8", errors="ignore")).hexdigest()[:20]
+    return os.path.join(_store_dir(job_dir), f"{key}.json.gz")
+
+
+def _stamp(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def find_spans(text: str) -> Tuple[List[List], List[List]]:
+    """[token, start, end] for every word (lowercased) and [skill_id, start, end] for every skill mention."""
+    text = str(text or "")
+    words = [[m.group(0).lower(), m.start(), m.end()] for m in _WORD_RE.finditer(text)]
+    skills = [[sid, start, end] for sid, start, end in taxonomy.find_skills(text)]
+    return words, skills
+
+
+def build_record(name: str, path: str, content_hash: str, text: str) -> Dict[str, Any]:
+    words, skills = find_spans(text)
+    return {
+        "version": HIGHLIGHTS_VERSION,
+        "name": name,
+        "file": os.path.basename(path),
+        "hash": content_hash,
+        "stamp": _stamp(path),
+        "text": str(text or ""),
+        "words": words,
+        "skills": skills,
+    }
+
+
+def _load_manifest(job_dir: str) -> Dict[str, Dict[str, str]]:
+    """Candidate name -> {hash, file, stamp} of the stored record."""
+    try:
+        with open(os.path.join(_store_dir(job_dir), MANIFEST_FILENAME), "r") as f:
+            data = json.load(f)
+        if data.get("version") == HIGHLIGHTS_VERSION:
+            return data.get("records") or {}
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def stored_hashes(job_dir: str) -> Dict[str, str]:
+    """Candidate name -> content hash for every resume with stored highlights."""
+    return {name: entry.get("hash") for name, entry in _load_manifest(job_dir).items()}
+
+
+def _read(job_dir: str, name: str) -> Optional[Dict[str, Any]]:
+    try:
+        with gzip.open(_record_path(job_dir, name), "rt", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+    if record.get("version") != HIGHLIGHTS_VERSION or record.get("name") != name:
+        return None
+    return record
+
+
+def upsert(job_dir: str, items: List[Tuple[str, str, str, Optional[str]]]) -> int:
+    """
+    Store text + spans for resumes. items: [(candidate_name, file_path, content_hash, text)];
+    candidates already stored with the same content hash are skipped (text may be None for those).
+    Returns number of records written.
+    """
+    manifest = _load_manifest(job_dir)
+    written = 0
+    for name, path, content_hash, text in items:
+        current = {"hash": content_hash, "file": os.path.basename(path), "stamp": _stamp(path)}
+        entry = manifest.get(name)
+        if entry == current:
+            continue
+        if text is None:
+            # Same content re-uploaded or touched: restamp the stored record, no re-extraction
+            record = _read(job_dir, name) if entry and entry.get("hash") == content_hash else None
+            if record is None:
+                continue
+            record.update(file=current["file"], stamp=current["stamp"])
+        else:
+            record = build_record(name, path, content_hash, text)
+        if not written:
+            os.makedirs(_store_dir(job_dir), exist_ok=True)
+        with gzip.open(_record_path(job_dir, name), "wt", encoding="utf-8") as f:
+            json.dump(record, f)
+        manifest[name] = current
+        written += 1
+    if written:
+        with open(os.path.join(_store_dir(job_dir), MANIFEST_FILENAME), "w") as f:
+            json.dump({"version": HIGHLIGHTS_VERSION, "records": manifest}, f)
+    return written
+
+
+def load(job_dir: str, name: str) -> Optional[Dict[str, Any]]:
+    """The candidate's stored record, or None if missing or its resume file changed since."""
+    record = _read(job_dir, name)
+    if record is None:
+        return None
+    if _stamp(os.path.join(job_dir, "resumes", record.get("file") or "")) != record.get("stamp"):
+        return None
+    return record
+
+
+def match_spans(record: Dict[str, Any], tokens, skills=()) -> List[List]:
+    """
+    Non-overlapping [term, kind, start, end] spans of the record's words in `tokens` and
+    skill mentions in `skills`, in text order; a longer span wins an overlap.
+    """
+    tokens = set(tokens or [])
+    skills = set(skills or [])
+    found = [[t, "keyword", s, e] for t, s, e in record.get("words") or [] if t in tokens]
+    found += [[sid, "skill", s, e] for sid, s, e in record.get("skills") or [] if sid in skills]
+    found.sort(key=lambda span: (span[2], span[2] - span[3]))
+    out = []
+    last_end = -1
+    for span in found:
+        if span[2] >= last_end:
+            out.append(span)
+            last_end = span[3]
+    return out
+
+
+def _squash(segment: str) -> str:
+    """Collapse whitespace runs (PDF line breaks) to single spaces, keeping edge spaces."""
+    if not segment:
+        return ""
+    inner = " ".join(segment.split())
+    lead = " " if segment[0].isspace() else ""
+    trail = " " if segment[-1].isspace() and inner else ""
+    return lead + inner + trail
+
+
+def _mark(text: str, start: int, end: int, spans: List[List], squash: bool = True) -> str:
+    """HTML of text[start:end] with each span wrapped in <mark>."""
+    clean = _squash if squash else (lambda segment: segment)
+    parts = []
+    pos = start
+    for term, kind, s, e in spans:
+        parts.append(html.escape(clean(text[pos:s])))
+        parts.append(f'<mark class="hl-{kind}" data-term="{html.escape(term)}">{html.escape(text[s:e])}</mark>')
+        pos = e
+    parts.append(html.escape(clean(text[pos:end])))
+    return "".join(parts)
+
+
+def snippets(text: str, spans: List[List], context: int = SNIPPET_CONTEXT, limit: int = MAX_SNIPPETS) -> List[Dict[str, Any]]:
+    """
+    Up to `limit` excerpts around the matches (context characters either side, merged
+    when they touch), preferring those with the most distinct matched terms.
+    """
+    windows = []
+    for span in spans:
+        lo, hi = max(0, span[2] - context), min(len(text), span[3] + context)
+        if windows and lo <= windows[-1]["end"]:
+            windows[-1]["end"] = max(windows[-1]["end"], hi)
+            windows[-1]["spans"].append(span)
+        else:
+            windows.append({"start": lo, "end": hi, "spans": [span]})
+    best = sorted(windows, key=lambda w: (-len({s[0] for s in w["spans"]}), w["start"]))[:limit]
+    out = []
+    for w in sorted(best, key=lambda w: w["start"]):
+        start, end = w["start"], w["end"]
+        # Do not cut words at the window edges
+        if start > 0:
+            cut = text.find(" ", start, w["spans"][0][2])
+            start = cut + 1 if cut != -1 else start
+        if end < len(text):
+            cut = text.rfind(" ", w["spans"][-1][3], end)
+            end = cut if cut != -1 else end
+        out.append({
+            "start": start,
+            "end": end,
+            "text": _squash(text[start:end]).strip(),
+            "terms": list(dict.fromkeys(s[0] for s in w["spans"])),
+            "html": ("… " if start > 0 else "") + _mark(text, start, end, w["spans"]).strip() + (" …" if end < len(text) else ""),
+        })
+    return out
+
+
+def render(record: Dict[str, Any], tokens, skills=(), context: int = SNIPPET_CONTEXT,
+           limit: int = MAX_SNIPPETS, full: bool = False) -> Dict[str, Any]:
+    """
+    Highlights of one stored resume for a JD: matched keywords (in `tokens` order), matched
+    skills, and pre-highlighted snippets; with full=True also the whole text and every span.
+    """
+    spans = match_spans(record, tokens, skills)
+    # Membership from all mentions: a keyword inside a longer highlighted skill still matched
+    words = {t for t, _, _ in record.get("words") or []}
+    mentioned = {sid for sid, _, _ in record.get("skills") or []}
+    text = record.get("text") or ""
+    out = {
+        "candidate": record.get("name"),
+        "matched_keywords": [t for t in dict.fromkeys(tokens or []) if t in words],
+        "matched_skills": [{"skill": sid, "name": taxonomy.skill_name(sid)} for sid in dict.fromkeys(skills or []) if sid in mentioned],
+        "match_count": len(spans),
+        "snippets": snippets(text, spans, context=context, limit=limit),
+    }
+    if full:
+        out["text"] = text
+        out["spans"] = spans
+        out["html"] = _mark(text, 0, len(text), spans, squash=False)
+    return out
@@ -0,0 +1,217 @@
+"""
+JD Analysis - one precomputed artifact per JD version
+Parses the JD once (tokens, canonical skills, must-haves, required experience,
+location, work mode, shift) when it is saved, so scorers and prompt builders
+read jobs/<id>/jd_analysis.json instead of re-parsing the JD per candidate.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    from . import taxonomy
+    from . import score_cache
+except ImportError:
+    import taxonomy
+    import score_cache
+
+JD_ANALYSIS_VERSION = 2
+JD_ANALYSIS_FILENAME = "jd_analysis.json"
+
+# Token filters for each scorer (kept here so the artifact and ad-hoc scoring agree)
+SCORING_STOP_WORDS = {
+    "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have",
+    "looking", "team", "work", "year", "years", "experience", "skills", "knowledge",
+    "strong", "proficient", "ability", "using", "from", "role", "responsibility",
+    "description", "requirements", "about", "what", "must", "should", "good", "data",
+    "them", "their", "they", "there", "here", "such", "including", "include", "ensure", "ensuring",
+    "per", "each", "other", "our", "your", "his", "her", "its",
+    "maintain", "maintaining", "maintenance", "test", "tests", "testing",
+    "seeking", "ideal", "candidate", "should", "have", "expertise", "proficiency", "relevant"
+}
+
+KEYWORD_STOP_WORDS = {
+    "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have",
+    "looking", "team", "work", "year", "years", "experience", "skills", "knowledge",
+    "strong", "proficient", "ability", "using", "from", "role", "responsibility",
+    "description", "requirements", "about", "what", "must", "should", "good", "data",
+    "them", "their", "they", "there", "here", "such", "including", "include", "ensure", "ensuring",
+    "per", "each", "other", "our", "your", "his", "her", "its",
+    "maintain", "maintaining", "maintenance", "test", "tests", "testing"
+}
+
+RELEVANCE_STOP_WORDS = {'that', 'this', 'with', 'from', 'have', 'will', 'can', 'are', 'was', 'were', 'been', 'being', 'has', 'had', 'does', 'did', 'do', 'is', 'am', 'an', 'as', 'at', 'be', 'by', 'if', 'in', 'it', 'of', 'on', 'or', 'to', 'we', 'you', 'your', 'our', 'their', 'they', 'them', 'these', 'those', 'which', 'who', 'what', 'when', 'where', 'why', 'how', 'all', 'any', 'but', 'not', 'only', 'some', 'such', 'than', 'then', 'there', 'very', 'would', 'years', 'yrs', 'experience', 'testing', 'manual', 'automation', 'engineer', 'engineers', 'candidate', 'candidates', 'should', 'must', 'required', 'requirements', 'include', 'includes', 'including', 'proficiency', 'expertise', 'strong', 'ideal', 'seeking', 'qualified'}
+
+_EXP_RE = re.compile(r'(\d+)\s*\+?\s*(?:yrs?|years?)')
+_KEY_REQ_RE = re.compile(r'Key Requirements:\s*(.+?)(?:\n\n|\Z)', re.IGNORECASE | re.DOTALL)
+_BULLET_RE = re.compile(r'•\s*(.+?)(?:\n|$)')
+_BULLET_SKILL_RE = re.compile(r'(?:Proficiency in|Experience with|Knowledge of)?\s*([A-Za-z\s]+?)(?:\s*$|\.)', re.IGNORECASE)
+_LOCATION_RE = re.compile(
+    r'\b(?:job\s+location|work\s+location|location|based\s+(?:in|out\s+of)|located\s+in)\s*[:\-–]?\s*'
+    r'([A-Z][A-Za-z .,/&-]{1,60}?)(?:\s*[\n.;(]|$)',
+    re.IGNORECASE,
+)
+_SHIFT_RE = re.compile(r'\b(night|day|rotational|rotating|general|evening|morning|us|uk|emea|apac)\s+shifts?\b', re.IGNORECASE)
+
+
+def unique_in_order(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+def scoring_tokens(text: str) -> List[str]:
+    words = re.findall(r"\b[a-zA-Z]{3,}\b", str(text or "").lower())
+    return [w for w in words if w not in SCORING_STOP_WORDS]
+
+
+def keyword_tokens(text: str) -> List[str]:
+    words = re.findall(r"\b[a-zA-Z]{3,}\b", str(text or "").lower())
+    return [w for w in words if w not in KEYWORD_STOP_WORDS]
+
+
+def relevance_words(text: str) -> set:
+    return set(re.findall(r'\b[a-z]{4,}\b', str(text or "").lower())) - RELEVANCE_STOP_WORDS
+
+
+def required_experience(text: str) -> Optional[int]:
+    m = _EXP_RE.search(str(text or "").lower())
+    return int(m.group(1)) if m else None
+
+
+def text_view(text: str, required_exp: Optional[int] = None) -> Dict[str, Any]:
+    """Everything a scorer needs from one JD text, computed once."""
+    exp = required_experience(text)
+    return {
+        "text": text,
+        "tokens": unique_in_order(scoring_tokens(text)),
+        "match_tokens": unique_in_order(keyword_tokens(text)),
+        "relevance_words": sorted(relevance_words(text)),
+        "skills": taxonomy.extract_skills(text),
+        "required_experience": exp if exp is not None else required_exp,
+    }
+
+
+def key_requirements(jd_text: str) -> str:
+    if "Key Requirements:" not in jd_text:
+        return ""
+    m = _KEY_REQ_RE.search(jd_text)
+    return m.group(1) if m else ""
+
+
+def bullet_skills(key_req_text: str) -> List[str]:
+    """Skill phrases from '• Proficiency in X' style bullets."""
+    skills = []
+    for bp in _BULLET_RE.findall(key_req_text or ""):
+        m = _BULLET_SKILL_RE.search(bp)
+        if m and m.group(1).strip():
+            skills.append(m.group(1).strip())
+    return skills
+
+
+def extract_location(jd_text: str) -> Optional[str]:
+    m = _LOCATION_RE.search(jd_text or "")
+    if not m:
+        return None
+    loc = m.group(1).strip(" ,-/")
+    return loc or None
+
+
+def extract_work_mode(jd_text: str) -> Optional[str]:
+    low = str(jd_text or "").lower()
+    if "hybrid" in low:
+        return "hybrid"
+    if re.search(r'\b(remote|work from home|wfh)\b', low):
+        return "remote"
+    if re.search(r'\b(on-?site|in-?office|work from office|wfo)\b', low):
+        return "onsite"
+    return None
+
+
+def extract_shift(jd_text: str) -> Optional[str]:
+    m = _SHIFT_RE.search(jd_text or "")
+    if not m:
+        return None
+    shift = m.group(1).lower()
+    return "rotational" if shift == "rotating" else shift
+
+
+def analysis_hash(jd_text: str, keywords: List[str]) -> str:
+    return score_cache.text_hash(f"v{JD_ANALYSIS_VERSION}|{taxonomy.taxonomy_version()}|{jd_text}|{'|'.join(keywords or [])}")
+
+
+def analyze_jd(jd_text: str, keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Build the JD analysis artifact.
+    keywords: must_have_keywords from jd_keywords.json (written by improve_jd), if any.
+    """
+    jd_text = str(jd_text or "")
+    keywords = [str(k).strip() for k in (keywords or []) if str(k).strip()]
+    key_req = key_requirements(jd_text)
+    bullets = bullet_skills(key_req)
+    required_exp = required_experience(jd_text)
+
+    # Keyword scorer input: for improved (structured) JDs with must-have keywords
+    # score against the keywords plus bullet skills instead of the boilerplate prose.
+    # Without keywords the full JD is used; bullets only stand in for a near-empty JD.
+    keyword_text = jd_text
+    if key_req:
+        if keywords:
+            keyword_text = " ".join(keywords + bullets)
+        elif len(jd_text) < 20 and bullets:
+            keyword_text = " ".join(bullets)
+
+    # LLM scorer input: the requirements section, prefixed with must-haves when known
+    llm_text = jd_text
+    if key_req:
+        llm_text = f"Required skills: {', '.join(keywords)}. {key_req}" if keywords else key_req
+
+    skills = taxonomy.extract_skills(jd_text)
+    must_haves = unique_in_order(
+        keywords
+        or [taxonomy.skill_name(s) for s in taxonomy.extract_skills(key_req)]
+        or bullets
+        or [taxonomy.skill_name(s) for s in skills]
+    )
+
+    return {
+        "version": JD_ANALYSIS_VERSION,
+        "taxonomy_version": taxonomy.taxonomy_version(),
+        "jd_hash": score_cache.text_hash(jd_text),
+        "analysis_hash": analysis_hash(jd_text, keywords),
+        "created_at": datetime.now().isoformat(),
+        "tokens": unique_in_order(scoring_tokens(jd_text)),
+        "skills": skills,
+        "must_haves": must_haves,
+        "required_experience": required_exp,
+        "location": extract_location(jd_text),
+        "work_mode": extract_work_mode(jd_text),
+        "shift": extract_shift(jd_text),
+        "key_requirements": key_req,
+        "keyword_view": text_view(keyword_text, required_exp),
+        "llm_view": text_view(llm_text, required_exp),
+    }
+
+
+def is_current(analysis: Any, jd_text: str, keywords: Optional[List[str]] = None) -> bool:
+    return (
+        isinstance(analysis, dict)
+        and analysis.get("version") == JD_ANALYSIS_VERSION
+        and analysis.get("analysis_hash") == analysis_hash(str(jd_text or ""), [str(k).strip() for k in (keywords or []) if str(k).strip()])
+    )
+
+
+def facts_block(analysis: Dict[str, Any]) -> str:
+    """Compact structured JD facts for LLM prompts."""
+    if not analysis:
+        return ""
+    lines = []
+    if analysis.get("must_haves"):
+        lines.append(f"Must-have skills: {', '.join(analysis['must_haves'][:12])}")
+    if analysis.get("required_experience") is not None:
+        lines.append(f"Required experience: {analysis['required_experience']}+ years")
+    if analysis.get("location"):
+        lines.append(f"Location: {analysis['location']}")
+    if analysis.get("work_mode"):
+        lines.append(f"Work mode: {analysis['work_mode']}")
+    if analysis.get("shift"):
+        lines.append(f"Shift: {analysis['shift']}")
+    return "\n".join(lines)
@@ -1,18 +1,258 @@
 import os
-from typing import Dict, Any
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple
 import litellm
 
+try:
+    from . import llm_cache
+    from . import llm_metrics
+    from . import partial_json
+except ImportError:
+    import llm_cache
+    import llm_metrics
+    import partial_json
+
 # Environment-driven configuration
 LITELLM_MODEL = os.getenv("LITELLM_MODEL", "hackathon-gemini-2.5-pro")
 LITELLM_API_KEY = os.getenv("LITELLM_API_KEY") or os.getenv("GEMINI_API_KEY")
 LITELLM_TIMEOUT = float(os.getenv("LITELLM_TIMEOUT", "20"))
 LITELLM_API_BASE = os.getenv("LITELLM_BASE_URL") or os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_API_URL")
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Retries for throttling / server errors (exponential backoff, full jitter)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "0.5"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "8"))
+# Circuit breaker: consecutive outage errors before calls fail fast, and for how long
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+# Provider context caching of template prefixes: auto (if LiteLLM says the model supports it), on, off
+LLM_PROMPT_CACHE = os.getenv("LLM_PROMPT_CACHE", "auto").lower()
 
 
 class LLMError(Exception):
     pass
 
 
+class CircuitOpenError(LLMError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+
+# --- CIRCUIT BREAKER ---
+
+class CircuitBreaker:
+    """
+    Shared by every call in the process. Closed: calls pass. After `threshold`
+    consecutive outage errors (timeouts, connection errors, 5xx) it opens and calls
+    fail immediately; after `reset_s` one probe call is let through (half-open) and
+    its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_s: float = LLM_BREAKER_RESET_S):
+        self.threshold = max(threshold, 1)
+        self.reset_s = reset_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.short_circuited = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # A probe that never reports back (cancelled caller) is replaced after reset_s
+            if time.monotonic() - self.opened_at >= self.reset_s:
+                self.state = self.HALF_OPEN  # this caller is the probe
+                self.opened_at = time.monotonic()
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:200]
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(self.reset_s - (time.monotonic() - self.opened_at), 0.0), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "threshold": self.threshold,
+                "reset_s": self.reset_s,
+                "retry_in_s": retry_in,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error,
+            }
+
+
+breaker = CircuitBreaker()
+
+
+def _status_code(error: Exception):
+    code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _is_outage(error: Exception) -> bool:
+    """Errors that say the provider is unreachable or failing, as opposed to a bad request."""
+    if isinstance(error, (litellm.Timeout, litellm.APIConnectionError)):
+        return True
+    code = _status_code(error)
+    return code is not None and code >= 500
+
+
+def _is_retryable(error: Exception) -> bool:
+    # Timeouts already cost LITELLM_TIMEOUT each; retrying them would only stretch an outage
+    if isinstance(error, litellm.Timeout):
+        return False
+    return _status_code(error) == 429 or _is_outage(error)
+
+
+def _backoff_s(attempt: int) -> float:
+    return random.uniform(0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * (2 ** attempt)))
+
+
+def _settle(error: Exception, attempt: int) -> bool:
+    """After a failed attempt: True to retry, else record the outcome on the breaker."""
+    if _is_retryable(error) and attempt < LLM_MAX_RETRIES and breaker.state != CircuitBreaker.OPEN:
+        return True
+    if _is_outage(error):
+        breaker.record_failure(error)
+    else:
+        # The provider answered (bad request, auth, throttling): it is reachable
+        breaker.record_success()
+    return False
+
+
+def _circuit_open_error(call: "llm_metrics.Call" = None) -> CircuitOpenError:
+    if call is not None:
+        call.outcome = "circuit_open"
+    return CircuitOpenError(f"LLM call skipped: circuit open after repeated provider failures ({breaker.last_error})")
+
+
+# --- PROVIDER PROMPT CACHING ---
+
+class Prompt(str):
+    """
+    A rendered prompt (see prompt_templates) that knows its template id and its
+    prefix: the static and job-level text shared by every call of a job.
+    """
+
+    def __new__(cls, text: str, prefix: str = "", template: str = None):
+        obj = super().__new__(cls, text)
+        obj.prefix = prefix
+        obj.template = template
+        return obj
+
+
+@lru_cache(maxsize=32)
+def _context_cache_supported(model: str) -> bool:
+    if LLM_PROMPT_CACHE in ("on", "true", "1"):
+        return True
+    if LLM_PROMPT_CACHE != "auto":
+        return False
+    try:
+        return bool(litellm.utils.supports_prompt_caching(model=model))
+    except Exception:
+        return False
+
+
+def _user_message(prompt: str, use_model: str) -> Dict[str, Any]:
+    prefix = getattr(prompt, "prefix", "")
+    if not prefix or not _context_cache_supported(use_model):
+        return {"role": "user", "content": prompt}
+    # Cache breakpoint after the shared prefix; the per-call rest follows uncached
+    return {"role": "user", "content": [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": prompt[len(prefix):]},
+    ]}
+
+
+def _field(obj, name: str):
+    if obj is None:
+        return None
+    value = getattr(obj, name, None)
+    if value is None and isinstance(obj, dict):
+        value = obj.get(name)
+    return value
+
+
+_prompt_cache_lock = threading.Lock()
+_prompt_cache: Dict[str, Dict[str, float]] = {}
+
+
+def _usage(resp) -> Tuple[int, int, int]:
+    """(prompt, completion, cached prompt) tokens the provider reported for a response or chunk."""
+    usage = _field(resp, "usage")
+    cached = (_field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+              or _field(usage, "cache_read_input_tokens") or 0)
+    return _field(usage, "prompt_tokens") or 0, _field(usage, "completion_tokens") or 0, cached
+
+
+def _record_prompt_cache(prompt: str, prompt_tokens: int, cached: int, latency_s: float):
+    """Provider-reported cached prompt tokens and latency of a live call, per template."""
+    template = getattr(prompt, "template", None)
+    if not template:
+        return
+    with _prompt_cache_lock:
+        entry = _prompt_cache.setdefault(template, {
+            "calls": 0, "hits": 0, "prompt_tokens": 0, "cached_tokens": 0, "hit_latency_s": 0.0, "miss_latency_s": 0.0,
+        })
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["cached_tokens"] += cached
+        if cached:
+            entry["hits"] += 1
+            entry["hit_latency_s"] += latency_s
+        else:
+            entry["miss_latency_s"] += latency_s
+
+
+def prompt_cache_stats() -> Dict[str, Any]:
+    """Per template id: provider cache hit rate, cached share of prompt tokens, mean latency with/without a hit."""
+    with _prompt_cache_lock:
+        out = {}
+        for template, e in _prompt_cache.items():
+            misses = e["calls"] - e["hits"]
+            hit_ms = round(1000 * e["hit_latency_s"] / e["hits"], 1) if e["hits"] else None
+            miss_ms = round(1000 * e["miss_latency_s"] / misses, 1) if misses else None
+            out[template] = {
+                "calls": e["calls"],
+                "hit_rate": round(e["hits"] / e["calls"], 3),
+                "cached_token_share": round(e["cached_tokens"] / e["prompt_tokens"], 3) if e["prompt_tokens"] else 0.0,
+                "mean_latency_ms_hit": hit_ms,
+                "mean_latency_ms_miss": miss_ms,
+                "latency_delta_ms": round(miss_ms - hit_ms, 1) if hit_ms is not None and miss_ms is not None else None,
+            }
+        return out
+
+
 def call_llm(
     prompt: str,
     system: str = "",
@@ -20,40 +260,166 @@ def call_llm(
     temperature: float = 0.3,
     response_format=None,
     model: str = None,
+    site: str = None,
+    cache: bool = True,
 ) -> str:
     """
     Thin wrapper over LiteLLM completion. Expects env vars:
     - LITELLM_API_KEY or GEMINI_API_KEY
     - LITELLM_MODEL (default: hackathon-gemini-2.5-pro)
+    Responses are served from / stored in the response cache (see llm_cache) under the
+    TTL of `site`; pass cache=False for calls whose output should vary between runs.
     """
     if not LITELLM_API_KEY:
         raise LLMError("Missing LITELLM_API_KEY/GEMINI_API_KEY. Please set the environment variable.")
 
-    try:
-        use_model = model or LITELLM_MODEL
-        
-        # Set API key for litellm
-        if LITELLM_API_KEY:
-            os.environ["OPENAI_API_KEY"] = LITELLM_API_KEY
-        
-        resp = litellm.completion(
+    use_model = model or LITELLM_MODEL
+    with llm_metrics.track(site, getattr(prompt, "template", None), use_model) as call:
+        store = llm_cache.get_cache() if cache else None
+        if store is None:
+            return _complete(prompt, system, max_tokens, temperature, response_format, use_model, call=call)
+        key = llm_cache.make_key(use_model, system, prompt, temperature, max_tokens, response_format, LITELLM_API_BASE)
+        return store.get_or_call(
+            key,
+            lambda: _complete(prompt, system, max_tokens, temperature, response_format, use_model, call=call),
+            site=site,
+            model=use_model,
+        )
+
+
+def _completion_kwargs(prompt: str, system: str, max_tokens: int, temperature: float, response_format, use_model: str) -> Dict[str, Any]:
+    # Set API key for litellm
+    if LITELLM_API_KEY:
+        os.environ["OPENAI_API_KEY"] = LITELLM_API_KEY
+    return dict(
+        model=use_model,
+        messages=[
+            {"role": "system", "content": system},
+            _user_message(prompt, use_model),
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        timeout=LITELLM_TIMEOUT,
+        response_format=response_format,
+        api_base=LITELLM_API_BASE,
+        api_key=LITELLM_API_KEY,
+        # Force OpenAI-compatible provider so Gemini names don't trigger Vertex ADC
+        custom_llm_provider="openai" if LITELLM_API_BASE else None,
+        # No SDK/LiteLLM retries: _settle is the only retry layer (and sees every upstream failure)
+        max_retries=0,
+        num_retries=0,
+    )
+
+
+def _complete(prompt: str, system: str, max_tokens: int, temperature: float, response_format, use_model: str,
+              call: llm_metrics.Call = None) -> str:
+    """One live completion (with retries), unless the circuit breaker is open."""
+    if not breaker.allow():
+        raise _circuit_open_error(call)
+    kwargs = _completion_kwargs(prompt, system, max_tokens, temperature, response_format, use_model)
+    attempt = 0
+    while True:
+        if call is not None:
+            call.attempts = attempt + 1
+        try:
+            started = time.monotonic()
+            resp = litellm.completion(**kwargs)
+        except Exception as e:
+            if not _settle(e, attempt):
+                raise LLMError(f"LLM call failed: {e}") from e
+            time.sleep(_backoff_s(attempt))
+            attempt += 1
+            continue
+        breaker.record_success()
+        prompt_tokens, completion_tokens, cached = _usage(resp)
+        _record_prompt_cache(prompt, prompt_tokens, cached, time.monotonic() - started)
+        if call is not None:
+            call.add_usage(prompt_tokens, completion_tokens, cached)
+        try:
+            return resp["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise LLMError(f"LLM call failed: {e}") from e
+
+
+async def _acomplete(prompt: str, system: str, max_tokens: int, temperature: float, response_format, use_model: str,
+                     call: llm_metrics.Call = None) -> str:
+    """Async _complete on the running event loop."""
+    if not breaker.allow():
+        raise _circuit_open_error(call)
+    kwargs = _completion_kwargs(prompt, system, max_tokens, temperature, response_format, use_model)
+    attempt = 0
+    while True:
+        if call is not None:
+            call.attempts = attempt + 1
+        try:
+            started = time.monotonic()
+            resp = await litellm.acompletion(**kwargs)
+        except Exception as e:
+            if not _settle(e, attempt):
+                raise LLMError(f"LLM call failed: {e}") from e
+            await asyncio.sleep(_backoff_s(attempt))
+            attempt += 1
+            continue
+        breaker.record_success()
+        prompt_tokens, completion_tokens, cached = _usage(resp)
+        _record_prompt_cache(prompt, prompt_tokens, cached, time.monotonic() - started)
+        if call is not None:
+            call.add_usage(prompt_tokens, completion_tokens, cached)
+        try:
+            return resp["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise LLMError(f"LLM call failed: {e}") from e
+
+
+async def acall_llm(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 512,
+    temperature: float = 0.3,
+    response_format=None,
+    model: str = None,
+    site: str = None,
+    cache: bool = True,
+) -> str:
+    """Async counterpart of call_llm (litellm.acompletion), sharing its response cache."""
+    if not LITELLM_API_KEY:
+        raise LLMError("Missing LITELLM_API_KEY/GEMINI_API_KEY. Please set the environment variable.")
+
+    use_model = model or LITELLM_MODEL
+    with llm_metrics.track(site, getattr(prompt, "template", None), use_model) as call:
+        store = llm_cache.get_cache() if cache else None
+        if store is None:
+            return await _acomplete(prompt, system, max_tokens, temperature, response_format, use_model, call=call)
+        key = llm_cache.make_key(use_model, system, prompt, temperature, max_tokens, response_format, LITELLM_API_BASE)
+        return await store.aget_or_call(
+            key,
+            lambda: _acomplete(prompt, system, max_tokens, temperature, response_format, use_model, call=call),
+            site=site,
             model=use_model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=max_tokens,
-            temperature=temperature,
-            timeout=LITELLM_TIMEOUT,
-            response_format=response_format,
-            api_base=LITELLM_API_BASE,
-            api_key=LITELLM_API_KEY,
-            # Force OpenAI-compatible provider so Gemini names don't trigger Vertex ADC
-            custom_llm_provider="openai" if LITELLM_API_BASE else None,
         )
-        return resp["choices"][0]["message"]["content"]
+
+
+def _json_system(system: str) -> str:
+    return (system + "\nRespond ONLY with strict JSON.").strip()
+
+
+def _parse_json(content: str, key: str = None) -> Dict[str, Any]:
+    """Parse a model's JSON reply; an unparseable reply is dropped from the response cache."""
+    # Some providers still return fenced JSON; strip if needed.
+    cleaned = (content or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = re.sub(r"^```json", "", cleaned, flags=re.IGNORECASE).strip()
+        cleaned = re.sub(r"^```", "", cleaned).strip()
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3].strip()
+    try:
+        return json.loads(cleaned)
     except Exception as e:
-        raise LLMError(f"LLM call failed: {e}") from e
+        # Never keep serving an unparseable response
+        store = llm_cache.get_cache() if key else None
+        if store is not None:
+            store.delete(key)
+        raise LLMError(f"Invalid JSON from model: {e}; content={cleaned[:200]}") from e
 
 
 def call_llm_json(
@@ -61,33 +427,194 @@ def call_llm_json(
     system: str = "",
     max_tokens: int = 1024,
     temperature: float = 0.2,
+    site: str = None,
+    cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Asks model for JSON and parses it; errors if JSON is invalid.
     """
-    import json
-    import re
-
+    system = _json_system(system)
     content = call_llm(
         prompt=prompt,
-        system=(system + "\nRespond ONLY with strict JSON.").strip(),
+        system=system,
         max_tokens=max_tokens,
         temperature=temperature,
-        response_format={"type": "json_object"},
+        response_format=JSON_RESPONSE_FORMAT,
+        site=site,
+        cache=cache,
     )
-    # Some providers still return fenced JSON; strip if needed.
-    def _strip_json(text: str) -> str:
-        cleaned = text.strip()
-        if cleaned.startswith("```"):
-            cleaned = re.sub(r"^```json", "", cleaned, flags=re.IGNORECASE).strip()
-            cleaned = re.sub(r"^```", "", cleaned).strip()
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3].strip()
-        return cleaned
-
-    cleaned = _strip_json(content or "")
+    key = llm_cache.make_key(LITELLM_MODEL, system, prompt, temperature, max_tokens, JSON_RESPONSE_FORMAT, LITELLM_API_BASE) if cache else None
+    return _parse_json(content, key)
+
+
+async def acall_llm_json(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 1024,
+    temperature: float = 0.2,
+    site: str = None,
+    cache: bool = True,
+) -> Dict[str, Any]:
+    """Async counterpart of call_llm_json."""
+    system = _json_system(system)
+    content = await acall_llm(
+        prompt=prompt,
+        system=system,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        response_format=JSON_RESPONSE_FORMAT,
+        site=site,
+        cache=cache,
+    )
+    key = llm_cache.make_key(LITELLM_MODEL, system, prompt, temperature, max_tokens, JSON_RESPONSE_FORMAT, LITELLM_API_BASE) if cache else None
+    return _parse_json(content, key)
+
+
+# --- STREAMING ---
+
+def _delta_text(chunk) -> str:
     try:
-        return json.loads(cleaned)
-    except Exception as e:
-        raise LLMError(f"Invalid JSON from model: {e}; content={cleaned[:200]}") from e
+        return chunk.choices[0].delta.content or ""
+    except (AttributeError, IndexError, TypeError):
+        try:
+            return chunk["choices"][0]["delta"].get("content") or ""
+        except Exception:
+            return ""
+
 
+def _stream_start(prompt, system, max_tokens, temperature, response_format, model, site, cache):
+    """(model, cache store, cache key, cached text) for a streamed call."""
+    if not LITELLM_API_KEY:
+        raise LLMError("Missing LITELLM_API_KEY/GEMINI_API_KEY. Please set the environment variable.")
+    use_model = model or LITELLM_MODEL
+    store = llm_cache.get_cache() if cache else None
+    if store is None:
+        return use_model, None, None, None
+    key = llm_cache.make_key(use_model, system, prompt, temperature, max_tokens, response_format, LITELLM_API_BASE)
+    return use_model, store, key, store.get(key, site)
+
+
+def stream_llm(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 512,
+    temperature: float = 0.3,
+    response_format=None,
+    model: str = None,
+    site: str = None,
+    cache: bool = True,
+) -> Iterator[str]:
+    """
+    call_llm as an iterator of text deltas. A cached response arrives as one delta;
+    a completed stream is cached like call_llm's result. No retries once streaming.
+    """
+    with llm_metrics.track(site, getattr(prompt, "template", None), model or LITELLM_MODEL, streamed=True) as call:
+        use_model, store, key, cached = _stream_start(prompt, system, max_tokens, temperature, response_format, model, site, cache)
+        if cached is not None:
+            yield cached
+            return
+        if not breaker.allow():
+            raise _circuit_open_error(call)
+        kwargs = dict(_completion_kwargs(prompt, system, max_tokens, temperature, response_format, use_model), stream=True)
+        call.attempts = 1
+        parts = []
+        try:
+            for chunk in litellm.completion(**kwargs):
+                text = _delta_text(chunk)
+                if text:
+                    call.first_token()
+                    parts.append(text)
+                    yield text
+                usage = _usage(chunk)
+                if any(usage):  # only sent by providers that report usage on streams
+                    call.add_usage(*usage)
+        except Exception as e:
+            _settle(e, LLM_MAX_RETRIES)
+            raise LLMError(f"LLM stream failed: {e}") from e
+        breaker.record_success()
+        if store is not None and parts:
+            store.put(key, "".join(parts), site=site, model=use_model)
+
+
+async def astream_llm(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 512,
+    temperature: float = 0.3,
+    response_format=None,
+    model: str = None,
+    site: str = None,
+    cache: bool = True,
+) -> AsyncIterator[str]:
+    """Async generator counterpart of stream_llm (litellm.acompletion)."""
+    with llm_metrics.track(site, getattr(prompt, "template", None), model or LITELLM_MODEL, streamed=True) as call:
+        use_model, store, key, cached = _stream_start(prompt, system, max_tokens, temperature, response_format, model, site, cache)
+        if cached is not None:
+            yield cached
+            return
+        if not breaker.allow():
+            raise _circuit_open_error(call)
+        kwargs = dict(_completion_kwargs(prompt, system, max_tokens, temperature, response_format, use_model), stream=True)
+        call.attempts = 1
+        parts = []
+        try:
+            async for chunk in await litellm.acompletion(**kwargs):
+                text = _delta_text(chunk)
+                if text:
+                    call.first_token()
+                    parts.append(text)
+                    yield text
+                usage = _usage(chunk)
+                if any(usage):  # only sent by providers that report usage on streams
+                    call.add_usage(*usage)
+        except Exception as e:
+            _settle(e, LLM_MAX_RETRIES)
+            raise LLMError(f"LLM stream failed: {e}") from e
+        breaker.record_success()
+        if store is not None and parts:
+            store.put(key, "".join(parts), site=site, model=use_model)
+
+
+def stream_llm_json(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 1024,
+    temperature: float = 0.2,
+    site: str = None,
+    cache: bool = True,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    call_llm_json as a stream: ("partial", snapshot) each time another value of the
+    JSON completes (see partial_json), then ("result", parsed) for the whole reply.
+    """
+    system = _json_system(system)
+    parser = partial_json.PartialJSON()
+    parts = []
+    for delta in stream_llm(prompt, system, max_tokens, temperature, JSON_RESPONSE_FORMAT, site=site, cache=cache):
+        parts.append(delta)
+        snapshot = parser.feed(delta)
+        if snapshot:  # nothing to show while only the outer braces are open
+            yield "partial", snapshot
+    key = llm_cache.make_key(LITELLM_MODEL, system, prompt, temperature, max_tokens, JSON_RESPONSE_FORMAT, LITELLM_API_BASE) if cache else None
+    yield "result", _parse_json("".join(parts), key)
+
+
+async def astream_llm_json(
+    prompt: str,
+    system: str = "",
+    max_tokens: int = 1024,
+    temperature: float = 0.2,
+    site: str = None,
+    cache: bool = True,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Async generator counterpart of stream_llm_json."""
+    system = _json_system(system)
+    parser = partial_json.PartialJSON()
+    parts = []
+    async for delta in astream_llm(prompt, system, max_tokens, temperature, JSON_RESPONSE_FORMAT, site=site, cache=cache):
+        parts.append(delta)
+        snapshot = parser.feed(delta)
+        if snapshot:  # nothing to show while only the outer braces are open
+            yield "partial", snapshot
+    key = llm_cache.make_key(LITELLM_MODEL, system, prompt, temperature, max_tokens, JSON_RESPONSE_FORMAT, LITELLM_API_BASE) if cache else None
+    yield "result", _parse_json("".join(parts), key)
@@ -0,0 +1,239 @@
+"""
+LLM Response Cache - persistent cache of completion responses
+Keyed by (endpoint, model, system, prompt, temperature, max_tokens,
+response_format) in a SQLite file with zlib-compressed values. Entries expire
+per call site (TTL), the file is held under a byte budget by evicting the
+least recently used entries, and concurrent identical requests in this process
+share one upstream call.
+"""
+import os
+import json
+import time
+import zlib
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_responses.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# Evict down to this share of the budget so a full cache does not evict on every write
+EVICT_TO_FRACTION = 0.9
+
+DAY = 86400.0
+# Seconds a response stays valid, per call site ("default" for unnamed sites)
+SITE_TTLS = {
+    "default": 7 * DAY,
+    "resume_score": 90 * DAY,
+    "improve_jd": 30 * DAY,
+    "interview_guide": 30 * DAY,
+    "interview_evaluation": 30 * DAY,
+    "interview_summary": 7 * DAY,
+    "screening_assess": 7 * DAY,
+    "call_script": 7 * DAY,
+    "interview_briefing": 7 * DAY,
+    "interview_insights": 1 * DAY,
+    "offer_assist": 1 * DAY,
+}
+# e.g. LLM_CACHE_TTLS='{"improve_jd": 3600, "default": 86400}'
+try:
+    SITE_TTLS.update({k: float(v) for k, v in json.loads(os.getenv("LLM_CACHE_TTLS") or "{}").items()})
+except (ValueError, AttributeError) as e:
+    print(f"Warning: ignoring invalid LLM_CACHE_TTLS: {e}")
+
+
+def make_key(model: str, system: str, prompt: str, temperature: float, max_tokens: int,
+             response_format=None, api_base: Optional[str] = None) -> str:
+    payload = json.dumps(
+        [api_base or "", model, system, prompt, float(temperature), int(max_tokens), response_format],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def site_ttl(site: Optional[str]) -> float:
+    return SITE_TTLS.get(site or "default", SITE_TTLS["default"])
+
+
+class LLMCache:
+    """One SQLite file shared by every call site; safe to use from several threads."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.shared: Dict[str, int] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, site TEXT, model TEXT, value BLOB, size INTEGER,"
+            " created REAL, expires REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str, site: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires, size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= row[2]
+                row = None
+            bucket = self.hits if row is not None else self.misses
+            bucket[site or "default"] = bucket.get(site or "default", 0) + 1
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: str, value: str, site: Optional[str] = None, model: str = "", ttl: Optional[float] = None):
+        blob = zlib.compress(str(value).encode("utf-8"), 6)
+        now = time.time()
+        expires = now + (site_ttl(site) if ttl is None else ttl)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, site, model, value, size, created, expires, last_used, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, site or "default", model, blob, len(blob), now, expires, now),
+            )
+            self._bytes += len(blob) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICT_TO_FRACTION))
+
+    def delete(self, key: str):
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= old[0]
+
+    def _evict(self, target: int):
+        """Drop expired entries, then least recently used ones until the file holds <= target bytes."""
+        now = time.time()
+        expired = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires < ?", (now,)).fetchone()[0]
+        self._db.execute("DELETE FROM responses WHERE expires < ?", (now,))
+        self._bytes -= expired
+        if self._bytes <= target:
+            return
+        doomed, freed = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if self._bytes - freed <= target:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._bytes -= freed
+
+    def get_or_call(self, key: str, fn: Callable[[], str], site: Optional[str] = None, model: str = "",
+                    ttl: Optional[float] = None) -> str:
+        """
+        Cached value for key, else fn() stored under it. Concurrent callers with the same
+        key wait for the first one's upstream call instead of issuing their own.
+        """
+        cached = self.get(key, site)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.shared[site or "default"] = self.shared.get(site or "default", 0) + 1
+        if not owner:
+            return future.result()
+        try:
+            value = fn()
+            if value:
+                self.put(key, value, site=site, model=model, ttl=ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_call(self, key: str, fn: Callable[[], Awaitable[str]], site: Optional[str] = None,
+                           model: str = "", ttl: Optional[float] = None) -> str:
+        """Async get_or_call: fn returns a coroutine; shares in-flight calls with sync callers."""
+        cached = self.get(key, site)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.shared[site or "default"] = self.shared.get(site or "default", 0) + 1
+        if not owner:
+            # Shielded: a waiter timing out must not cancel the owner's shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            value = await fn()
+            if value:
+                self.put(key, value, site=site, model=model, ttl=ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            sites = list(set(self.hits) | set(self.misses) | set(self.shared))
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "sites": {
+                    s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0), "shared_inflight": self.shared.get(s, 0)}
+                    for s in sorted(sites)
+                },
+            }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._bytes = 0
+
+
+_cache: Optional[LLMCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Process-wide cache, opened on first use; None when disabled or the file cannot be opened."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_guard:
+            if _cache is None:
+                try:
+                    _cache = LLMCache()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Warning: LLM response cache unavailable: {e}")
+                    return None
+    return _cache
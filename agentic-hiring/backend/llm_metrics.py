@@ -0,0 +1,285 @@
+"""
+LLM Metrics - structured telemetry for every LLM call
+One row per call (job, call site, prompt template, model, latency, prompt /
+completion / cached tokens, estimated cost, response-cache hit, retries,
+outcome) and one per fallback (site and reason), kept in a local SQLite file.
+aggregate() groups the rows by job, site, template or model, with latency
+percentiles over the calls that reached the provider.
+"""
+import os
+import time
+import inspect
+import sqlite3
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import litellm
+
+LLM_METRICS_ENABLED = os.getenv("LLM_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_METRICS_PATH = os.getenv("LLM_METRICS_PATH", os.path.join("cache", "llm_metrics.sqlite3"))
+LLM_METRICS_RETENTION_DAYS = float(os.getenv("LLM_METRICS_RETENTION_DAYS", "30"))
+# USD per 1K tokens; when unset the price comes from LiteLLM's model map (None if the model is unknown)
+LLM_COST_PER_1K_PROMPT = os.getenv("LLM_COST_PER_1K_PROMPT")
+LLM_COST_PER_1K_COMPLETION = os.getenv("LLM_COST_PER_1K_COMPLETION")
+
+GROUP_COLUMNS = {"job": "job_id", "site": "site", "template": "template", "model": "model"}
+COLUMNS = (
+    "ts", "kind", "job_id", "site", "template", "model", "outcome", "error", "fallback_reason",
+    "latency_ms", "first_token_ms", "prompt_tokens", "completion_tokens", "cached_tokens",
+    "cost_usd", "cache_hit", "retries", "streamed",
+)
+
+_job: contextvars.ContextVar = contextvars.ContextVar("llm_metrics_job", default=None)
+
+
+# --- JOB ATTRIBUTION ---
+
+@contextmanager
+def job(job_id: Optional[str]):
+    """Attribute LLM calls and fallbacks inside the block (incl. asyncio tasks and to_thread) to job_id."""
+    token = _job.set(job_id)
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+
+def for_job(fn):
+    """Decorator: run fn inside job(<its job_id argument>)."""
+    signature = inspect.signature(fn)
+
+    def job_of(args, kwargs):
+        try:
+            return signature.bind_partial(*args, **kwargs).arguments.get("job_id")
+        except TypeError:
+            return None
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with job(job_of(args, kwargs)):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with job(job_of(args, kwargs)):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# --- CALL RECORDS ---
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    if LLM_COST_PER_1K_PROMPT or LLM_COST_PER_1K_COMPLETION:
+        return (prompt_tokens * float(LLM_COST_PER_1K_PROMPT or 0)
+                + completion_tokens * float(LLM_COST_PER_1K_COMPLETION or 0)) / 1000.0
+    try:
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return prompt_cost + completion_cost
+    except Exception:
+        return None
+
+
+class Call:
+    """One LLM call as llm sees it; filled in while the call runs and written when it ends."""
+
+    def __init__(self, site: Optional[str], template: Optional[str], model: str, streamed: bool = False):
+        self.ts = time.time()
+        self.started = time.monotonic()
+        self.job_id = _job.get()
+        self.site = site or "default"
+        self.template = template
+        self.model = model
+        self.streamed = streamed
+        self.outcome = "ok"
+        self.error = None
+        self.attempts = 0  # provider requests made (0 = answered from the response cache)
+        self.first_token_ms = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = None
+
+    def add_usage(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        self.cached_tokens += cached_tokens or 0
+        cost = estimate_cost(self.model, prompt_tokens or 0, completion_tokens or 0)
+        if cost is not None:
+            self.cost_usd = (self.cost_usd or 0.0) + cost
+
+    def first_token(self):
+        if self.first_token_ms is None:
+            self.first_token_ms = (time.monotonic() - self.started) * 1000
+
+    def row(self) -> Dict[str, Any]:
+        return {
+            "ts": self.ts, "kind": "call", "job_id": self.job_id, "site": self.site, "template": self.template,
+            "model": self.model, "outcome": self.outcome, "error": self.error, "fallback_reason": None,
+            "latency_ms": round((time.monotonic() - self.started) * 1000, 2), "first_token_ms": self.first_token_ms,
+            "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens, "cost_usd": self.cost_usd,
+            "cache_hit": int(self.attempts == 0 and self.outcome == "ok"),
+            "retries": max(self.attempts - 1, 0), "streamed": int(self.streamed),
+        }
+
+
+@contextmanager
+def track(site: Optional[str], template: Optional[str], model: str, streamed: bool = False):
+    """Yields a Call for llm to fill in; it is stored when the block exits (errors are re-raised)."""
+    call = Call(site, template, model, streamed)
+    try:
+        yield call
+    except GeneratorExit:
+        call.outcome = "cancelled"
+        raise
+    except BaseException as e:
+        if call.outcome == "ok":
+            call.outcome = "error"
+        call.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        store = get_store()
+        if store is not None:
+            store.record(call.row())
+
+
+def record_fallback(site: str, reason: Any):
+    """A caller replaced an LLM answer with a heuristic/default one."""
+    store = get_store()
+    if store is None:
+        return
+    if not isinstance(reason, str):
+        reason = f"{type(reason).__name__}: {reason}" if str(reason) else type(reason).__name__
+    store.record({"ts": time.time(), "kind": "fallback", "job_id": _job.get(), "site": site or "default",
+                  "outcome": "fallback", "fallback_reason": str(reason)[:300]})
+
+
+# --- STORE ---
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)], 2)
+
+
+class MetricsStore:
+    """Append-only SQLite table of call/fallback rows; safe to use from several threads."""
+
+    def __init__(self, path: str = LLM_METRICS_PATH, retention_days: float = LLM_METRICS_RETENTION_DAYS):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_calls ("
+            " ts REAL, kind TEXT, job_id TEXT, site TEXT, template TEXT, model TEXT, outcome TEXT, error TEXT,"
+            " fallback_reason TEXT, latency_ms REAL, first_token_ms REAL, prompt_tokens INTEGER,"
+            " completion_tokens INTEGER, cached_tokens INTEGER, cost_usd REAL, cache_hit INTEGER,"
+            " retries INTEGER, streamed INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_calls_ts ON llm_calls(ts)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_calls_job ON llm_calls(job_id, ts)")
+        if retention_days > 0:
+            self._db.execute("DELETE FROM llm_calls WHERE ts < ?", (time.time() - retention_days * 86400,))
+
+    def record(self, row: Dict[str, Any]):
+        """Insert one row. A failed insert (locked or full database) is logged, never raised into the call."""
+        try:
+            with self._lock:
+                self._db.execute(
+                    f"INSERT INTO llm_calls ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    tuple(row.get(c) for c in COLUMNS),
+                )
+        except sqlite3.Error as e:
+            print(f"Warning: LLM metrics row not recorded: {e}")
+
+    def rows(self, since: Optional[float] = None, job_id: Optional[str] = None, site: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = [], []
+        for clause, value in (("ts >= ?", since), ("job_id = ?", job_id), ("site = ?", site)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM llm_calls" + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY ts"
+        with self._lock:
+            return [dict(zip(COLUMNS, r)) for r in self._db.execute(sql, params)]
+
+    def aggregate(self, by: str = "site", since: Optional[float] = None, job_id: Optional[str] = None,
+                  site: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Per group (by: job, site, template or model, or None for one total): calls,
+        errors, fallbacks (with top reasons), response-cache hit rate, retries, tokens,
+        cost, and latency percentiles over the calls answered by the provider.
+        """
+        if by is not None and by not in GROUP_COLUMNS:
+            raise ValueError(f"by must be one of: {', '.join(GROUP_COLUMNS)}")
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self.rows(since, job_id, site):
+            groups.setdefault(str(row[GROUP_COLUMNS[by]]) if by else "all", []).append(row)
+        return {name: self._summarize(rows) for name, rows in sorted(groups.items())}
+
+    @staticmethod
+    def _summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        calls = [r for r in rows if r["kind"] == "call"]
+        fallbacks = [r for r in rows if r["kind"] == "fallback"]
+        live = sorted(r["latency_ms"] for r in calls if not r["cache_hit"] and r["outcome"] == "ok")
+        first = sorted(r["first_token_ms"] for r in calls if r["first_token_ms"] is not None)
+        costs = [r["cost_usd"] for r in calls if r["cost_usd"] is not None]
+        reasons: Dict[str, int] = {}
+        for r in fallbacks:
+            reasons[r["fallback_reason"]] = reasons.get(r["fallback_reason"], 0) + 1
+        outcomes: Dict[str, int] = {}
+        for r in calls:
+            outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+        hits = sum(r["cache_hit"] for r in calls)
+        return {
+            "calls": len(calls),
+            "outcomes": outcomes,
+            "cache_hits": hits,
+            "cache_hit_rate": round(hits / len(calls), 3) if calls else None,
+            "retries": sum(r["retries"] or 0 for r in calls),
+            "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in calls),
+            "completion_tokens": sum(r["completion_tokens"] or 0 for r in calls),
+            "cached_tokens": sum(r["cached_tokens"] or 0 for r in calls),
+            "cost_usd": round(sum(costs), 6) if costs else None,
+            "latency_ms": {
+                "count": len(live),
+                "mean": round(sum(live) / len(live), 2) if live else None,
+                "p50": _percentile(live, 50),
+                "p90": _percentile(live, 90),
+                "p99": _percentile(live, 99),
+                "max": live[-1] if live else None,
+            },
+            "first_token_ms_p50": _percentile(first, 50),
+            "fallbacks": len(fallbacks),
+            "fallback_reasons": dict(sorted(reasons.items(), key=lambda kv: -kv[1])[:5]),
+        }
+
+
+_store: Optional[MetricsStore] = None
+_store_guard = threading.Lock()
+
+
+def get_store() -> Optional[MetricsStore]:
+    """Process-wide metrics store, opened on first use; None when disabled or the file cannot be opened."""
+    global _store
+    if not LLM_METRICS_ENABLED:
+        return None
+    if _store is None:
+        with _store_guard:
+            if _store is None:
+                try:
+                    _store = MetricsStore()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Warning: LLM metrics store unavailable: {e}")
+                    return None
+    return _store
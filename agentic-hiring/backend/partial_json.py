@@ -0,0 +1,100 @@
+"""
+Partial JSON - incremental parsing of a JSON document while it streams in
+Text is fed chunk by chunk; the parser tracks string/escape state and the open
+containers, remembers the last point where every value so far was complete, and
+parses that prefix with the open containers closed. Values only appear once
+complete (no half strings), so each snapshot is valid and only ever grows.
+"""
+import json
+from typing import Any, List, Optional
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class PartialJSON:
+    """feed(chunk) -> a new snapshot of the document parsed so far, or None if nothing new completed."""
+
+    def __init__(self):
+        self._text: List[str] = []
+        self._length = 0
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        # One entry per open container: [opener, expecting_key]
+        self._stack: List[List] = []
+        self._safe = 0            # text length up to the last safe cut point
+        self._safe_closers = ""   # closers for the containers open at that point
+        self._parsed_at = -1
+        self.snapshot: Optional[Any] = None
+
+    def _mark_safe(self, end: int):
+        self._safe = end
+        self._safe_closers = "".join(_CLOSERS[frame[0]] for frame in reversed(self._stack))
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        if not chunk or self._done:
+            return None
+        if not self._started:
+            # Skip anything before the document (code fences, prose)
+            starts = [i for i in (chunk.find("{"), chunk.find("[")) if i != -1]
+            if not starts:
+                return None
+            chunk = chunk[min(starts):]
+            self._started = True
+        base = self._length
+        for offset, ch in enumerate(chunk):
+            pos = base + offset
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    frame = self._stack[-1] if self._stack else None
+                    # A closed string is a complete value unless it is an object key
+                    if frame is None or frame[0] == "[" or not frame[1]:
+                        self._mark_safe(pos + 1)
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append([ch, ch == "{"])
+                self._mark_safe(pos + 1)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._mark_safe(pos + 1)
+                if not self._stack:
+                    # Document complete: ignore trailing fences or prose
+                    self._done = True
+                    chunk = chunk[:offset + 1]
+                    break
+            elif ch == ",":
+                # Numbers and literals end here; the cut excludes the comma itself
+                self._mark_safe(pos)
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][1] = True
+            elif ch == ":":
+                if self._stack:
+                    self._stack[-1][1] = False
+        self._text.append(chunk)
+        self._length += len(chunk)
+        return self._parse()
+
+    def _parse(self) -> Optional[Any]:
+        if self._safe <= self._parsed_at or not self._safe:
+            return None
+        text = "".join(self._text)
+        self._text = [text]
+        candidate = text[:self._safe].rstrip().rstrip(",") + self._safe_closers
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            return None
+        self._parsed_at = self._safe
+        if value == self.snapshot:
+            return None
+        self.snapshot = value
+        return value
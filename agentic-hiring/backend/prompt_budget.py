@@ -0,0 +1,225 @@
+"""
+Prompt Budget - token-budgeted prompt assembly
+A prompt is a template plus named context blocks (JD, resume, transcript...).
+Tokens are counted with the model's tokenizer (cached), the per-call budget
+left after the fixed template text is shared across blocks by priority, and a
+block that does not fit is cut on a section, then sentence, then word boundary.
+Per-block token usage is returned with the prompt and aggregated per call site.
+"""
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import litellm
+
+try:
+    from . import llm
+except ImportError:
+    import llm
+
+CHARS_PER_TOKEN = 4  # fallback estimate when no tokenizer is available
+TRUNCATION_MARK = " […]"
+# Per call site prompt budgets (tokens, template + blocks); PROMPT_BUDGET_<SITE> overrides
+DEFAULT_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+SITE_BUDGETS = {
+    "resume_score": 1800,
+    "interview_guide": 2000,
+    "interview_evaluation": 2600,
+    "interview_summary": 1600,
+    "improve_jd": 1400,
+    "offer_assist": 1200,
+    "call_script": 1200,
+    "call_simulation": 1400,
+    "interview_briefing": 1500,
+    "interview_insights": 900,
+}
+
+_SECTION_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\n")
+
+
+@lru_cache(maxsize=1)
+def _probe_tokenizer(model: str) -> bool:
+    try:
+        litellm.encode(model=model, text="probe")
+        return True
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of text for the model's tokenizer (chars/4 estimate if it cannot be loaded)."""
+    if not text:
+        return 0
+    model = model or llm.LITELLM_MODEL
+    if _probe_tokenizer(model):
+        try:
+            encoded = litellm.encode(model=model, text=text)
+            return len(getattr(encoded, "ids", encoded))
+        except Exception:
+            pass
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def site_budget(site: Optional[str]) -> int:
+    env = os.getenv(f"PROMPT_BUDGET_{str(site or '').upper()}")
+    if env:
+        return int(env)
+    return SITE_BUDGETS.get(site or "", DEFAULT_BUDGET)
+
+
+def _fit(pieces: List[str], sep: str, limit: int, model: Optional[str]) -> Tuple[List[str], Optional[str]]:
+    """Longest prefix of pieces within limit tokens, and the first piece that did not fit."""
+    kept, used = [], 0
+    sep_tokens = count_tokens(sep, model) if sep.strip() else 0
+    for piece in pieces:
+        cost = count_tokens(piece, model) + (sep_tokens if kept else 0)
+        if used + cost > limit:
+            return kept, piece
+        kept.append(piece)
+        used += cost
+    return kept, None
+
+
+def truncate(text: str, limit: int, model: Optional[str] = None) -> str:
+    """
+    text cut to at most `limit` tokens: whole sections (blank-line separated) first,
+    then whole sentences/lines of the next section, then words if one sentence is too long.
+    """
+    text = str(text or "").strip()
+    if count_tokens(text, model) <= limit:
+        return text
+    budget = limit - count_tokens(TRUNCATION_MARK, model)
+    if budget <= 0:
+        return ""
+    sections = [s.strip() for s in _SECTION_RE.split(text) if s.strip()]
+    kept, partial = _fit(sections, "\n\n", budget, model)
+    out = "\n\n".join(kept)
+    if partial is not None:
+        room = budget - count_tokens(out + "\n\n", model) if kept else budget
+        sentences = [s.strip() for s in _SENTENCE_RE.split(partial) if s.strip()]
+        head, cut = _fit(sentences, " ", room, model) if room > 0 else ([], None)
+        if not head and not kept and room > 0:
+            # A single overlong sentence: fall back to whole words
+            words, _ = _fit(partial.split(), " ", room, model)
+            head = [" ".join(words)] if words else []
+        if head:
+            out = (out + "\n\n" if out else "") + " ".join(head)
+    # Pieces are counted separately; make sure joining them did not tip it over
+    while out and count_tokens(out + TRUNCATION_MARK, model) > limit:
+        out = out.rsplit(" ", 1)[0] if " " in out else ""
+    return out + TRUNCATION_MARK if out else ""
+
+
+class Block:
+    """
+    A named context block. Lower priority numbers are filled first; min_tokens is
+    reserved even against higher-priority blocks, max_tokens caps the block.
+    """
+
+    def __init__(self, name: str, text: Any, priority: int = 1, min_tokens: int = 0, max_tokens: Optional[int] = None):
+        self.name = name
+        self.text = str(text if text is not None else "")
+        self.priority = priority
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _record(site: str, usage: Dict[str, Any]):
+    with _stats_lock:
+        entry = _stats.setdefault(site, {"prompts": 0, "tokens": 0, "over_budget": 0, "blocks": {}})
+        entry["prompts"] += 1
+        entry["budget"] = usage["budget"]
+        entry["tokens"] += usage["total_tokens"]
+        entry["over_budget"] += int(usage["total_tokens"] > usage["budget"])
+        for name, b in usage["blocks"].items():
+            agg = entry["blocks"].setdefault(name, {"tokens": 0, "original_tokens": 0, "truncated": 0})
+            agg["tokens"] += b["tokens"]
+            agg["original_tokens"] += b["original_tokens"]
+            agg["truncated"] += int(b["truncated"])
+
+
+def allot(blocks: List[Block], remaining: int, model: Optional[str] = None) -> Dict[str, int]:
+    """Tokens per block out of `remaining`, by priority, keeping later blocks' minimums available."""
+    wanted = {}
+    for b in blocks:
+        need = count_tokens(b.text.strip(), model)
+        wanted[b.name] = min(need, b.max_tokens) if b.max_tokens is not None else need
+    allotted = {}
+    ordered = sorted(blocks, key=lambda b: b.priority)
+    for i, b in enumerate(ordered):
+        reserve = sum(min(o.min_tokens, wanted[o.name]) for o in ordered[i + 1:])
+        allotted[b.name] = max(min(wanted[b.name], remaining - reserve), min(b.min_tokens, wanted[b.name], remaining))
+        remaining = max(remaining - allotted[b.name], 0)
+    return allotted
+
+
+def build(template: str, blocks: List[Block], values: Optional[Dict[str, Any]] = None, budget: Optional[int] = None,
+          site: Optional[str] = None, model: Optional[str] = None,
+          allotted: Optional[Dict[str, int]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fill `template` (str.format syntax) with `values` as given and each block's
+    {name} placeholder within `budget` tokens (default: the site's budget).
+    `allotted` fixes the token allotment of some blocks up front; the others share what is left.
+    Returns (prompt, usage) where usage has the template's fixed tokens and
+    per-block {tokens, original_tokens, allotted, truncated}.
+    """
+    budget = budget or site_budget(site)
+    values = dict(values or {})
+    fixed = template.format(**values, **{b.name: "" for b in blocks})
+    fixed_tokens = count_tokens(fixed, model)
+    preset = dict(allotted or {})
+    remaining = max(budget - fixed_tokens - sum(preset.values()), 0)
+    allotted = {**allot([b for b in blocks if b.name not in preset], remaining, model), **preset}
+
+    filled, usage_blocks = {}, {}
+    for b in blocks:
+        original = count_tokens(b.text.strip(), model)
+        text = truncate(b.text, allotted[b.name], model)
+        filled[b.name] = text
+        usage_blocks[b.name] = {
+            "tokens": count_tokens(text, model),
+            "original_tokens": original,
+            "allotted": allotted[b.name],
+            "truncated": text != b.text.strip(),
+        }
+    prompt = template.format(**values, **filled)
+    usage = {
+        "budget": budget,
+        "fixed_tokens": fixed_tokens,
+        "total_tokens": fixed_tokens + sum(u["tokens"] for u in usage_blocks.values()),
+        "blocks": usage_blocks,
+    }
+    if site:
+        _record(site, usage)
+    return prompt, usage
+
+
+def stats() -> Dict[str, Any]:
+    """Per call site: prompts built, mean tokens, and per-block mean tokens / truncation rate."""
+    with _stats_lock:
+        out = {}
+        for site, entry in _stats.items():
+            n = entry["prompts"] or 1
+            out[site] = {
+                "prompts": entry["prompts"],
+                "budget": entry.get("budget"),
+                "mean_tokens": round(entry["tokens"] / n, 1),
+                "over_budget": entry["over_budget"],
+                "blocks": {
+                    name: {
+                        "mean_tokens": round(b["tokens"] / n, 1),
+                        "mean_original_tokens": round(b["original_tokens"] / n, 1),
+                        "truncated_rate": round(b["truncated"] / n, 3),
+                    }
+                    for name, b in entry["blocks"].items()
+                },
+            }
+        return out
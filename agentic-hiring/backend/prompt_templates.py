@@ -0,0 +1,419 @@
+"""
+Prompt Templates - named, versioned templates for every LLM call site
+A template has three sections, always rendered in this order: static
+instructions (incl. the JSON shape), job-level context (JD, parsed JD facts) and
+per-call context (candidate, transcript...). Everything before the per-call
+section is the same for every call of a job, so providers with prefix caching
+can reuse it; where the provider supports explicit context caching, llm sends
+that prefix as a cacheable part. Provider cache hits and latency are reported
+per template (see stats).
+"""
+import string
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+try:
+    from . import llm
+    from . import prompt_budget
+except ImportError:
+    import llm
+    import prompt_budget
+
+# Marks the end of the cacheable prefix in the joined template text (removed when rendering)
+PREFIX_END = "\x1e"
+
+
+def _fields(text: str) -> Set[str]:
+    return {field.split(".")[0].split("[")[0] for _, field, _, _ in string.Formatter().parse(text) if field}
+
+
+class Template:
+    """
+    instructions / job / call are str.format templates ({{ }} for literal braces);
+    instructions may not reference any field, so the prefix only varies per job.
+    """
+
+    def __init__(self, name: str, version: int, instructions: str, job: str = "", call: str = ""):
+        self.name = name
+        self.version = version
+        self.instructions = instructions.strip()
+        self.job = job.strip()
+        self.call = call.strip()
+        # Precompiled once: field names per section and the joined template text
+        self.fields = {"instructions": _fields(self.instructions), "job": _fields(self.job), "call": _fields(self.call)}
+        if self.fields["instructions"]:
+            raise ValueError(f"Template {self.id}: instructions must be static, found {sorted(self.fields['instructions'])}")
+        prefix = "\n\n".join(part for part in (self.instructions, self.job) if part)
+        self._text = "\n" + prefix + "\n" + PREFIX_END + ("\n" + self.call + "\n" if self.call else "")
+
+    def _skeleton_tokens(self, model: Optional[str]) -> int:
+        """Tokens of the template text with every field left empty."""
+        fields = set().union(*self.fields.values())
+        return prompt_budget.count_tokens(self._text.format(**{f: "" for f in fields}), model)
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render(self, blocks: Iterable[prompt_budget.Block] = (), values: Optional[Dict[str, Any]] = None,
+               budget: Optional[int] = None, site: Optional[str] = None, model: Optional[str] = None,
+               call_template: str = "") -> Tuple["llm.Prompt", Dict[str, Any]]:
+        """
+        Fill the template through prompt_budget.build (site defaults to the template name).
+        Job-section blocks are allotted their tokens before, and independently of, the
+        per-call blocks, which share the rest of the budget.
+        call_template is appended to the per-call section, for a variable number of blocks.
+        Returns (prompt, usage); the prompt carries its cacheable prefix and template id.
+        """
+        blocks = list(blocks)
+        site = site or self.name
+        budget = budget or prompt_budget.site_budget(site)
+        # The job section is budgeted first and on its own: its blocks get the same tokens whatever
+        # the per-call blocks hold, so the cacheable prefix only changes when the job does
+        job_blocks = [b for b in blocks if b.name in self.fields["job"]]
+        reserved = self._skeleton_tokens(model) + sum(b.min_tokens for b in blocks if b not in job_blocks)
+        job_allotted = prompt_budget.allot(job_blocks, max(budget - reserved, 0), model)
+        text = self._text + (call_template + "\n" if call_template else "")
+        prompt, usage = prompt_budget.build(text, blocks, values=values, budget=budget, site=site, model=model,
+                                            allotted=job_allotted)
+        head, tail = prompt.split(PREFIX_END, 1)
+        return llm.Prompt(head + tail, prefix=head, template=self.id), usage
+
+
+REGISTRY: Dict[str, Template] = {}
+
+
+def register(name: str, version: int, instructions: str, job: str = "", call: str = "") -> Template:
+    if name in REGISTRY:
+        raise ValueError(f"Template {name} is already registered ({REGISTRY[name].id})")
+    REGISTRY[name] = Template(name, version, instructions, job, call)
+    return REGISTRY[name]
+
+
+def get(name: str) -> Template:
+    return REGISTRY[name]
+
+
+def render(name: str, blocks: Iterable[prompt_budget.Block] = (), values: Optional[Dict[str, Any]] = None,
+           **kwargs) -> Tuple["llm.Prompt", Dict[str, Any]]:
+    return REGISTRY[name].render(blocks, values, **kwargs)
+
+
+def stats() -> Dict[str, Any]:
+    """Per registered template: version, fields per section, and provider prompt-cache hits / latency."""
+    provider = llm.prompt_cache_stats()
+    return {
+        name: {
+            "id": t.id,
+            "version": t.version,
+            "job_fields": sorted(t.fields["job"]),
+            "call_fields": sorted(t.fields["call"]),
+            "provider_cache": provider.get(t.id, {}),
+        }
+        for name, t in sorted(REGISTRY.items())
+    }
+
+
+# --- TEMPLATES ---
+
+register("interview_guide", 1, """
+You are an interview co-pilot. Create a tailored question set for the interview round given below.
+Ground questions in both the JD and THIS candidate's resume. Avoid generic repeats; cite tools/skills seen in the resume.
+Return JSON only:
+{{
+  "fundamentals": [ "..." ],
+  "depth": [ "..." ],
+  "design_or_system": [ "..." ],
+  "behavioral": [ "..." ],
+  "red_flags": [ "..." ]
+}}
+""", job="""
+Context:
+JD facts (parsed):
+{jd_facts}
+
+JD (truncated):
+{jd_text}
+""", call="""
+Round: {round_type}
+
+Candidate snapshot:
+score: {score}
+matches: {matches_readable}
+contact_email: {contact_email}
+contact_phone: {contact_phone}
+
+Resume excerpt (truncate to what you need):
+{resume_excerpt}
+""")
+
+register("interview_evaluation", 1, """
+You are an interview evaluator for the interview round given below.
+Return JSON with:
+{{
+  "overall_score_0_10": number,
+  "skill_scores": {{"skill": number}},
+  "strengths": ["..."],
+  "concerns": ["..."],
+  "hire_recommendation": "yes|maybe|no",
+  "rationale": "short paragraph",
+  "matched_keywords": ["..."]
+}}
+""", job="""
+JD facts (parsed):
+{jd_facts}
+
+JD:
+{jd_text}
+""", call="""
+Round: {round_type}
+
+Candidate snapshot:
+score: {score}
+matches: {matches}
+
+Transcript/Q&A:
+{transcript}
+""")
+
+register("interview_summary", 1, """
+You are summarizing multi-round interviews. Create a concise rollup.
+Return JSON:
+{{
+  "final_recommendation": "yes|maybe|no",
+  "overall_score_0_10": number,
+  "strengths": ["..."],
+  "concerns": ["..."],
+  "risks": ["..."],
+  "next_steps": ["..."]
+}}
+""", call="""
+Round evaluations:
+{evaluations}
+""")
+
+register("improve_jd", 1, """
+You are a JD improvement assistant. Given the JD, tighten it, highlight must-have skills, and return improved text plus a keyword list.
+Return JSON:
+{{
+  "improved_jd": "...",
+  "must_have_keywords": ["..."],
+  "risks": ["..."]
+}}
+""", job="""
+JD:
+{jd_text}
+""")
+
+register("resume_score", 1, """
+Score this resume against the JD requirements. Be strict - only high scores for strong matches.
+Return JSON:
+{{
+  "score_0_10": number (0-10, be conservative),
+  "matched_keywords": ["..."],
+  "rationale": "short explanation"
+}}
+""", job="""
+JD Requirements:
+{scoring_jd}
+""", call="""
+Resume:
+{resume_text}
+""")
+
+register("resume_score_batch", 1, """
+Score each resume against the JD requirements. Be strict - only high scores for strong matches.
+Score every resume independently; do not rank them against each other.
+Return JSON:
+{{
+  "results": [
+    {{"id": "<resume id>", "score_0_10": number (0-10, be conservative), "matched_keywords": ["..."], "rationale": "short explanation"}}
+  ]
+}}
+One entry per resume, using the resume ids given with the resumes.
+""", job="""
+JD Requirements:
+{scoring_jd}
+""", call="""
+Resume ids: {ids}
+
+Resumes:
+""")
+
+register("screening_assess", 1, """
+You are an expert recruitment assessor. Some screening criteria were already verified from the call transcript; do not re-assess them.
+Assess ONLY the open criteria listed below, from the transcript excerpt.
+
+Return JSON:
+{{
+  "criteria": {{"<criterion>": {{"points": 0.0, "finding": "..."}}}},
+  "assessment": "concise summary of findings",
+  "hire_recommendation": "yes|maybe|no",
+  "risks": ["list of concerns"],
+  "next_questions": ["questions for next round"]
+}}
+""", job="""
+JD facts (parsed):
+{jd_facts}
+""", call="""
+Verified (fixed points):
+{settled}
+
+Open criteria to assess:
+{open_items}
+
+Candidate Resume Snapshot:
+Initial Score: {score}/10
+Key Keywords: {matches}
+
+Transcript excerpt:
+{excerpt}
+""")
+
+register("offer_assist", 1, """
+Draft a concise offer summary. Return JSON:
+{{
+  "summary": "short paragraph",
+  "risks": ["..."],
+  "negotiation_points": ["..."],
+  "salary_recommendation": "..."
+}}
+""", job="""
+JD facts (parsed):
+{jd_facts}
+
+JD:
+{jd_text}
+""", call="""
+Candidate:
+score: {score}
+matches: {matches}
+target_salary: {salary}
+""")
+
+register("suggest_slots", 1, """
+Propose 4 interview slot options in the next 7 days. Return JSON:
+{{
+  "slots": [
+    {{"day": "Mon", "time": "10:00", "timezone": "local", "note": "..."}},
+    ...
+  ]
+}}
+Keep concise.
+""")
+
+register("call_script", 1, """
+Generate a structured call script for a recruiter call with the candidate below, of the call type given.
+
+Return JSON:
+{{
+    "greeting": "opening line",
+    "questions": [
+        {{"question": "...", "purpose": "...", "expected_response": "..."}},
+        ...
+    ],
+    "closing": "closing statement",
+    "key_points_to_verify": ["...", "..."],
+    "red_flags_to_watch": ["...", "..."]
+}}
+
+Focus on:
+- Experience verification
+- Location/remote availability
+- Notice period
+- Salary expectations
+- Cultural fit questions
+""", job="""
+Job Description:
+{jd_text}
+""", call="""
+Call type: {call_type}
+Candidate: {candidate_name}
+
+Candidate Resume (excerpt):
+{resume_text}
+""")
+
+register("call_simulation", 1, """
+Simulate a realistic phone call transcript between an AI recruiter and the candidate named below, following the call script.
+The candidate might be a perfect match, or might have issues like:
+- Location mismatch (e.g. Pune vs Gurgaon)
+- Salary expectations higher than budget
+- Shift preferences (e.g. only weeks, but job needs rotational)
+- Tech skills that don't perfectly align with the script.
+
+Return JSON:
+{{
+    "transcript": "full conversation transcript",
+    "duration_seconds": number,
+    "key_findings": ["...", "..."],
+    "verification_results": {{
+        "experience_verified": boolean,
+        "location_match": boolean,
+        "notice_period": "string",
+        "salary_expectation": "string",
+        "shift_preference": "string"
+    }},
+    "overall_assessment": "short paragraph"
+}}
+
+Make it realistic, professional, and slightly varying based on candidate quality.
+""", call="""
+Candidate: {candidate_name}
+
+Call Script:
+{call_script}
+""")
+
+register("interview_briefing", 1, """
+Generate a concise interview briefing for the interviewer.
+
+Return JSON:
+{{
+    "candidate_summary": "2-3 sentence summary",
+    "key_strengths": ["...", "..."],
+    "areas_to_probe": ["...", "..."],
+    "red_flags_to_watch": ["...", "..."],
+    "recommended_questions": ["...", "..."],
+    "evaluation_criteria": {{
+        "technical_skills": "what to assess",
+        "communication": "what to assess",
+        "cultural_fit": "what to assess"
+    }}
+}}
+""", job="""
+Job Description:
+{jd_text}
+""", call="""
+Candidate Resume:
+{resume_text}
+
+Interview Guide:
+{guide}
+""")
+
+register("interview_insights", 1, """
+Analyze the latest candidate response in real-time and provide insights.
+
+Return JSON:
+{{
+    "response_quality": "excellent|good|fair|poor",
+    "key_points_mentioned": ["...", "..."],
+    "strengths_demonstrated": ["...", "..."],
+    "concerns": ["...", "..."],
+    "suggested_followup": "next question to ask",
+    "red_flags": ["..."],
+    "confidence_score": 0-10
+}}
+""", job="""
+Job Description:
+{jd_text}
+""", call="""
+Recent Questions:
+{recent_q}
+
+Latest Candidate Response:
+{latest_response}
+
+Previous Responses:
+{previous}
+""")
@@ -0,0 +1,398 @@
+"""
+Resume Token Index - per-job inverted index for incremental rescoring
+Stores each resume's word set, taxonomy skills and stated experience once, as
+postings lists (term -> candidate rows) in NumPy arrays. The keyword scorer's
+per-candidate match counts and keyword lists for the last scored JD are kept
+alongside, so a JD edit only touches the candidates holding the added/removed
+terms instead of re-reading and re-tokenizing every resume.
+"""
+import os
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import jd_analysis
+    from . import taxonomy
+except ImportError:
+    import jd_analysis
+    import taxonomy
+
+RESUME_INDEX_VERSION = 1
+INDEX_DIRNAME = "resume_index"
+INDEX_FILENAME = "index.json"
+OFFSETS_FILENAME = "term_offsets.npy"
+ROWS_FILENAME = "term_rows.npy"
+STATE_FILENAME = "state.json"
+
+# Words dropped by both keyword-scorer tokenizers never match a JD token, so they are not indexed
+_INDEX_STOP_WORDS = jd_analysis.KEYWORD_STOP_WORDS & jd_analysis.SCORING_STOP_WORDS
+WORD_PREFIX = "w:"
+SKILL_PREFIX = "s:"
+COUNT_CHUNK_ROWS = 2048  # resume rows per dense block in count_matrix
+
+
+def resume_terms(text: str) -> Tuple[List[str], Optional[int]]:
+    """Index terms (words + canonical skills) and stated years of experience for one resume."""
+    words = set(re.findall(r"\b[a-zA-Z]{3,}\b", str(text or "").lower())) - _INDEX_STOP_WORDS
+    terms = [WORD_PREFIX + w for w in sorted(words)]
+    terms += [SKILL_PREFIX + s for s in taxonomy.extract_skills(text)]
+    return terms, jd_analysis.required_experience(text)
+
+
+def file_stamp(path: str) -> str:
+    """Cheap change detector (size + mtime) for resume files already hashed at ingest."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _store_dir(job_dir: str) -> str:
+    return os.path.join(job_dir, INDEX_DIRNAME)
+
+
+class ResumeIndex:
+    """Postings for one job, CSR layout: rows of term i are term_rows[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, job_dir: str, meta: Optional[Dict] = None,
+                 offsets: Optional[np.ndarray] = None, rows: Optional[np.ndarray] = None):
+        self.job_dir = job_dir
+        meta = meta or {}
+        self.names: List[str] = list(meta.get("names", []))
+        self.files: List[str] = list(meta.get("files", []))
+        self.hashes: List[str] = list(meta.get("hashes", []))
+        self.stamps: List[str] = list(meta.get("stamps", []))
+        self.exp: List[int] = list(meta.get("exp", []))
+        self.vocab: List[str] = list(meta.get("vocab", []))
+        self.term_id = {t: i for i, t in enumerate(self.vocab)}
+        self.row_of = {n: i for i, n in enumerate(self.names)}
+        self.offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self.rows = rows if rows is not None else np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def postings(self, term: str) -> np.ndarray:
+        tid = self.term_id.get(term)
+        if tid is None:
+            return self.rows[:0]
+        return self.rows[self.offsets[tid]:self.offsets[tid + 1]]
+
+    def _gather(self, terms: List[str], prefix: str) -> np.ndarray:
+        parts = [self.postings(prefix + t) for t in terms]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+
+    def counts(self, terms: List[str], prefix: str) -> np.ndarray:
+        """Per-row number of the given terms present in each resume."""
+        return np.bincount(self._gather(terms, prefix), minlength=len(self)).astype(np.int32)
+
+    def count_matrix(self, term_lists: List[List[str]], prefix: str) -> np.ndarray:
+        """
+        (rows x lists) matrix: how many of each list's terms every resume contains.
+        Postings of the union of terms are read once; a 0/1 resume-by-term block
+        times a term-by-list incidence matrix gives all lists' counts together.
+        """
+        out = np.zeros((len(self), len(term_lists)), dtype=np.float32)
+        union: Dict[int, int] = {}
+        inc_terms, inc_lists = [], []
+        for j, terms in enumerate(term_lists):
+            for t in dict.fromkeys(terms):
+                tid = self.term_id.get(prefix + t)
+                if tid is None:
+                    continue
+                inc_terms.append(union.setdefault(tid, len(union)))
+                inc_lists.append(j)
+        if not union or not len(self):
+            return out
+        incidence = np.zeros((len(union), len(term_lists)), dtype=np.float32)
+        incidence[inc_terms, inc_lists] = 1.0
+        tids = np.fromiter(union.keys(), dtype=np.int64, count=len(union))
+        lengths = (self.offsets[tids + 1] - self.offsets[tids]).astype(np.int64)
+        post_rows = np.concatenate([self.rows[self.offsets[t]:self.offsets[t + 1]] for t in tids.tolist()])
+        post_terms = np.repeat(np.arange(len(union), dtype=np.int64), lengths)
+        order = np.argsort(post_rows, kind="stable")
+        post_rows, post_terms = post_rows[order], post_terms[order]
+        for lo in range(0, len(self), COUNT_CHUNK_ROWS):
+            hi = min(lo + COUNT_CHUNK_ROWS, len(self))
+            a, b = np.searchsorted(post_rows, [lo, hi])
+            block = np.zeros((hi - lo, len(union)), dtype=np.float32)
+            block[post_rows[a:b] - lo, post_terms[a:b]] = 1.0
+            out[lo:hi] = block @ incidence
+        return out
+
+    def keyword_lists(self, match_tokens: List[str], rows: Optional[np.ndarray] = None) -> Dict[int, List[str]]:
+        """JD-ordered matched keywords per row (only rows in `rows` when given; rows without matches are omitted)."""
+        mask = None
+        if rows is not None:
+            mask = np.zeros(len(self), dtype=bool)
+            mask[rows] = True
+        hit_rows, hit_pos = [], []
+        for pos, token in enumerate(match_tokens):
+            p = self.postings(WORD_PREFIX + token)
+            if mask is not None:
+                p = p[mask[p]]
+            if len(p):
+                hit_rows.append(p)
+                hit_pos.append(np.full(len(p), pos, dtype=np.int32))
+        if not hit_rows:
+            return {}
+        r = np.concatenate(hit_rows)
+        o = np.concatenate(hit_pos)
+        order = np.lexsort((o, r))
+        r, o = r[order], o[order]
+        bounds = np.flatnonzero(np.diff(r)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(r)]))
+        return {int(r[s]): [match_tokens[i] for i in o[s:e].tolist()] for s, e in zip(starts, ends)}
+
+    def save(self):
+        path = _store_dir(self.job_dir)
+        os.makedirs(path, exist_ok=True)
+        # Write-then-rename: the arrays may be memmaps of the very files being replaced
+        for filename, arr in ((OFFSETS_FILENAME, np.asarray(self.offsets, dtype=np.int64)),
+                              (ROWS_FILENAME, np.asarray(self.rows, dtype=np.int32))):
+            tmp_path = os.path.join(path, filename + ".tmp.npy")
+            np.save(tmp_path, arr)
+            os.replace(tmp_path, os.path.join(path, filename))
+        meta = {
+            "version": RESUME_INDEX_VERSION,
+            "taxonomy_version": taxonomy.taxonomy_version(),
+            "names": self.names,
+            "files": self.files,
+            "hashes": self.hashes,
+            "stamps": self.stamps,
+            "exp": self.exp,
+            "vocab": self.vocab,
+        }
+        tmp_path = os.path.join(path, INDEX_FILENAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, INDEX_FILENAME))
+
+
+def load_index(job_dir: str) -> ResumeIndex:
+    path = _store_dir(job_dir)
+    meta_path = os.path.join(path, INDEX_FILENAME)
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("version") == RESUME_INDEX_VERSION and meta.get("taxonomy_version") == taxonomy.taxonomy_version():
+                offsets = np.load(os.path.join(path, OFFSETS_FILENAME), mmap_mode="r")
+                rows = np.load(os.path.join(path, ROWS_FILENAME), mmap_mode="r")
+                if len(offsets) == len(meta.get("vocab", [])) + 1:
+                    return ResumeIndex(job_dir, meta, offsets, rows)
+        except Exception:
+            pass
+    return ResumeIndex(job_dir)
+
+
+def indexed_hashes(job_dir: str) -> Dict[str, str]:
+    """Candidate name -> content hash for every resume already indexed."""
+    index = load_index(job_dir)
+    return dict(zip(index.names, index.hashes))
+
+
+def upsert_resumes(job_dir: str, items: List[Tuple[str, str, str, str]]) -> int:
+    """
+    Index resumes for a job. items: [(candidate_name, file_path, content_hash, text)].
+    Unchanged content hashes are skipped (text may be None for those). If a scoring state exists its rows are
+    brought up to date for the re-indexed candidates. Returns number of rows indexed.
+    """
+    items = list({name: (name, path, h, text) for name, path, h, text in items}.values())
+    index = load_index(job_dir)
+    pending = []
+    restamped = False
+    for name, path, content_hash, text in items:
+        i = index.row_of.get(name)
+        if i is not None and index.hashes[i] == content_hash:
+            # Same content re-uploaded: only the file name / stamp may have moved
+            if (index.files[i], index.stamps[i]) != (os.path.basename(path), file_stamp(path)):
+                index.files[i] = os.path.basename(path)
+                index.stamps[i] = file_stamp(path)
+                restamped = True
+            continue
+        pending.append((name, path, content_hash, resume_terms(text)))
+    if not pending:
+        if restamped:
+            index.save()
+        return 0
+
+    changed_rows = []
+    new_terms, new_rows = [], []
+    for name, path, content_hash, (terms, exp) in pending:
+        i = index.row_of.get(name)
+        if i is None:
+            i = len(index.names)
+            index.row_of[name] = i
+            index.names.append(name)
+            index.files.append("")
+            index.hashes.append("")
+            index.stamps.append("")
+            index.exp.append(-1)
+        index.files[i] = os.path.basename(path)
+        index.hashes[i] = content_hash
+        index.stamps[i] = file_stamp(path)
+        index.exp[i] = -1 if exp is None else int(exp)
+        changed_rows.append(i)
+        for t in terms:
+            tid = index.term_id.get(t)
+            if tid is None:
+                tid = len(index.vocab)
+                index.term_id[t] = tid
+                index.vocab.append(t)
+            new_terms.append(tid)
+            new_rows.append(i)
+
+    # Rebuild CSR: drop the changed rows' old postings, append their new ones, regroup by term
+    old_terms = np.repeat(np.arange(len(index.offsets) - 1, dtype=np.int32), np.diff(index.offsets))
+    old_rows = np.asarray(index.rows, dtype=np.int32)
+    keep = ~np.isin(old_rows, np.asarray(changed_rows, dtype=np.int32))
+    terms = np.concatenate([old_terms[keep], np.asarray(new_terms, dtype=np.int32)])
+    rows = np.concatenate([old_rows[keep], np.asarray(new_rows, dtype=np.int32)])
+    order = np.lexsort((rows, terms))
+    index.rows = rows[order]
+    index.offsets = np.concatenate(([0], np.cumsum(np.bincount(terms, minlength=len(index.vocab))))).astype(np.int64)
+    index.save()
+
+    state = load_state(job_dir, index)
+    if state is not None:
+        _refresh_state_rows(index, state, np.asarray(changed_rows, dtype=np.int32))
+        save_state(job_dir, state)
+    return len(pending)
+
+
+# --- SCORING STATE (keyword scorer results for the last JD view) ---
+# Keyword lists are kept JSON-encoded, exactly as written to cv_scores.csv.
+
+def _view_terms(view: Dict) -> Dict:
+    return {
+        "tokens": list(view.get("tokens") or []),
+        "match_tokens": list(view.get("match_tokens") or []),
+        "skills": list(view.get("skills") or []),
+        "required_experience": view.get("required_experience"),
+    }
+
+
+def load_state(job_dir: str, index: ResumeIndex) -> Optional[Dict]:
+    path = os.path.join(_store_dir(job_dir), STATE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+    except Exception:
+        return None
+    if state.get("version") != RESUME_INDEX_VERSION or len(state.get("common", [])) > len(index):
+        return None
+    # Rows appended since the state was saved start empty; callers refresh them
+    missing = len(index) - len(state["common"])
+    state["common"] += [0] * missing
+    state["skill_hits"] += [0] * missing
+    state["keywords"] += ["[]"] * missing
+    return state
+
+
+def save_state(job_dir: str, state: Dict):
+    path = os.path.join(_store_dir(job_dir), STATE_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(state))
+    os.replace(tmp_path, path)
+
+
+def _refresh_state_rows(index: ResumeIndex, state: Dict, rows: np.ndarray):
+    view = state["view"]
+    common = index.counts(view["tokens"], WORD_PREFIX)
+    skill_hits = index.counts(view["skills"], SKILL_PREFIX)
+    keywords = index.keyword_lists(view["match_tokens"], rows)
+    for r in rows.tolist():
+        state["common"][r] = int(common[r])
+        state["skill_hits"][r] = int(skill_hits[r])
+        state["keywords"][r] = json.dumps(keywords.get(r, []))
+
+
+def build_state(job_dir: str, view: Dict, analysis_hash: str) -> Dict:
+    """Compute the keyword scorer's per-row counts and keyword lists from scratch and persist them."""
+    index = load_index(job_dir)
+    keywords = index.keyword_lists(view.get("match_tokens") or [])
+    state = {
+        "version": RESUME_INDEX_VERSION,
+        "analysis_hash": analysis_hash,
+        "view": _view_terms(view),
+        "common": index.counts(view.get("tokens") or [], WORD_PREFIX).tolist(),
+        "skill_hits": index.counts(view.get("skills") or [], SKILL_PREFIX).tolist(),
+        "keywords": [json.dumps(keywords.get(r, [])) for r in range(len(index))],
+    }
+    save_state(job_dir, state)
+    return state
+
+
+def apply_jd_delta(job_dir: str, view: Dict, analysis_hash: str, index: Optional[ResumeIndex] = None) -> Optional[Dict]:
+    """
+    Move the stored scoring state to a new JD view by applying only the token,
+    skill and keyword-order differences. Returns None when there is no state to
+    update (callers fall back to a full rescore). The result carries the index
+    so callers can map rows back to candidates and resume files. Pass an
+    already loaded index to avoid reading it twice.
+    """
+    if index is None:
+        index = load_index(job_dir)
+    state = load_state(job_dir, index)
+    if state is None or not len(index):
+        return None
+    old = state["view"]
+    new = _view_terms(view)
+    n = len(index)
+
+    old_t, new_t = set(old["tokens"]), set(new["tokens"])
+    added = [t for t in new["tokens"] if t not in old_t]
+    removed = [t for t in old["tokens"] if t not in new_t]
+    common = np.asarray(state["common"], dtype=np.int32)
+    if added or removed:
+        common += index.counts(added, WORD_PREFIX) - index.counts(removed, WORD_PREFIX)
+
+    old_s, new_s = set(old["skills"]), set(new["skills"])
+    skills_added = [s for s in new["skills"] if s not in old_s]
+    skills_removed = [s for s in old["skills"] if s not in new_s]
+    skill_hits = np.asarray(state["skill_hits"], dtype=np.int32)
+    if skills_added or skills_removed:
+        skill_hits += index.counts(skills_added, SKILL_PREFIX) - index.counts(skills_removed, SKILL_PREFIX)
+
+    # Keyword lists follow JD order: only rows holding an added/removed token change,
+    # unless the surviving tokens were reordered, in which case every list is rebuilt.
+    old_m, new_m = set(old["match_tokens"]), set(new["match_tokens"])
+    m_added = [t for t in new["match_tokens"] if t not in old_m]
+    m_removed = [t for t in old["match_tokens"] if t not in new_m]
+    keywords = state["keywords"]
+    if [t for t in old["match_tokens"] if t in new_m] != [t for t in new["match_tokens"] if t in old_m]:
+        touched = np.arange(n, dtype=np.int32)
+    else:
+        touched = np.unique(index._gather(m_added + m_removed, WORD_PREFIX))
+    if len(touched):
+        fresh = index.keyword_lists(new["match_tokens"], touched)
+        for r in touched.tolist():
+            keywords[r] = json.dumps(fresh.get(r, []))
+
+    state.update({
+        "analysis_hash": analysis_hash,
+        "view": new,
+        "common": common.tolist(),
+        "skill_hits": skill_hits.tolist(),
+        "keywords": keywords,
+    })
+    save_state(job_dir, state)
+    return {
+        "index": index,
+        "common": state["common"],
+        "skill_hits": state["skill_hits"],
+        "keywords": keywords,
+        "jd_token_count": len(new["tokens"]),
+        "required_experience": new["required_experience"],
+        "tokens_added": len(added),
+        "tokens_removed": len(removed),
+        "skills_added": len(skills_added),
+        "skills_removed": len(skills_removed),
+        "rows_touched": int(len(touched)),
+    }
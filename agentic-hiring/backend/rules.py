@@ -0,0 +1,229 @@
+"""
+Candidate Rules Engine - per-job knockout / auto-shortlist rules
+Rules are plain JSON (field, op, value conditions joined by all/any) compiled
+once into vectorized predicates over the candidates DataFrame and the job's
+resume index, so a rule set is evaluated for every candidate in one pass.
+The first matching rule decides a candidate's new status.
+"""
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import taxonomy
+    from . import resume_index
+except ImportError:
+    import taxonomy
+    import resume_index
+
+ACTIONS = {
+    "shortlist": "Shortlisted",
+    "reject": "Rejected",
+    "interview": "Interview Ready",
+}
+# Manual decisions (Shortlisted, Interviewing, Offer...) are never overridden by default
+DEFAULT_APPLY_TO = ["New", "Screened", "AI Screened"]
+
+NUMERIC_OPS = {
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+}
+TEXT_OPS = {"==", "!=", "in", "not_in", "contains"}
+SKILL_OPS = {"has", "missing", "has_all", "has_any"}
+WORD_OPS = {"contains", "not_contains"}
+
+# Virtual fields read from the resume index rather than cv_scores.csv
+FEATURE_FIELDS = {
+    "experience": "Years of experience stated in the resume",
+    "skills": "Taxonomy skills found in the resume",
+    "resume": "Words in the resume text",
+}
+
+
+class RuleContext:
+    """Candidate columns plus lazily built resume features, aligned to the DataFrame rows."""
+
+    def __init__(self, df: pd.DataFrame, index: Optional[resume_index.ResumeIndex] = None):
+        self.df = df
+        self.index = index
+        names = df["name"].astype(str).tolist() if "name" in df.columns else []
+        row_of = index.row_of if index is not None else {}
+        # -1: the candidate is not indexed, every resume feature reads as unknown
+        self.rows = np.asarray([row_of.get(n, -1) for n in names], dtype=np.int64)
+        self._memo: Dict[str, np.ndarray] = {}
+
+    def _term_mask(self, term: str) -> np.ndarray:
+        if term not in self._memo:
+            hit = np.zeros(len(self.index) + 1 if self.index is not None else 1, dtype=bool)
+            if self.index is not None:
+                hit[:-1][self.index.postings(term)] = True
+            self._memo[term] = hit[self.rows]  # row -1 picks the trailing False
+        return self._memo[term]
+
+    def skill(self, skill_id: str) -> np.ndarray:
+        return self._term_mask(resume_index.SKILL_PREFIX + skill_id)
+
+    def word(self, word: str) -> np.ndarray:
+        return self._term_mask(resume_index.WORD_PREFIX + word)
+
+    def experience(self) -> pd.Series:
+        if self.index is None:
+            return pd.Series(np.nan, index=self.df.index)
+        exp = np.append(np.asarray(self.index.exp, dtype=np.float64), -1.0)[self.rows]
+        return pd.Series(np.where(exp >= 0, exp, np.nan), index=self.df.index)
+
+
+def _skill_ids(value) -> List[str]:
+    """Canonical taxonomy ids for a skill or list of skills (unknown names kept lowercase)."""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    out = []
+    for v in values:
+        found = taxonomy.extract_skills(str(v))
+        out.append(found[0] if found else str(v).strip().lower())
+    return out
+
+
+def _compile_condition(cond: Dict[str, Any]) -> Callable[[RuleContext], np.ndarray]:
+    field = cond.get("field")
+    op = cond.get("op")
+    value = cond.get("value")
+    if not field or not op:
+        raise ValueError(f"Condition needs 'field' and 'op': {cond}")
+
+    if field == "skills":
+        if op not in SKILL_OPS:
+            raise ValueError(f"Unsupported op for skills: {op} (use {sorted(SKILL_OPS)})")
+        ids = _skill_ids(value)
+        if not ids:
+            raise ValueError("skills condition needs a value")
+        if op == "has":
+            return lambda ctx: ctx.skill(ids[0])
+        if op == "missing":
+            return lambda ctx: ~ctx.skill(ids[0])
+        if op == "has_all":
+            return lambda ctx: np.logical_and.reduce([ctx.skill(s) for s in ids])
+        return lambda ctx: np.logical_or.reduce([ctx.skill(s) for s in ids])
+
+    if field == "resume":
+        if op not in WORD_OPS:
+            raise ValueError(f"Unsupported op for resume: {op} (use {sorted(WORD_OPS)})")
+        word = str(value or "").strip().lower()
+        if not word or " " in word:
+            raise ValueError("resume conditions match a single word")
+        if op == "contains":
+            return lambda ctx: ctx.word(word)
+        return lambda ctx: ~ctx.word(word)
+
+    if op in NUMERIC_OPS and isinstance(value, (int, float)) and not isinstance(value, bool):
+        if isinstance(value, float) and math.isnan(value):
+            raise ValueError("NaN is not a valid rule value")
+        compare = NUMERIC_OPS[op]
+
+        def numeric(ctx: RuleContext) -> np.ndarray:
+            if field == "experience":
+                col = ctx.experience()
+            elif field in ctx.df.columns:
+                col = pd.to_numeric(ctx.df[field], errors="coerce")
+            else:
+                return np.zeros(len(ctx.df), dtype=bool)
+            # Missing values never satisfy a comparison (NaN compares False)
+            return compare(col, float(value)).to_numpy(dtype=bool)
+        return numeric
+
+    if field in FEATURE_FIELDS:
+        raise ValueError(f"Unsupported op/value for {field}: {op} {value!r}")
+    if op not in TEXT_OPS:
+        raise ValueError(f"Unsupported op: {op}")
+    if op in ("in", "not_in"):
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"'{op}' needs a list value")
+        wanted = {str(v).strip().lower() for v in value}
+    else:
+        wanted = str(value if value is not None else "").strip().lower()
+
+    def text(ctx: RuleContext) -> np.ndarray:
+        if field not in ctx.df.columns:
+            return np.zeros(len(ctx.df), dtype=bool) if op not in ("!=", "not_in") else np.ones(len(ctx.df), dtype=bool)
+        col = ctx.df[field].fillna("").astype(str).str.strip().str.lower()
+        if op == "==":
+            mask = col == wanted
+        elif op == "!=":
+            mask = col != wanted
+        elif op == "in":
+            mask = col.isin(wanted)
+        elif op == "not_in":
+            mask = ~col.isin(wanted)
+        else:
+            mask = col.str.contains(wanted, regex=False)
+        return mask.to_numpy(dtype=bool)
+    return text
+
+
+class CompiledRule:
+    def __init__(self, rule: Dict[str, Any], position: int):
+        self.name = str(rule.get("name") or f"rule_{position + 1}")
+        action = rule.get("action")
+        if action not in ACTIONS:
+            raise ValueError(f"Rule '{self.name}': action must be one of {sorted(ACTIONS)}")
+        self.action = action
+        self.status = ACTIONS[action]
+        self.match = rule.get("match", "all")
+        if self.match not in ("all", "any"):
+            raise ValueError(f"Rule '{self.name}': match must be 'all' or 'any'")
+        conditions = rule.get("conditions") or []
+        if not conditions:
+            raise ValueError(f"Rule '{self.name}' has no conditions")
+        self.predicates = [_compile_condition(c) for c in conditions]
+
+    def evaluate(self, ctx: RuleContext) -> np.ndarray:
+        masks = [p(ctx) for p in self.predicates]
+        return np.logical_and.reduce(masks) if self.match == "all" else np.logical_or.reduce(masks)
+
+
+def normalize_rules(config: Optional[Dict]) -> Dict[str, Any]:
+    """Validate a job's rule set (raises ValueError) and fill defaults."""
+    config = config or {}
+    rules = list(config.get("rules") or [])
+    for i, rule in enumerate(rules):
+        CompiledRule(rule, i)
+    apply_to = config.get("apply_to") or DEFAULT_APPLY_TO
+    return {
+        "rules": rules,
+        "apply_to": [str(s) for s in apply_to],
+        "auto_apply": bool(config.get("auto_apply", True)),
+    }
+
+
+def evaluate(config: Dict[str, Any], df: pd.DataFrame, index: Optional[resume_index.ResumeIndex] = None) -> Dict[str, Any]:
+    """
+    Evaluate a rule set over every candidate at once. Returns {"transitions":
+    {name: new_status}, "rules": [{name, action, matched, applied}]}, where
+    'matched' counts every candidate the rule's conditions select and 'applied'
+    those whose status it actually changes (first matching rule wins, only
+    candidates in an apply_to status move).
+    """
+    compiled = [CompiledRule(rule, i) for i, rule in enumerate(config.get("rules") or [])]
+    if df.empty or not compiled:
+        return {"transitions": {}, "rules": [{"name": r.name, "action": r.action, "matched": 0, "applied": 0} for r in compiled]}
+    ctx = RuleContext(df, index)
+    status = df["status"].fillna("New").astype(str) if "status" in df.columns else pd.Series("New", index=df.index)
+    open_rows = status.isin(config.get("apply_to") or DEFAULT_APPLY_TO).to_numpy(dtype=bool)
+    decided = np.zeros(len(df), dtype=bool)
+    names = df["name"].astype(str).to_numpy()
+    transitions: Dict[str, str] = {}
+    report = []
+    for rule in compiled:
+        matched = rule.evaluate(ctx)
+        take = matched & open_rows & ~decided
+        decided |= take
+        moving = take & (status.to_numpy() != rule.status)
+        for name in names[moving].tolist():
+            transitions[name] = rule.status
+        report.append({"name": rule.name, "action": rule.action, "matched": int(matched.sum()), "applied": int(moving.sum())})
+    return {"transitions": transitions, "rules": report}
@@ -0,0 +1,89 @@
+"""
+Score Cache - persistent per-job cache of scoring results
+Keyed by (resume content hash, normalized JD/keyword hash, scorer id + version),
+so rescoring unchanged resumes against an unchanged JD is a lookup, not a recompute.
+"""
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+SCORE_CACHE_FILENAME = "score_cache.json"
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "200000"))
+
+
+def text_hash(text: str) -> str:
+    """Hash of whitespace/case-normalized text (JD edits that only reflow lines keep their hash)."""
+    normalized = " ".join(str(text or "").lower().split())
+    return hashlib.sha1(normalized.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """Content hash of a resume file (raw bytes; cheaper than text extraction)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(resume_hash: str, jd_hash: str, scorer_id: str, scorer_version: str) -> str:
+    return f"{scorer_id}@{scorer_version}|{jd_hash}|{resume_hash}"
+
+
+class ScoreCache:
+    """JSON-backed cache for one job. Load once per scoring run, save once at the end."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._entries: Dict[str, Any] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+            except Exception:
+                # Corrupted cache: start empty, it is only an optimization
+                self._entries = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        if len(self._entries) > SCORE_CACHE_MAX_ENTRIES:
+            # dicts keep insertion order and put() re-inserts, so this drops the stalest entries
+            overflow = len(self._entries) - SCORE_CACHE_MAX_ENTRIES
+            for key in list(self._entries)[:overflow]:
+                del self._entries[key]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def entries(self, prefix: str = ""):
+        """(key, value) pairs whose key starts with prefix, e.g. "llm@" for every LLM result."""
+        return [(k, v) for k, v in self._entries.items() if k.startswith(prefix)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
+
+
+def open_cache(job_dir: str) -> ScoreCache:
+    return ScoreCache(os.path.join(job_dir, SCORE_CACHE_FILENAME))
@@ -0,0 +1,143 @@
+"""
+Score Stats - per-job score distribution sketch
+Scores live on a 0-10 scale with one decimal, so a 101-bin histogram is an
+exact sketch: percentile ranks, quantiles and histograms are answered from
+it in constant time. The sketch is rewritten whenever cv_scores.csv is
+written through this backend and rebuilt once if the CSV changed elsewhere.
+"""
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCORE_SKETCH_FILENAME = "score_sketch.json"
+SKETCH_VERSION = 1
+BINS = 101  # 0.0, 0.1, ... 10.0
+TOP_PERCENT_BADGE = float(os.getenv("TOP_PERCENT_BADGE", "10"))
+
+
+def csv_stamp(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _bin_of(scores) -> np.ndarray:
+    values = pd.to_numeric(pd.Series(scores), errors="coerce").dropna().to_numpy(dtype=np.float64)
+    return np.rint(np.clip(values, 0.0, 10.0) * 10).astype(np.int64)
+
+
+class ScoreSketch:
+    def __init__(self, counts=None, stamp: Optional[str] = None):
+        self.counts = np.zeros(BINS, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.stamp = stamp
+        self._cum = np.cumsum(self.counts)
+
+    @classmethod
+    def from_scores(cls, scores, stamp: Optional[str] = None) -> "ScoreSketch":
+        return cls(np.bincount(_bin_of(scores), minlength=BINS), stamp)
+
+    @property
+    def total(self) -> int:
+        return int(self._cum[-1])
+
+    def percentile_rank(self, score) -> Optional[float]:
+        """Share of candidates scoring below `score`, counting ties as half (0-100)."""
+        if not self.total or score is None:
+            return None
+        b = int(_bin_of([score])[0]) if not pd.isna(score) else None
+        if b is None:
+            return None
+        below = self._cum[b - 1] if b > 0 else 0
+        return round(100.0 * (below + 0.5 * self.counts[b]) / self.total, 1)
+
+    def percentile_ranks(self, scores) -> List[Optional[float]]:
+        """percentile_rank for many scores at once (None for missing scores)."""
+        values = pd.to_numeric(pd.Series(scores), errors="coerce")
+        if not self.total:
+            return [None] * len(values)
+        bins = np.rint(np.clip(values.fillna(0).to_numpy(dtype=np.float64), 0.0, 10.0) * 10).astype(np.int64)
+        below = np.where(bins > 0, self._cum[np.maximum(bins - 1, 0)], 0)
+        ranks = np.round(100.0 * (below + 0.5 * self.counts[bins]) / self.total, 1)
+        return [None if missing else float(r) for r, missing in zip(ranks, values.isna())]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Smallest score s with at least q of candidates scoring <= s."""
+        if not self.total:
+            return None
+        target = max(1, int(np.ceil(q * self.total)))
+        return round(int(np.searchsorted(self._cum, target)) / 10.0, 1)
+
+    def top_threshold(self, percent: float = TOP_PERCENT_BADGE) -> Optional[float]:
+        """
+        Lowest score s such that candidates scoring >= s are at most `percent` % of the
+        job, so a tie never stretches the badge; if the best score alone is more
+        common than that, the best score.
+        """
+        if not self.total:
+            return None
+        at_or_above = self.total - np.concatenate(([0], self._cum[:-1]))
+        fits = np.flatnonzero((at_or_above <= self.total * percent / 100.0) & (self.counts > 0))
+        if len(fits):
+            return round(int(fits[0]) / 10.0, 1)
+        return round(int(np.flatnonzero(self.counts)[-1]) / 10.0, 1)
+
+    def summary(self, bucket: float = 1.0, score: Optional[float] = None) -> Dict[str, Any]:
+        values = np.arange(BINS) / 10.0
+        out: Dict[str, Any] = {"count": self.total}
+        if self.total:
+            mean = float((self.counts * values).sum() / self.total)
+            var = float((self.counts * (values - mean) ** 2).sum() / self.total)
+            nonzero = np.flatnonzero(self.counts)
+            out.update({
+                "mean": round(mean, 2),
+                "std": round(var ** 0.5, 2),
+                "min": float(values[nonzero[0]]),
+                "max": float(values[nonzero[-1]]),
+                "quantiles": {f"p{int(q * 100)}": self.quantile(q) for q in (0.1, 0.25, 0.5, 0.75, 0.9)},
+                "top_percent_threshold": {"percent": TOP_PERCENT_BADGE, "score": self.top_threshold()},
+            })
+        step = max(1, int(round(bucket * 10)))
+        hist = []
+        for lo in range(0, BINS, step):
+            hi = min(lo + step, BINS)
+            hist.append({"from": lo / 10.0, "to": min(hi / 10.0, 10.0), "count": int(self.counts[lo:hi].sum())})
+        out["histogram"] = hist
+        if score is not None:
+            out["percentile_rank"] = self.percentile_rank(score)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": SKETCH_VERSION, "stamp": self.stamp, "counts": self.counts.tolist()}
+
+
+def _sketch_path(job_dir: str) -> str:
+    return os.path.join(job_dir, SCORE_SKETCH_FILENAME)
+
+
+def record_write(job_dir: str, scores, csv_path: str) -> ScoreSketch:
+    """Refresh the sketch from the scores just written (in memory; no CSV re-read)."""
+    sketch = ScoreSketch.from_scores(scores if scores is not None else [], csv_stamp(csv_path))
+    with open(_sketch_path(job_dir), "w") as f:
+        json.dump(sketch.to_dict(), f)
+    return sketch
+
+
+def load_sketch(job_dir: str, csv_path: str) -> ScoreSketch:
+    """The job's sketch; rebuilt from the CSV only if it was written by something else."""
+    stamp = csv_stamp(csv_path)
+    try:
+        with open(_sketch_path(job_dir), "r") as f:
+            data = json.load(f)
+        if data.get("version") == SKETCH_VERSION and data.get("stamp") == stamp and len(data.get("counts", [])) == BINS:
+            return ScoreSketch(data["counts"], stamp)
+    except (OSError, ValueError):
+        pass
+    if stamp is None:
+        return ScoreSketch()
+    df = pd.read_csv(csv_path)
+    return record_write(job_dir, df["score"] if "score" in df.columns else None, csv_path)
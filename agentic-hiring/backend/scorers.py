@@ -0,0 +1,379 @@
+"""
+Scorer Registry - pluggable candidate scorers
+Each scorer declares an id, a version (part of its score-cache key) and a cost
+class. A job chooses which scorers run, which one is primary (the "score"
+column recruiters see) and which run in shadow; all of them execute together
+in worker pools (one per cost class) and each persists its own score column.
+LLM scorers with an async function instead fan out on one event loop, bounded
+by a semaphore; those with a group function can also pack several resumes into
+one call.
+"""
+import os
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from . import score_cache
+    from . import llm_metrics
+except ImportError:
+    import score_cache
+    import llm_metrics
+
+COST_CHEAP = "cheap"  # in-process CPU work (keyword, heuristic, semantic)
+COST_LLM = "llm"      # one remote model call per candidate
+COST_CLASSES = (COST_CHEAP, COST_LLM)
+
+SCORER_WORKERS = int(os.getenv("SCORER_WORKERS", "4"))
+LLM_SCORER_WORKERS = int(os.getenv("LLM_SCORER_WORKERS", "4"))
+# Async LLM scorers: concurrent upstream calls per run and the per-candidate time limit
+LLM_SCORE_CONCURRENCY = int(os.getenv("LLM_SCORE_CONCURRENCY", "20"))
+LLM_SCORE_TIMEOUT = float(os.getenv("LLM_SCORE_TIMEOUT", "30"))
+LLM_GROUP_TIMEOUT = float(os.getenv("LLM_GROUP_TIMEOUT", "90"))
+CHEAP_BATCH_SIZE = 256
+
+DEFAULT_SCORING_CONFIG = {"primary": "keyword", "scorers": ["keyword"], "shadow": []}
+
+
+class Scorer:
+    """
+    fn(resume_text, jd_view) -> {"score": float, "matching_keywords": [...]}, or
+    batch_fn(job_dir, jd_view) -> {candidate_name: result} for scorers that work
+    off a per-job store instead of resume text (semantic).
+    async_fn: optional coroutine variant of fn; when set, LLM-class runs use it.
+    async_group_fn([(item_id, resume_text)], jd_view) -> {item_id: result}: optional
+    multi-resume coroutine; items missing from its answer are retried one by one.
+    version may be a callable for scorers whose model can change at runtime (distilled).
+    """
+
+    def __init__(self, scorer_id: str, version: str, cost_class: str,
+                 fn: Optional[Callable] = None, batch_fn: Optional[Callable] = None,
+                 jd_view: str = "keyword_view", column: Optional[str] = None,
+                 max_chars: Optional[int] = None, fallback: Optional[str] = None,
+                 description: str = "", async_fn: Optional[Callable] = None,
+                 async_group_fn: Optional[Callable] = None):
+        if cost_class not in COST_CLASSES:
+            raise ValueError(f"Unknown cost class: {cost_class}")
+        if (fn is None) == (batch_fn is None):
+            raise ValueError("A scorer needs exactly one of fn / batch_fn")
+        self.id = scorer_id
+        self._version = version
+        self.cost_class = cost_class
+        self.fn = fn
+        self.batch_fn = batch_fn
+        self.async_fn = async_fn
+        self.async_group_fn = async_group_fn
+        self.jd_view = jd_view
+        self.column = column or f"score_{scorer_id}"
+        self.max_chars = max_chars
+        self.fallback = fallback
+        self.description = description
+
+    @property
+    def version(self) -> str:
+        return str(self._version() if callable(self._version) else self._version)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "version": self.version,
+            "cost_class": self.cost_class,
+            "column": self.column,
+            "fallback": self.fallback,
+            "description": self.description,
+        }
+
+
+_REGISTRY: Dict[str, Scorer] = {}
+
+
+def register(scorer: Scorer) -> Scorer:
+    _REGISTRY[scorer.id] = scorer
+    return scorer
+
+
+def get_scorer(scorer_id: str) -> Scorer:
+    scorer = _REGISTRY.get(scorer_id)
+    if scorer is None:
+        raise ValueError(f"Unknown scorer: {scorer_id}")
+    return scorer
+
+
+def list_scorers() -> List[Dict[str, Any]]:
+    return [s.info() for s in _REGISTRY.values()]
+
+
+def normalize_config(config: Optional[Dict]) -> Dict[str, Any]:
+    """Validate a job's scoring config; the primary scorer always runs and is never a shadow."""
+    config = config or {}
+    primary = config.get("primary") or DEFAULT_SCORING_CONFIG["primary"]
+    get_scorer(primary)
+    active = [primary]
+    for sid in config.get("scorers") or []:
+        get_scorer(sid)
+        if sid not in active:
+            active.append(sid)
+    shadow = []
+    for sid in config.get("shadow") or []:
+        get_scorer(sid)
+        if sid not in active and sid not in shadow:
+            shadow.append(sid)
+    return {"primary": primary, "scorers": active, "shadow": shadow}
+
+
+def pack_groups(items: List[Tuple[Any, str]], max_items: int, max_chars: int) -> List[List[Tuple[Any, str]]]:
+    """
+    Split (item, text) pairs, in order, into groups of at most max_items whose texts
+    total at most max_chars; an item longer than max_chars still gets a group of its own.
+    """
+    groups, current, used = [], [], 0
+    for item in items:
+        size = len(item[1])
+        if current and (len(current) >= max_items or used + size > max_chars):
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+class _TextLoader:
+    """Reads each resume at most once per run, shared by every scorer that misses the cache."""
+
+    def __init__(self, loader: Callable[[str], str]):
+        self._loader = loader
+        self._texts: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def get(self, name: str) -> str:
+        with self._guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._texts:
+                try:
+                    self._texts[name] = self._loader(name) or ""
+                except Exception:
+                    self._texts[name] = ""
+            return self._texts[name]
+
+
+def run_scorers(scorer_ids: List[str], candidates: List[Tuple[str, str]], analysis: Dict,
+                load_text: Callable[[str], str], cache: score_cache.ScoreCache,
+                job_dir: str, group_size: int = 1, group_chars: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several scorers over the same candidates concurrently.
+    candidates: [(candidate_name, resume_content_hash)].
+    Returns {scorer_id: {"results": {name: result}, "fell_back": [names], "scored", "fallbacks",
+    "errors", "skipped", "calls"}}; fell_back lists the candidates the fallback scorer scored and
+    calls counts live scorer invocations (cache hits excluded).
+    Results come from the score cache when the (resume, JD analysis, scorer version) key is known.
+    group_size > 1: scorers with an async_group_fn score up to that many cache misses
+    per call, holding at most group_chars of resume text (0 = no limit).
+    """
+    jd_hash = analysis["analysis_hash"]
+    texts = _TextLoader(load_text)
+    cache_lock = threading.Lock()
+    report = {sid: {"results": {}, "fell_back": [], "scored": 0, "fallbacks": 0, "errors": 0, "skipped": 0, "calls": 0}
+              for sid in scorer_ids}
+
+    def cached(scorer, resume_hash):
+        key = score_cache.make_key(resume_hash, jd_hash, scorer.id, scorer.version)
+        with cache_lock:
+            return key, cache.get(key)
+
+    def store(key, result):
+        with cache_lock:
+            cache.put(key, result)
+
+    def count_call(scorer):
+        with cache_lock:
+            report[scorer.id]["calls"] += 1
+
+    def text_for(scorer, name):
+        text = texts.get(name)
+        return text[:scorer.max_chars] if scorer.max_chars else text
+
+    def fall_back(scorer, name, resume_hash):
+        # Fallback is cached under its own key, so a later run still retries the primary scorer
+        fallback = get_scorer(scorer.fallback)
+        key, hit = cached(fallback, resume_hash)
+        if hit is None:
+            hit = fallback.fn(text_for(fallback, name), analysis[fallback.jd_view])
+            store(key, hit)
+        return hit
+
+    def score_one(scorer, name, resume_hash):
+        key, hit = cached(scorer, resume_hash)
+        if hit is not None:
+            return hit, False
+        text = text_for(scorer, name)
+        if not text.strip():
+            return None, False
+        try:
+            count_call(scorer)
+            result = scorer.fn(text, analysis[scorer.jd_view])
+            store(key, result)
+            return result, False
+        except Exception as e:
+            if not scorer.fallback:
+                raise
+            error = e
+        if scorer.cost_class == COST_LLM:
+            llm_metrics.record_fallback(f"scorer:{scorer.id}", error)
+        return fall_back(scorer, name, resume_hash), True
+
+    async def ascore_one(scorer, name, resume_hash, slots):
+        key, hit = cached(scorer, resume_hash)
+        if hit is not None:
+            return hit, False
+        # Resume parsing is blocking CPU/disk work: keep it off the event loop
+        text = await asyncio.to_thread(text_for, scorer, name)
+        if not text.strip():
+            return None, False
+        try:
+            async with slots:
+                count_call(scorer)
+                result = await asyncio.wait_for(scorer.async_fn(text, analysis[scorer.jd_view]), LLM_SCORE_TIMEOUT)
+            store(key, result)
+            return result, False
+        except Exception as e:
+            if not scorer.fallback:
+                raise
+            llm_metrics.record_fallback(f"scorer:{scorer.id}", e)
+        return await asyncio.to_thread(fall_back, scorer, name, resume_hash), True
+
+    def run_chunk(scorer, chunk):
+        out = []
+        for name, resume_hash in chunk:
+            try:
+                result, fell_back = score_one(scorer, name, resume_hash)
+                out.append((name, result, fell_back, None))
+            except Exception as e:
+                out.append((name, None, False, e))
+        return scorer.id, out
+
+    def run_async(scorer):
+        async def one(name, resume_hash, slots):
+            try:
+                result, fell_back = await ascore_one(scorer, name, resume_hash, slots)
+                return name, result, fell_back, None
+            except Exception as e:
+                return name, None, False, e
+
+        async def fan_out():
+            slots = asyncio.Semaphore(max(LLM_SCORE_CONCURRENCY, 1))
+            # gather keeps candidate order regardless of completion order
+            return await asyncio.gather(*(one(name, resume_hash, slots) for name, resume_hash in candidates))
+
+        return scorer.id, asyncio.run(fan_out())
+
+    def run_grouped(scorer):
+        entry = report[scorer.id]
+        entry.update(groups=0, retried=0)
+
+        async def prepare(name, resume_hash):
+            key, hit = cached(scorer, resume_hash)
+            text = None if hit is not None else await asyncio.to_thread(text_for, scorer, name)
+            return name, resume_hash, key, hit, text
+
+        async def score_group(group, slots, outcome):
+            results = {}
+            try:
+                async with slots:
+                    entry["groups"] += 1
+                    count_call(scorer)
+                    items = [(f"c{i + 1}", text) for i, (_, text) in enumerate(group)]
+                    results = await asyncio.wait_for(scorer.async_group_fn(items, analysis[scorer.jd_view]), LLM_GROUP_TIMEOUT)
+            except Exception:
+                pass
+            retry = []
+            for i, ((name, resume_hash, key), _) in enumerate(group):
+                result = (results or {}).get(f"c{i + 1}")
+                if result is None:
+                    retry.append((name, resume_hash))
+                    continue
+                store(key, result)
+                outcome[name] = (name, result, False, None)
+            # Malformed or missing items fall back to one call per resume
+            entry["retried"] += len(retry)
+            for name, resume_hash in retry:
+                try:
+                    result, fell_back = await ascore_one(scorer, name, resume_hash, slots)
+                    outcome[name] = (name, result, fell_back, None)
+                except Exception as e:
+                    outcome[name] = (name, None, False, e)
+
+        async def fan_out():
+            slots = asyncio.Semaphore(max(LLM_SCORE_CONCURRENCY, 1))
+            prepared = await asyncio.gather(*(prepare(name, resume_hash) for name, resume_hash in candidates))
+            outcome, pending = {}, []
+            for name, resume_hash, key, hit, text in prepared:
+                if hit is not None:
+                    outcome[name] = (name, hit, False, None)
+                elif not text.strip():
+                    outcome[name] = (name, None, False, None)
+                else:
+                    pending.append(((name, resume_hash, key), text))
+            groups = pack_groups(pending, group_size, group_chars or sum(len(t) for _, t in pending) + 1)
+            await asyncio.gather(*(score_group(group, slots, outcome) for group in groups))
+            return [outcome[name] for name, _ in candidates]
+
+        return scorer.id, asyncio.run(fan_out())
+
+    def run_batch(scorer):
+        results = scorer.batch_fn(job_dir, analysis[scorer.jd_view])
+        return scorer.id, [(name, results.get(name), False, None) for name, _ in candidates]
+
+    # One pool per cost class: slow LLM calls never starve the cheap scorers, so
+    # shadow scorers add little wall-clock time next to the primary one
+    pools = {
+        COST_CHEAP: ThreadPoolExecutor(max_workers=max(SCORER_WORKERS, 1)),
+        COST_LLM: ThreadPoolExecutor(max_workers=max(LLM_SCORER_WORKERS, 1)),
+    }
+    futures = []
+
+    def submit(pool, fn, *args):
+        # Workers inherit the caller's context (e.g. the job LLM metrics are attributed to)
+        return pool.submit(contextvars.copy_context().run, fn, *args)
+
+    try:
+        for sid in scorer_ids:
+            scorer = get_scorer(sid)
+            pool = pools[scorer.cost_class]
+            if scorer.batch_fn is not None:
+                futures.append(submit(pool, run_batch, scorer))
+                continue
+            if group_size > 1 and scorer.async_group_fn is not None and scorer.cost_class == COST_LLM:
+                futures.append(submit(pool, run_grouped, scorer))
+                continue
+            if scorer.async_fn is not None and scorer.cost_class == COST_LLM:
+                # One pool thread runs the whole event loop for this scorer
+                futures.append(submit(pool, run_async, scorer))
+                continue
+            # LLM scorers: one task per candidate (I/O bound); cheap scorers: larger chunks
+            size = 1 if scorer.cost_class == COST_LLM else CHEAP_BATCH_SIZE
+            for i in range(0, len(candidates), size):
+                futures.append(submit(pool, run_chunk, scorer, candidates[i:i + size]))
+        for fut in futures:
+            sid, out = fut.result()
+            entry = report[sid]
+            for name, result, fell_back, err in out:
+                if err is not None:
+                    entry["errors"] += 1
+                elif result is None:
+                    entry["skipped"] += 1
+                else:
+                    entry["results"][name] = result
+                    entry["scored"] += 1
+                    if fell_back:
+                        entry["fell_back"].append(name)
+                        entry["fallbacks"] += 1
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+    return report
@@ -0,0 +1,254 @@
+"""
+Semantic Matcher - offline resume/JD similarity
+Hashing-trick character n-gram embeddings (no network, no model download),
+a per-job vector store persisted as memory-mapped NumPy arrays, and
+approximate nearest-neighbour top-k via random-hyperplane LSH codes.
+"""
+import os
+import json
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import taxonomy
+except ImportError:
+    import taxonomy
+
+SEMANTIC_VERSION = "hashed-ngram-v2"
+SEMANTIC_DIM = int(os.getenv("SEMANTIC_DIM", "1024"))
+SEMANTIC_NGRAMS = (3, 4, 5)
+# Extra weight for canonical taxonomy skills and their categories, so that
+# "Cypress" and "E2E web testing" meet on the shared "e2e testing" feature.
+SKILL_FEATURE_WEIGHT = 4.0
+CATEGORY_FEATURE_WEIGHT = 2.0
+# Cosine range that maps onto the 0-10 score scale. Char n-gram vectors of
+# unrelated English texts still share ~0.1 cosine, strong matches sit ~0.6+.
+SEMANTIC_COS_FLOOR = float(os.getenv("SEMANTIC_COS_FLOOR", "0.10"))
+SEMANTIC_COS_CEIL = float(os.getenv("SEMANTIC_COS_CEIL", "0.65"))
+
+LSH_BITS = 64
+LSH_SEED = 1337
+ANN_OVERSAMPLE = 8
+ANN_MIN_POOL = 256
+
+VECTORS_DIRNAME = "vectors"
+VECTORS_FILENAME = "resume_vectors.npy"
+CODES_FILENAME = "resume_codes.npy"
+INDEX_FILENAME = "index.json"
+
+STOP_WORDS = {
+    "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have",
+    "from", "our", "your", "their", "they", "them", "was", "were", "been", "has", "had",
+    "not", "but", "all", "any", "into", "over", "also", "who", "what", "when", "where",
+    "which", "while", "about", "such", "other", "each", "per", "more", "most",
+}
+
+# --- EMBEDDING ---
+
+@lru_cache(maxsize=200000)
+def _word_features(word: str) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """Hashed (bucket, sign) pairs for one word: the word itself plus its char n-grams."""
+    padded = f" {word} "
+    grams = [word]
+    for n in SEMANTIC_NGRAMS:
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    idx = []
+    signs = []
+    for g in grams:
+        h = zlib.crc32(g.encode("utf-8"))
+        idx.append(h % SEMANTIC_DIM)
+        signs.append(1.0 if (h >> 31) & 1 else -1.0)
+    return tuple(idx), tuple(signs)
+
+def _tokens(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9][a-z0-9+#.]*", str(text or "").lower())
+    return [w.rstrip(".") for w in words if len(w) > 1 and w not in STOP_WORDS]
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Embed text into a fixed-size L2-normalised float32 vector.
+    Deterministic across processes (crc32 hashing, no PYTHONHASHSEED dependency).
+    """
+    idx: List[int] = []
+    signs: List[float] = []
+    for w in _tokens(text):
+        wi, ws = _word_features(w)
+        idx.extend(wi)
+        signs.extend(ws)
+    for skill in taxonomy.extract_skills(text):
+        for feature, weight in ((f"skill:{skill}", SKILL_FEATURE_WEIGHT),
+                                (f"cat:{taxonomy.skill_category(skill)}", CATEGORY_FEATURE_WEIGHT)):
+            h = zlib.crc32(feature.encode("utf-8"))
+            idx.append(h % SEMANTIC_DIM)
+            signs.append(weight if (h >> 31) & 1 else -weight)
+    if not idx:
+        return np.zeros(SEMANTIC_DIM, dtype=np.float32)
+    vec = np.bincount(np.asarray(idx), weights=np.asarray(signs), minlength=SEMANTIC_DIM)
+    vec = vec.astype(np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+def cosine_to_score(cos) -> np.ndarray:
+    """Map cosine similarity onto the 0-10 scale used by the other scorers."""
+    span = max(SEMANTIC_COS_CEIL - SEMANTIC_COS_FLOOR, 1e-6)
+    scaled = (np.asarray(cos, dtype=np.float64) - SEMANTIC_COS_FLOOR) / span
+    return np.round(np.clip(scaled, 0.0, 1.0) * 10.0, 1)
+
+def semantic_score(resume_text: str, jd_text: str) -> float:
+    """Stand-alone semantic scorer, same signature as calculate_score."""
+    if not resume_text or not jd_text:
+        return 0.0
+    cos = float(embed_text(resume_text) @ embed_text(jd_text))
+    return float(cosine_to_score(cos))
+
+# --- LSH CODES ---
+
+@lru_cache(maxsize=1)
+def _hyperplanes() -> np.ndarray:
+    rng = np.random.default_rng(LSH_SEED)
+    return rng.standard_normal((SEMANTIC_DIM, LSH_BITS)).astype(np.float32)
+
+_BIT_WEIGHTS = (np.uint64(1) << np.arange(LSH_BITS, dtype=np.uint64))
+
+def lsh_codes(vectors: np.ndarray) -> np.ndarray:
+    """Pack the sign pattern of each vector against fixed hyperplanes into a uint64."""
+    vectors = np.atleast_2d(vectors)
+    bits = (vectors @ _hyperplanes()) > 0
+    return (bits.astype(np.uint64) * _BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+
+def _popcount(arr: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(arr)
+    return np.unpackbits(arr.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+# --- PER-JOB VECTOR STORE ---
+
+def _store_dir(job_dir: str) -> str:
+    return os.path.join(job_dir, VECTORS_DIRNAME)
+
+def _load_index(job_dir: str) -> Dict:
+    path = os.path.join(_store_dir(job_dir), INDEX_FILENAME)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == SEMANTIC_VERSION and index.get("dim") == SEMANTIC_DIM:
+                return index
+        except Exception:
+            pass
+    return _empty_index()
+
+def _empty_index() -> Dict:
+    return {"version": SEMANTIC_VERSION, "dim": SEMANTIC_DIM, "names": [], "hashes": []}
+
+def _save_index(job_dir: str, index: Dict):
+    with open(os.path.join(_store_dir(job_dir), INDEX_FILENAME), "w") as f:
+        json.dump(index, f)
+
+def load_vectors(job_dir: str) -> Tuple[Dict, Optional[np.ndarray], Optional[np.ndarray]]:
+    """Return (index, vectors memmap, codes) for a job; arrays are None when empty."""
+    index = _load_index(job_dir)
+    vec_path = os.path.join(_store_dir(job_dir), VECTORS_FILENAME)
+    codes_path = os.path.join(_store_dir(job_dir), CODES_FILENAME)
+    if not index["names"] or not os.path.exists(vec_path) or not os.path.exists(codes_path):
+        return index, None, None
+    vectors = np.load(vec_path, mmap_mode="r")
+    codes = np.load(codes_path, mmap_mode="r")
+    if vectors.shape[0] != len(index["names"]):
+        return _empty_index(), None, None
+    return index, vectors, codes
+
+def indexed_hashes(job_dir: str) -> Dict[str, str]:
+    """Candidate name -> content hash for every resume already in the store."""
+    index, vectors, _ = load_vectors(job_dir)
+    if vectors is None:
+        return {}
+    return dict(zip(index["names"], index["hashes"]))
+
+def upsert_resumes(job_dir: str, items: List[Tuple[str, str, str]]) -> int:
+    """
+    Embed and store resumes for a job. items: [(candidate_name, content_hash, text)].
+    Rows whose content hash is unchanged are skipped. Returns number of rows embedded.
+    """
+    os.makedirs(_store_dir(job_dir), exist_ok=True)
+    items = list({name: (name, h, text) for name, h, text in items}.values())
+    index, vectors, codes = load_vectors(job_dir)
+    names = list(index["names"]) if vectors is not None else []
+    hashes = list(index["hashes"]) if vectors is not None else []
+    row_of = {n: i for i, n in enumerate(names)}
+
+    pending = []
+    for name, content_hash, text in items:
+        i = row_of.get(name)
+        if i is not None and hashes[i] == content_hash:
+            continue
+        pending.append((name, content_hash, embed_text(text)))
+    if not pending:
+        return 0
+
+    new_names = [p[0] for p in pending if p[0] not in row_of]
+    total = len(names) + len(new_names)
+    vec_path = os.path.join(_store_dir(job_dir), VECTORS_FILENAME)
+    tmp_path = vec_path + ".tmp.npy"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(total, SEMANTIC_DIM))
+    if vectors is not None:
+        out[:len(names)] = vectors
+    out_codes = np.zeros(total, dtype=np.uint64)
+    if codes is not None:
+        out_codes[:len(names)] = codes
+
+    for name, content_hash, vec in pending:
+        i = row_of.get(name)
+        if i is None:
+            i = len(names)
+            row_of[name] = i
+            names.append(name)
+            hashes.append(content_hash)
+        else:
+            hashes[i] = content_hash
+        out[i] = vec
+    rows = [row_of[p[0]] for p in pending]
+    out_codes[rows] = lsh_codes(np.stack([p[2] for p in pending]))
+    out.flush()
+    del out, vectors, codes
+
+    os.replace(tmp_path, vec_path)
+    np.save(os.path.join(_store_dir(job_dir), CODES_FILENAME), out_codes)
+    _save_index(job_dir, {"version": SEMANTIC_VERSION, "dim": SEMANTIC_DIM, "names": names, "hashes": hashes})
+    return len(pending)
+
+def score_all(job_dir: str, jd_text: str) -> Dict[str, float]:
+    """Semantic score for every stored resume in one matrix-vector product."""
+    index, vectors, _ = load_vectors(job_dir)
+    if vectors is None or not str(jd_text or "").strip():
+        return {}
+    scores = cosine_to_score(vectors @ embed_text(jd_text))
+    return dict(zip(index["names"], scores.tolist()))
+
+def top_k(job_dir: str, jd_text: str, k: int = 10) -> List[Dict]:
+    """
+    Approximate top-k resumes for the JD. Hamming distance on LSH codes picks a
+    candidate pool, which is then re-ranked with exact cosine on the memmap rows.
+    """
+    index, vectors, codes = load_vectors(job_dir)
+    if vectors is None or k <= 0 or not str(jd_text or "").strip():
+        return []
+    q = embed_text(jd_text)
+    n = vectors.shape[0]
+    pool_size = max(k * ANN_OVERSAMPLE, ANN_MIN_POOL)
+    if n <= pool_size:
+        pool = np.arange(n)
+    else:
+        dist = _popcount(np.bitwise_xor(np.asarray(codes), lsh_codes(q)[0]))
+        pool = np.sort(np.argpartition(dist, pool_size)[:pool_size])
+    cos = np.asarray(vectors[pool]) @ q
+    order = np.argsort(-cos)[:k]
+    scores = cosine_to_score(cos[order])
+    return [
+        {"name": index["names"][int(pool[i])], "similarity": round(float(cos[i]), 4), "semantic_score": float(s)}
+        for i, s in zip(order, scores)
+    ]
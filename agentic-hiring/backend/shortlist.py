@@ -0,0 +1,99 @@
+"""
+Shortlist - maintained per-job top-K candidates by score column
+Whenever cv_scores.csv is written the best TOPK_CAPACITY rows of every score
+column are re-selected with a heap (no full sort) and stored in topk.json,
+so "best K candidates" queries read only that small structure. Filters that
+exhaust it fall back to a heap scan of the CSV.
+"""
+import os
+import json
+import heapq
+import math
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    from . import score_stats
+except ImportError:
+    import score_stats
+
+TOPK_FILENAME = "topk.json"
+TOPK_VERSION = 1
+TOPK_CAPACITY = int(os.getenv("TOPK_CAPACITY", "200"))
+SCORE_COLUMNS = {"score", "screening_score", "semantic_score"}
+NON_SCORE_COLUMNS = {"score_source", "score_percentile"}
+
+
+def score_columns(columns) -> List[str]:
+    """Columns with a maintained top-K: score, screening/semantic scores and per-scorer score_* columns."""
+    return [c for c in columns if (c in SCORE_COLUMNS or str(c).startswith("score_")) and c not in NON_SCORE_COLUMNS]
+
+
+def _entries(df: pd.DataFrame, column: str, k: int, statuses=None, exclude=None) -> List[Dict[str, Any]]:
+    """Heap-select the k best rows of df[column] (ties keep CSV order), with optional status filters."""
+    scores = pd.to_numeric(df[column], errors="coerce").tolist()
+    names = df["name"].astype(str).tolist()
+    status = df["status"].fillna("New").astype(str).tolist() if "status" in df.columns else ["New"] * len(df)
+
+    def rows():
+        for i, s in enumerate(scores):
+            if s is None or math.isnan(s):
+                continue
+            if statuses and status[i] not in statuses:
+                continue
+            if exclude and status[i] in exclude:
+                continue
+            yield i
+
+    best = heapq.nlargest(k, rows(), key=lambda i: (scores[i], -i))
+    return [{"name": names[i], "score": float(scores[i]), "status": status[i]} for i in best]
+
+
+def record_write(job_dir: str, df: pd.DataFrame, csv_path: str):
+    """Refresh the top-K lists from the frame just written."""
+    columns = {}
+    if "name" in df.columns:
+        for col in score_columns(df.columns):
+            columns[col] = _entries(df, col, TOPK_CAPACITY)
+    data = {"version": TOPK_VERSION, "stamp": score_stats.csv_stamp(csv_path), "capacity": TOPK_CAPACITY, "columns": columns}
+    with open(os.path.join(job_dir, TOPK_FILENAME), "w") as f:
+        json.dump(data, f)
+    return data
+
+
+def load(job_dir: str, csv_path: str) -> Optional[Dict[str, Any]]:
+    """The maintained top-K lists, rebuilt once if the CSV was written elsewhere."""
+    stamp = score_stats.csv_stamp(csv_path)
+    if stamp is None:
+        return None
+    try:
+        with open(os.path.join(job_dir, TOPK_FILENAME), "r") as f:
+            data = json.load(f)
+        if data.get("version") == TOPK_VERSION and data.get("stamp") == stamp and data.get("capacity") == TOPK_CAPACITY:
+            return data
+    except (OSError, ValueError):
+        pass
+    return record_write(job_dir, pd.read_csv(csv_path), csv_path)
+
+
+def top_k(job_dir: str, csv_path: str, k: int, column: str = "score", statuses=None, exclude=None) -> Iterator[Dict[str, Any]]:
+    """
+    Up to k candidates, best first, by `column`. Served from topk.json; only
+    when status filters drop too many of the stored rows is the CSV heap-scanned.
+    All reading and the `column` check (ValueError) happen before this returns,
+    so callers can report errors before they start streaming the rows.
+    """
+    data = load(job_dir, csv_path)
+    if data is None:
+        return iter(())
+    stored = data["columns"].get(column)
+    if stored is None:
+        raise ValueError(f"Unknown score column: {column}")
+    statuses = set(statuses or [])
+    exclude = set(exclude or [])
+    picked = [e for e in stored if (not statuses or e["status"] in statuses) and e["status"] not in exclude]
+    # A full stored list may hide qualifying rows beyond its capacity
+    if len(picked) < k and len(stored) >= data["capacity"]:
+        picked = _entries(pd.read_csv(csv_path), column, k, statuses, exclude)
+    return ({"rank": rank, **entry} for rank, entry in enumerate(picked[:k], start=1))
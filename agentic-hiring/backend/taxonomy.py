@@ -0,0 +1,169 @@
+"""
+Skill Taxonomy Matcher
+Shared skill taxonomy (canonical skills, aliases, multi-word phrases) compiled
+once into an Aho-Corasick automaton. Extracts canonical skills from any text in
+a single linear pass with word-boundary checks, so "java" never fires inside
+"javascript" and "git" never fires inside "digital".
+"""
+import os
+import json
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.json")
+# Optional extra taxonomy (same format) merged on top of the bundled one
+EXTRA_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH")
+
+# Characters that continue a token: a match must not touch one on either side.
+# '+' and '#' count so that "c" does not fire inside "c++" / "c#".
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#")
+_WS_TABLE = str.maketrans({"\n": " ", "\t": " ", "\r": " ", "\f": " ", "\v": " ", " ": " "})
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and map whitespace to ' ' without changing character offsets."""
+    text = str(text or "")
+    low = text.lower()
+    if len(low) != len(text):
+        low = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return low.translate(_WS_TABLE)
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every skill name and alias in the taxonomy."""
+
+    def __init__(self, entries: List[Dict], version: str = ""):
+        self.version = version
+        self.names: Dict[str, str] = {}
+        self.categories: Dict[str, str] = {}
+        patterns: Dict[str, str] = {}
+        for entry in entries:
+            name = str(entry.get("name") or "").strip()
+            if not name:
+                continue
+            sid = name.lower()
+            self.names[sid] = name
+            self.categories[sid] = entry.get("category") or ""
+            for pattern in [name] + list(entry.get("aliases") or []):
+                pattern = " ".join(str(pattern).lower().split())
+                if pattern:
+                    patterns[pattern] = sid
+        self.pattern_count = len(patterns)
+        self._build(patterns)
+
+    def _build(self, patterns: Dict[str, str]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, str]]] = [[]]
+        for pattern, sid in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[node][ch] = nxt
+                node = nxt
+            out[node].append((len(pattern), sid))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            r = queue.popleft()
+            for ch, s in goto[r].items():
+                queue.append(s)
+                f = fail[r]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[s] = goto[f].get(ch, 0)
+                out[s] = out[s] + out[fail[s]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Return non-overlapping (skill_id, start, end) matches, leftmost-longest.
+        Offsets index into the original text.
+        """
+        low = _normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(low)
+        hits = []
+        node = 0
+        for i, ch in enumerate(low):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                end = i + 1
+                if end < n and low[end] in _WORD_CHARS:
+                    continue
+                for plen, sid in out[node]:
+                    start = end - plen
+                    if start == 0 or low[start - 1] not in _WORD_CHARS:
+                        hits.append((start, end, sid))
+        if not hits:
+            return []
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        result = []
+        last_end = -1
+        for start, end, sid in hits:
+            if start >= last_end:
+                result.append((sid, start, end))
+                last_end = end
+        return result
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skill ids in order of first appearance, de-duplicated."""
+        return list(dict.fromkeys(sid for sid, _, _ in self.find(text)))
+
+
+def _load_entries(path: str) -> Tuple[List[Dict], str]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, ""
+    return data.get("skills", []), str(data.get("version", ""))
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> SkillMatcher:
+    """Compile the taxonomy once per process."""
+    entries, version = _load_entries(TAXONOMY_PATH)
+    if EXTRA_TAXONOMY_PATH and os.path.exists(EXTRA_TAXONOMY_PATH):
+        try:
+            extra, extra_version = _load_entries(EXTRA_TAXONOMY_PATH)
+            entries = entries + extra
+            version = f"{version}+{extra_version or 'custom'}"
+        except Exception as e:
+            print(f"Warning: could not load SKILL_TAXONOMY_PATH {EXTRA_TAXONOMY_PATH}: {e}")
+    return SkillMatcher(entries, version=version)
+
+
+def taxonomy_version() -> str:
+    return get_matcher().version
+
+
+def extract_skills(text: str) -> List[str]:
+    """Canonical skill ids found in text (lowercase, e.g. 'node.js', 'ci/cd')."""
+    if not text:
+        return []
+    return get_matcher().extract(text)
+
+
+def find_skills(text: str) -> List[Tuple[str, int, int]]:
+    """(skill_id, start, end) spans for every skill mention in text."""
+    if not text:
+        return []
+    return get_matcher().find(text)
+
+
+def skill_name(skill_id: str) -> str:
+    """Display name for a canonical skill id (falls back to title case)."""
+    return get_matcher().names.get(skill_id) or str(skill_id).title()
+
+
+def skill_category(skill_id: str) -> Optional[str]:
+    return get_matcher().categories.get(skill_id) or None
@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from backend import resume_index, utils
+
+JD = ("QA automation engineer with 5 years of experience in Selenium, Python and Docker. "
+      "Builds CI/CD pipelines in Jenkins and tests REST APIs in an Agile team.")
+RESUMES = {
+    "alice": "Alice - 6 years of experience. Selenium, Python, Docker, Jenkins, REST API testing, Agile.",
+    "bob": "Bob - 2 years of experience. Java, TestNG, Appium mobile automation, Git.",
+    "carol": "Carol - 9 years of experience. Kubernetes, Terraform, AWS, Docker, Python, performance testing with JMeter.",
+    "dave": "Dave - 4 years of experience. Cypress, React, JavaScript, Jenkins CI/CD pipelines, Postman.",
+    "erin": "Erin - 7 years of experience. Playwright, TypeScript, GraphQL, Kafka, Agile and Scrum.",
+}
+EDITS = [
+    JD.replace("Docker", "Kubernetes"),                    # swap a skill
+    JD + " Java and Kafka are a plus.",                    # add tokens and skills
+    JD.replace(" and tests REST APIs in an Agile team", ""),  # remove tokens
+    JD.replace("5 years", "8 years"),                      # change required years
+]
+COLUMNS = ["name", "score", "matching_keywords", "status"]
+
+
+class Upload:
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+
+    def getbuffer(self):
+        return self.text.encode()
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jid = utils.create_new_job_with_resumes("QA", JD, [Upload(f"{n}.txt", t) for n, t in RESUMES.items()])
+    utils.trigger_simulation_step(jid, "score_cvs")
+    return jid
+
+
+def rescore(jid, jd_text):
+    utils.save_job_artifact(jid, "jd.txt", jd_text)
+    utils.refresh_jd_analysis(jid)
+    return utils.trigger_simulation_step(jid, "score_cvs")
+
+
+def candidates(jid):
+    return pd.read_csv(os.path.join(utils._job_dir(jid), "cv_scores.csv"))[COLUMNS]
+
+
+def full_rescore(jid):
+    """Drop the incremental state and the score cache, so scoring starts from the resumes."""
+    job_dir = utils._job_dir(jid)
+    shutil.rmtree(os.path.join(job_dir, resume_index.INDEX_DIRNAME), ignore_errors=True)
+    os.remove(os.path.join(job_dir, "score_cache.json"))
+    stats = utils.trigger_simulation_step(jid, "score_cvs")
+    assert not stats.get("incremental")
+    return candidates(jid)
+
+
+@pytest.mark.parametrize("edited", EDITS, ids=["swap_skill", "add_skills", "remove_tokens", "change_years"])
+def test_incremental_rescore_matches_full_rescore(job, edited):
+    stats = rescore(job, edited)
+    assert stats["incremental"]
+    incremental = candidates(job)
+    pd.testing.assert_frame_equal(incremental, full_rescore(job))
+
+
+def test_incremental_rescore_skips_missing_resume(job):
+    before = candidates(job).set_index("name")
+    os.remove(os.path.join(utils._job_dir(job), "resumes", "bob.txt"))
+    stats = rescore(job, EDITS[1])
+    assert stats["incremental"]
+    assert stats["skipped"] == 1
+    incremental = candidates(job)
+    assert incremental.set_index("name").loc["bob"].equals(before.loc["bob"])
+    pd.testing.assert_frame_equal(incremental, full_rescore(job))
@@ -0,0 +1,26 @@
+from backend import prompt_budget
+from backend import prompt_templates
+
+JD = "\n\n".join(f"Requirement {i}: hands-on Selenium, Python and Jenkins experience on large suites." * 3 for i in range(60))
+
+
+def evaluation(transcript):
+    prompt, _ = prompt_templates.render("interview_evaluation", [
+        prompt_budget.Block("transcript", transcript, priority=1, min_tokens=600),
+        prompt_budget.Block("jd_text", JD, priority=2, min_tokens=300, max_tokens=600),
+    ], values={"jd_facts": "Must-have skills: Selenium", "round_type": "tech", "score": 7, "matches": "selenium"},
+        model="stub-model")
+    return prompt
+
+
+def test_prefix_does_not_depend_on_call_data():
+    short = evaluation("Candidate: I wrote our Selenium grid.")
+    long = evaluation("Candidate: I wrote our Selenium grid and maintained it for years. " * 400)
+    assert short.prefix == long.prefix
+    assert short.startswith(short.prefix) and long.startswith(long.prefix)
+    assert len(long) > len(short)
+
+
+def test_job_section_stays_within_budget():
+    prompt = evaluation("Candidate: I wrote our Selenium grid and maintained it for years. " * 400)
+    assert prompt_budget.count_tokens(prompt, "stub-model") <= prompt_budget.site_budget("interview_evaluation")
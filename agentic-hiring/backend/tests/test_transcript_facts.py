@@ -0,0 +1,37 @@
+from backend import transcript_facts
+
+ANALYSIS = {"must_haves": ["Selenium", "Java", "Jenkins"]}
+
+
+def tech(answer, question="Which of the required tools have you used?"):
+    result = transcript_facts.extract(f"Agent: {question}\nCandidate: {answer}", ANALYSIS)
+    return result["criteria"]["tech"], result["facts"]["tech"]
+
+
+def test_negation_stays_in_its_clause():
+    criterion, facts = tech("I don't know Selenium, but I have 3 years of Java.")
+    assert facts["denied"] == ["Selenium"]
+    assert facts["confirmed"] == ["Java"]
+    assert facts["years"] == {"Java": 3}
+    assert criterion["status"] == "ambiguous"
+    assert not criterion["conclusive"]
+
+
+def test_hedged_answer_is_not_a_refusal():
+    criterion, facts = tech("Not much, but I've set up Jenkins pipelines for our regression suite.",
+                            question="Have you used Jenkins?")
+    assert facts["confirmed"] == ["Jenkins"]
+    assert facts["denied"] == []
+    assert criterion["status"] == "ambiguous"
+
+
+def test_plain_refusal_is_a_mismatch():
+    criterion, facts = tech("No, I have never used Jenkins.", question="Have you used Jenkins?")
+    assert facts["denied"] == ["Jenkins"]
+    assert criterion["status"] == "mismatch"
+
+
+def test_affirmed_list_keeps_years():
+    criterion, facts = tech("Selenium, Java and Jenkins, 5 years.")
+    assert criterion["status"] == "match"
+    assert facts["years"] == {"Selenium": 5, "Java": 5, "Jenkins": 5}
@@ -0,0 +1,600 @@
+"""
+Transcript Facts - deterministic screening-call feature extraction
+Pulls location (city gazetteer on the taxonomy's Aho-Corasick matcher),
+relocation, salary (number + currency/unit parsing), notice period, shift and
+skill confirmations out of a call transcript with precompiled patterns, then
+judges each screening criterion against the JD where the evidence is
+conclusive. screening_assess only asks the LLM about the criteria left ambiguous.
+"""
+import os
+import re
+import json
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from . import taxonomy
+except ImportError:
+    import taxonomy
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "city_gazetteer.json")
+MAX_NOTICE_DAYS = int(os.getenv("SCREEN_MAX_NOTICE_DAYS", "60"))
+SALARY_STRETCH = float(os.getenv("SCREEN_SALARY_STRETCH", "1.15"))  # up to 15% over budget is negotiable
+
+# Same weights as the screening prompt: location 3, salary 2, shift & availability 2, tech 3
+CRITERIA_POINTS = {"location": 3.0, "salary": 2.0, "shift": 2.0, "tech": 3.0}
+# Statuses; only "ambiguous" needs the LLM
+CONCLUSIVE = {"match", "partial", "mismatch", "not_discussed"}
+
+_AGENT_SPEAKERS = {"agent", "recruiter", "interviewer", "hr", "ai recruiter", "ai agent", "ai", "bot", "caller"}
+_CANDIDATE_SPEAKERS = {"candidate", "applicant", "interviewee"}
+_TURN_RE = re.compile(r"^\s*([A-Za-z][A-Za-z .]{0,24}?)\s*:\s*(.*)$")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]?")
+# Clause boundaries inside a sentence: a negation only reaches the skills in its own clause
+_CLAUSE_BREAK_RE = re.compile(r"[,;:]|\b(?:but|though|although|however|whereas|except|yet)\b", re.I)
+
+# Topic of an exchange = topics of its words (word lookups, one tokenizing scan per turn)
+_TOPIC_WORDS = {
+    "location": "based city commute move moving relocate live living stay office local remote wfh onsite",
+    "salary": "salary ctc compensation package pay lpa lakh lakhs budget drawing hike inr usd rs ₹ $ € £",
+    "notice": "notice join joining joiner lwd serving",
+    "shift": "shift shifts night nights rotational rotating timing timings weekend weekends",
+    "tech": "experience worked working project projects hands skill skills tool tools framework frameworks years",
+}
+_WORD_TOPIC = {w: t for t, words in _TOPIC_WORDS.items() for w in words.split()}
+_PREFIX_TOPIC = {"locat": "location", "relocat": "location", "expect": "salary"}
+_PREFIX_LENGTHS = sorted({len(p) for p in _PREFIX_TOPIC})
+_TAG_WORD_RE = re.compile(r"[a-z]+|[₹$€£]")
+
+# "No problem" and friends are agreement, not negation
+_AGREE_PHRASES_RE = re.compile(r"\b(no problem|no problems|no issues?|not a problem|no worries|no concerns?|don't mind|do not mind|not an issue)\b", re.I)
+_NEG_RE = re.compile(r"\b(no|not|never|nope|can't|cannot|can not|won't|wouldn't|unable|don't|do not|didn't|haven't|have not|hasn't|isn't|am not|prefer not|rather not)\b", re.I)
+_AFFIRM_RE = re.compile(r"\b(yes|yeah|yep|yup|sure|okay|ok|fine|absolutely|definitely|certainly|comfortable|happy to|open to|willing|agreed?|works for me|of course|can do|can work|flexible)\b", re.I)
+
+_LOCAL_RE = re.compile(r"\b(i am|i'm|im|we are|i live|i stay)\s+(local|locally|nearby|close by|in the same city)\b|\bi am local\b", re.I)
+_RELOCATE_RE = re.compile(r"\b(relocat\w*|move|moving|shift base)\b", re.I)
+_REMOTE_RE = re.compile(r"\b(remote|work from home|wfh)\b", re.I)
+
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "thirty": 30, "sixty": 60, "ninety": 90}
+_NOTICE_RE = re.compile(r"\b(\d{1,3}|a|an|one|two|three|four|five|six|seven|eight|nine|ten|fifteen|thirty|sixty|ninety)\s*(?:-|\s)?\s*(days?|weeks?|months?)\b", re.I)
+_IMMEDIATE_RE = re.compile(r"\b(immediate(ly)?|right away|straight away|already serv\w+ and free|currently not employed|not working currently|can join (now|tomorrow))\b", re.I)
+_BUYOUT_RE = re.compile(r"\b(buy ?out|bought out|negotiable|early release)\b", re.I)
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+
+_AMOUNT_RE = re.compile(
+    r"(?P<cur>₹|rs\.?|inr|\$|usd|eur|€|£|gbp)?\s*"
+    r"(?P<lo>\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?)"
+    r"(?:\s*(?:-|–|to)\s*(?P<hi>\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?))?"
+    r"\s*(?P<unit>lpa|lakhs?|lacs?|l|crores?|cr|k|thousand|million|mn|m)?\b"
+    r"(?:\s*(?P<cur2>inr|usd|rupees|dollars|eur|euros|gbp|pounds))?"
+    r"(?:\s*(?P<period>per annum|p\.?a\.?|per year|a year|annually|yearly|per month|a month|monthly|p\.?m\.?|/month|/year))?",
+    re.I,
+)
+_CURRENCIES = {"₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR", "rupees": "INR", "$": "USD", "usd": "USD", "dollars": "USD",
+               "eur": "EUR", "€": "EUR", "euros": "EUR", "£": "GBP", "gbp": "GBP", "pounds": "GBP"}
+_UNITS = {"lpa": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "l": 1e5, "crore": 1e7, "crores": 1e7, "cr": 1e7,
+          "k": 1e3, "thousand": 1e3, "million": 1e6, "mn": 1e6, "m": 1e6}
+_INR_UNITS = {"lpa", "lakh", "lakhs", "lac", "lacs", "l", "crore", "crores", "cr"}
+_CURRENT_RE = re.compile(r"\b(current|currently|drawing|present|existing|right now|at the moment|getting)\b", re.I)
+_EXPECTED_RE = re.compile(r"\b(expect\w*|looking for|looking at|want|asking|ask|hike|desired|target)\b", re.I)
+_NEGOTIABLE_RE = re.compile(r"\b(negotiable|flexible|as per (company|industry|market) (norms|standards)|open to discussion|whatever is fair)\b", re.I)
+_BUDGET_LINE_RE = re.compile(r"\b(budget|salary|ctc|compensation|package|pay range|lpa)\b|[₹$€£]", re.I)
+_JD_NOTICE_RE = re.compile(r"notice(?: period)?[^.\n]{0,40}?(\d{1,3})\s*(days?|weeks?|months?)", re.I)
+_JD_IMMEDIATE_RE = re.compile(r"\bimmediate (joiners?|joining|start)\b", re.I)
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)", re.I)
+
+_DAY_ONLY_RE = re.compile(r"\b(only (day|morning|general)( shifts?)?|(day|morning|general) shifts? only|no night|not (do|work) nights?|can't do nights?|cannot do nights?)\b", re.I)
+
+
+# --- CITY GAZETTEER ---
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Tuple[taxonomy.SkillMatcher, Dict[str, Dict[str, str]]]:
+    """Compile the city gazetteer once per process (same trie as the skill taxonomy)."""
+    with open(GAZETTEER_PATH, "r") as f:
+        data = json.load(f)
+    cities = data.get("cities", [])
+    info = {}
+    entries = []
+    for city in cities:
+        name = str(city.get("name") or "").strip()
+        if not name:
+            continue
+        info[name.lower()] = {"name": name, "country": city.get("country") or "", "region": city.get("region") or name}
+        entries.append({"name": name, "aliases": city.get("aliases") or [], "category": city.get("country") or ""})
+    return taxonomy.SkillMatcher(entries, version=str(data.get("version", ""))), info
+
+
+def find_cities(text: str) -> List[str]:
+    """Canonical city ids (lowercase) mentioned in text, in order of first mention."""
+    if not text:
+        return []
+    return get_gazetteer()[0].extract(text)
+
+
+def city_name(city_id: str) -> str:
+    entry = get_gazetteer()[1].get(city_id)
+    return entry["name"] if entry else str(city_id).title()
+
+
+def _region(city_id: str) -> str:
+    entry = get_gazetteer()[1].get(city_id)
+    return entry["region"] if entry else city_id
+
+
+# --- TRANSCRIPT PARSING ---
+
+def split_turns(transcript: str) -> Tuple[List[Tuple[str, str]], bool]:
+    """
+    [(question, answer)] exchanges: each candidate turn with the agent turn before it.
+    Transcripts without speaker labels are returned as one unlabelled answer (labelled=False).
+    """
+    turns: List[List] = []
+    for line in str(transcript or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("[") or line.startswith("---"):
+            continue
+        m = _TURN_RE.match(line)
+        who = m.group(1).strip().lower() if m else None
+        if who in _AGENT_SPEAKERS:
+            turns.append(["agent", m.group(2).strip()])
+        elif who in _CANDIDATE_SPEAKERS:
+            turns.append(["candidate", m.group(2).strip()])
+        elif turns:
+            turns[-1][1] += " " + line
+    if not turns:
+        text = " ".join(l.strip() for l in str(transcript or "").splitlines() if l.strip())
+        return [("", text)], False
+    exchanges = []
+    question = ""
+    for speaker, text in turns:
+        if speaker == "agent":
+            question = text
+        else:
+            exchanges.append((question, text))
+    return exchanges, True
+
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+
+
+def _clauses(sentence: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of the clauses of a sentence."""
+    spans, start = [], 0
+    for m in _CLAUSE_BREAK_RE.finditer(sentence):
+        spans.append((start, m.start()))
+        start = m.end()
+    spans.append((start, len(sentence)))
+    return [(a, b) for a, b in spans if sentence[a:b].strip()]
+
+
+def polarity(text: str) -> int:
+    """+1 agreement, -1 refusal, 0 neither or both."""
+    text = _AGREE_PHRASES_RE.sub(" ok ", text)
+    neg = _NEG_RE.search(text) is not None
+    pos = _AFFIRM_RE.search(text) is not None
+    if neg == pos:
+        return 0
+    return 1 if pos else -1
+
+
+def topics_of(text: str) -> set:
+    found = set()
+    for w in _TAG_WORD_RE.findall(text.lower()):
+        topic = _WORD_TOPIC.get(w)
+        if topic is None:
+            for n in _PREFIX_LENGTHS:
+                topic = _PREFIX_TOPIC.get(w[:n])
+                if topic:
+                    break
+        if topic:
+            found.add(topic)
+    return found
+
+
+class _Call:
+    """A transcript's exchanges, tagged with their topics once."""
+
+    def __init__(self, exchanges: List[Tuple[str, str]]):
+        self.exchanges = exchanges
+        self.topics: Dict[str, List[Tuple[str, str]]] = {t: [] for t in _TOPIC_WORDS}
+        for q, a in exchanges:
+            for topic in topics_of(f"{q} {a}"):
+                self.topics[topic].append((q, a))
+
+
+# --- SALARY ---
+
+def _to_float(number: Optional[str]) -> Optional[float]:
+    if not number:
+        return None
+    try:
+        return float(number.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def parse_amounts(text: str, default_unit: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Annual money amounts in text: [{"min", "max", "currency", "at"}]. Bare numbers count only
+    with a currency, a unit, or default_unit (e.g. the question asked in LPA).
+    """
+    out = []
+    for m in _AMOUNT_RE.finditer(text):
+        lo, hi = _to_float(m.group("lo")), _to_float(m.group("hi"))
+        if lo is None:
+            continue
+        unit = (m.group("unit") or "").lower()
+        cur = (m.group("cur") or m.group("cur2") or "").lower()
+        period = (m.group("period") or "").lower()
+        # "5 years", "30 days": durations are not money
+        tail = text[m.end():m.end() + 8].lower()
+        if not unit and not cur and re.match(r"\s*(years?|yrs?|days?|weeks?|months?|%|\+)", tail):
+            continue
+        if not unit and not cur:
+            if default_unit:
+                unit = default_unit
+            elif lo < 1000:
+                continue
+        scale = _UNITS.get(unit, 1.0)
+        if "month" in period or period.replace(".", "") == "pm":
+            scale *= 12
+        currency = _CURRENCIES.get(cur) or ("INR" if unit in _INR_UNITS else None)
+        out.append({"min": round(lo * scale, 2), "max": round((hi if hi is not None else lo) * scale, 2), "currency": currency, "at": m.start()})
+    return out
+
+
+def _default_unit(text: str) -> Optional[str]:
+    low = text.lower()
+    if "lpa" in low or "lakh" in low or " lac" in low:
+        return "lakh"
+    return None
+
+
+@lru_cache(maxsize=64)
+def salary_budget(jd_text: str) -> Optional[Dict[str, Any]]:
+    """Budget range stated in the JD (lines mentioning salary/CTC/budget), if any."""
+    amounts = []
+    for line in str(jd_text or "").splitlines():
+        if _BUDGET_LINE_RE.search(line):
+            amounts += parse_amounts(line, _default_unit(line))
+    if not amounts:
+        return None
+    return {"min": min(a["min"] for a in amounts), "max": max(a["max"] for a in amounts),
+            "currency": next((a["currency"] for a in amounts if a["currency"]), None)}
+
+
+def _salary_findings(call: _Call) -> Dict[str, Any]:
+    found: Dict[str, Any] = {"current": None, "expected": None, "negotiable": False, "discussed": False}
+    for q, a in call.topics["salary"]:
+        found["discussed"] = True
+        unit = _default_unit(q) or _default_unit(a)
+        for sentence in _sentences(a):
+            if _NEGOTIABLE_RE.search(sentence):
+                found["negotiable"] = True
+            # Each amount belongs to the last current/expected cue before it ("drawing 15, expecting 25")
+            cues = [(m.start(), "current") for m in _CURRENT_RE.finditer(sentence)]
+            cues += [(m.start(), "expected") for m in _EXPECTED_RE.finditer(sentence)]
+            fallback = "current" if _CURRENT_RE.search(q) and not _EXPECTED_RE.search(q) else "expected"
+            for amount in parse_amounts(sentence, unit):
+                at = amount.pop("at")
+                before = [kind for pos, kind in sorted(cues) if pos < at]
+                kind = before[-1] if before else fallback
+                if found[kind] is None:
+                    found[kind] = amount
+    return found
+
+
+# --- NOTICE PERIOD ---
+
+def parse_notice_days(text: str) -> Optional[int]:
+    if _IMMEDIATE_RE.search(text):
+        return 0
+    m = _NOTICE_RE.search(text)
+    if not m:
+        return None
+    count = m.group(1).lower()
+    n = int(count) if count.isdigit() else _NUMBER_WORDS.get(count)
+    if n is None:
+        return None
+    unit = m.group(2).lower().rstrip("s")
+    return n * _UNIT_DAYS[unit]
+
+
+@lru_cache(maxsize=64)
+def notice_limit(jd_text: str) -> int:
+    """Longest acceptable notice in days: from the JD if it states one, else SCREEN_MAX_NOTICE_DAYS."""
+    if _JD_IMMEDIATE_RE.search(jd_text or ""):
+        return 15
+    m = _JD_NOTICE_RE.search(jd_text or "")
+    if m:
+        return int(m.group(1)) * _UNIT_DAYS[m.group(2).lower().rstrip("s")]
+    return MAX_NOTICE_DAYS
+
+
+# --- CRITERIA ---
+
+def _criterion(name: str, status: str, points: float, summary: str, evidence=None) -> Dict[str, Any]:
+    return {
+        "status": status,
+        "points": round(points, 1),
+        "max_points": CRITERIA_POINTS.get(name),
+        "conclusive": status in CONCLUSIVE,
+        "summary": summary,
+        "evidence": list(evidence or [])[:3],
+    }
+
+
+def _assess_location(call: _Call, analysis: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    max_pts = CRITERIA_POINTS["location"]
+    job_cities = find_cities(analysis.get("location") or "")
+    talk = call.topics["location"]
+    answers = " ".join(a for _, a in talk)
+    cities = find_cities(answers) or find_cities(" ".join(a for _, a in call.exchanges))
+    local = any(_LOCAL_RE.search(a) for _, a in talk)
+    relocation = None
+    evidence = []
+    for q, a in talk:
+        for sentence in _sentences(a):
+            if _RELOCATE_RE.search(sentence):
+                p = polarity(sentence)
+                if p:
+                    relocation = p > 0
+                    evidence.append(sentence)
+        if relocation is None and _RELOCATE_RE.search(q):
+            p = polarity(a)
+            if p:
+                relocation = p > 0
+                evidence.append(a)
+        # "Are you located in or willing to relocate...?" - "Yes, I am local."
+        if not local and re.search(r"\blocat", q, re.I) and polarity(a) > 0 and not find_cities(a) and not _RELOCATE_RE.search(a):
+            local = bool(re.search(r"\b(local|here|same city|nearby)\b", a, re.I))
+    facts = {"job_cities": [city_name(c) for c in job_cities], "candidate_cities": [city_name(c) for c in cities],
+             "local": local, "relocation": relocation}
+    remote_answer = any(_REMOTE_RE.search(a) for _, a in talk)
+
+    if analysis.get("work_mode") == "remote":
+        return _criterion("location", "match", max_pts, "Remote role: location is not a constraint."), facts
+    if not job_cities:
+        if analysis.get("location"):
+            # JD names a place the gazetteer does not know
+            if talk:
+                return _criterion("location", "ambiguous", max_pts / 2, f"JD location '{analysis['location']}' not in gazetteer.", [a for _, a in talk]), facts
+            return _criterion("location", "not_discussed", max_pts / 2, "Location was not discussed on the call."), facts
+        return _criterion("location", "match", max_pts, "JD has no location constraint."), facts
+    job_regions = {_region(c) for c in job_cities}
+    same = [c for c in cities if c in job_cities or _region(c) in job_regions]
+    if local or same:
+        where = city_name(same[0]) if same else "the job location"
+        return _criterion("location", "match", max_pts, f"Candidate is based in {where}.", evidence), facts
+    if relocation:
+        return _criterion("location", "match", max_pts, "Candidate is willing to relocate.", evidence), facts
+    if relocation is False and cities:
+        return _criterion("location", "mismatch", 0.0,
+                          f"Candidate is in {city_name(cities[0])} and will not relocate to {city_name(job_cities[0])}.", evidence), facts
+    if cities or relocation is False or remote_answer:
+        return _criterion("location", "ambiguous", max_pts / 2, "Location stated but relocation intent is unclear.",
+                          evidence or [a for _, a in talk]), facts
+    if talk:
+        return _criterion("location", "ambiguous", max_pts / 2, "Location discussed without a clear answer.", [a for _, a in talk]), facts
+    return _criterion("location", "not_discussed", max_pts / 2, "Location was not discussed on the call."), facts
+
+
+def _assess_salary(call: _Call, jd_text: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    max_pts = CRITERIA_POINTS["salary"]
+    found = _salary_findings(call)
+    budget = salary_budget(jd_text)
+    facts = {"current": found["current"], "expected": found["expected"], "negotiable": found["negotiable"], "budget": budget}
+    expected = found["expected"]
+    if not found["discussed"]:
+        return _criterion("salary", "not_discussed", max_pts / 2, "Salary was not discussed on the call."), facts
+    if expected is None:
+        if found["negotiable"]:
+            return _criterion("salary", "match", max_pts, "Candidate is flexible on salary."), facts
+        return _criterion("salary", "ambiguous", max_pts / 2, "Salary discussed but no expectation could be parsed."), facts
+    if budget is None:
+        return _criterion("salary", "not_discussed", max_pts / 2, "Expectation stated; JD has no budget to compare."), facts
+    if expected["currency"] and budget["currency"] and expected["currency"] != budget["currency"]:
+        return _criterion("salary", "ambiguous", max_pts / 2, "Expectation and budget are in different currencies."), facts
+    if expected["min"] <= budget["max"]:
+        return _criterion("salary", "match", max_pts, "Expectation is within budget."), facts
+    if expected["min"] <= budget["max"] * SALARY_STRETCH or found["negotiable"]:
+        return _criterion("salary", "partial", max_pts / 2, "Expectation is slightly above budget."), facts
+    return _criterion("salary", "mismatch", 0.0, "Expectation is well above budget."), facts
+
+
+def _assess_shift(call: _Call, analysis: Dict[str, Any], jd_text: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Shift & availability: 1 point for the shift, 1 for the notice period."""
+    # Notice period
+    notice = None
+    buyout = False
+    for q, a in call.topics["notice"]:
+        buyout = buyout or bool(_BUYOUT_RE.search(a))
+        if notice is None:
+            notice = parse_notice_days(a)
+    limit = notice_limit(jd_text)
+    if notice is None:
+        n_status, n_points = "not_discussed", 0.5
+        n_text = "Notice period not stated."
+    elif notice <= limit or (buyout and notice <= limit * 2):
+        n_status, n_points = "match", 1.0
+        n_text = f"Notice period {notice} days (limit {limit}{', buyout possible' if notice > limit else ''})."
+    elif notice <= limit * 1.5:
+        n_status, n_points = "partial", 0.5
+        n_text = f"Notice period {notice} days, above the {limit}-day limit."
+    else:
+        n_status, n_points = "mismatch", 0.0
+        n_text = f"Notice period {notice} days, far above the {limit}-day limit."
+
+    # Shift
+    job_shift = analysis.get("shift")
+    talk = call.topics["shift"]
+    answer_polarity = 0
+    evidence = []
+    for q, a in talk:
+        if _DAY_ONLY_RE.search(a):
+            answer_polarity = -1
+            evidence.append(a)
+            break
+        p = polarity(a)
+        if p:
+            answer_polarity = p
+            evidence.append(a)
+    if not job_shift:
+        s_status, s_points, s_text = "match", 1.0, "JD has no shift requirement."
+    elif answer_polarity > 0:
+        s_status, s_points, s_text = "match", 1.0, f"Candidate accepts the {job_shift} shift."
+    elif answer_polarity < 0:
+        s_status, s_points, s_text = "mismatch", 0.0, f"Candidate declines the {job_shift} shift."
+    elif talk:
+        s_status, s_points, s_text = "ambiguous", 0.5, "Shift discussed without a clear answer."
+    else:
+        s_status, s_points, s_text = "not_discussed", 0.5, "Shift was not discussed on the call."
+
+    order = ["ambiguous", "mismatch", "partial", "not_discussed", "match"]
+    status = min((s_status, n_status), key=order.index)
+    if status == "not_discussed" and "match" in (s_status, n_status):
+        status = "partial"
+    facts = {"notice_days": notice, "notice_limit_days": limit, "notice_buyout": buyout, "job_shift": job_shift,
+             "shift_answer": {1: "accepts", -1: "declines", 0: None}[answer_polarity]}
+    return _criterion("shift", status, s_points + n_points, f"{s_text} {n_text}", evidence), facts
+
+
+@lru_cache(maxsize=64)
+def _resolve_skills(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(taxonomy.extract_skills(", ".join(names)))
+
+
+def _jd_skills(analysis: Dict[str, Any]) -> List[str]:
+    must = _resolve_skills(tuple(analysis.get("must_haves") or []))
+    return list(must or analysis.get("skills") or [])[:8]
+
+
+def _assess_tech(call: _Call, analysis: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    max_pts = CRITERIA_POINTS["tech"]
+    wanted = _jd_skills(analysis)
+    confirmed, denied, years = [], [], {}
+    evidence = []
+    mixed = False
+    for _, a in call.exchanges:
+        mentions = [(start, sid) for sid, start, _ in taxonomy.find_skills(a) if sid in wanted]
+        if not mentions:
+            continue
+        for m in _SENTENCE_RE.finditer(a):
+            skills = [(start - m.start(), sid) for start, sid in mentions if m.start() <= start < m.end()]
+            if not skills:
+                continue
+            sentence = m.group(0)
+            clauses = [(lo, hi, polarity(sentence[lo:hi]) < 0) for lo, hi in _clauses(sentence)]
+            sentence_years = _YEARS_RE.search(sentence)
+            affirmed = False
+            for at, sid in skills:
+                lo, hi, negated = next((c for c in clauses if c[0] <= at < c[1]), (0, len(sentence), False))
+                (denied if negated else confirmed).append(sid)
+                if negated:
+                    continue
+                affirmed = True
+                years_m = _YEARS_RE.search(sentence[lo:hi])
+                if years_m is None and not any(c[2] for c in clauses):
+                    years_m = sentence_years
+                if years_m:
+                    years[sid] = max(years.get(sid, 0), int(years_m.group(1)))
+            # "Not much, but I've set up Jenkins": a skill stated next to a refusal is not conclusive
+            mixed = mixed or (affirmed and any(c[2] for c in clauses))
+            evidence.append(sentence.strip())
+    confirmed = list(dict.fromkeys(s for s in confirmed))
+    denied = [s for s in dict.fromkeys(denied) if s not in confirmed]
+    facts = {"jd_skills": [taxonomy.skill_name(s) for s in wanted], "confirmed": [taxonomy.skill_name(s) for s in confirmed],
+             "denied": [taxonomy.skill_name(s) for s in denied], "years": {taxonomy.skill_name(s): y for s, y in years.items()}}
+    if not wanted:
+        return _criterion("tech", "not_discussed", max_pts / 2, "No taxonomy skills in the JD to verify."), facts
+    if not confirmed and not denied:
+        return _criterion("tech", "not_discussed", max_pts / 2, "Required skills were not discussed on the call."), facts
+    coverage = len(confirmed) / len(wanted)
+    points = max_pts * coverage
+    if denied and confirmed:
+        return _criterion("tech", "ambiguous", points, f"Confirmed {len(confirmed)}, denied {len(denied)} of {len(wanted)} required skills.", evidence), facts
+    if mixed:
+        return _criterion("tech", "ambiguous", points, f"Confirmed {len(confirmed)} of {len(wanted)} required skills with reservations.", evidence), facts
+    if not confirmed:
+        return _criterion("tech", "mismatch", 0.0, f"Candidate lacks {', '.join(facts['denied'])}.", evidence), facts
+    status = "match" if coverage >= 1 else "partial"
+    return _criterion("tech", status, points, f"Confirmed {len(confirmed)} of {len(wanted)} required skills.", evidence), facts
+
+
+def extract(transcript: str, analysis: Optional[Dict[str, Any]] = None, jd_text: str = "") -> Dict[str, Any]:
+    """
+    Structured screening findings for one transcript:
+    {"criteria": {location|salary|shift|tech: {status, points, max_points, conclusive, summary, evidence}},
+     "facts": {...}, "ambiguous": [criteria needing the LLM], "conclusive": bool, "score": 0-10}.
+    Ambiguous criteria carry a neutral fallback score.
+    """
+    started = time.perf_counter()
+    analysis = analysis or {}
+    exchanges, labelled = split_turns(transcript)
+    call = _Call(exchanges)
+    criteria, facts = {}, {"labelled": labelled}
+    for name, (criterion, found) in (
+        ("location", _assess_location(call, analysis)),
+        ("salary", _assess_salary(call, jd_text)),
+        ("shift", _assess_shift(call, analysis, jd_text)),
+        ("tech", _assess_tech(call, analysis)),
+    ):
+        criteria[name] = criterion
+        facts[name] = found
+    ambiguous = [name for name, c in criteria.items() if not c["conclusive"]]
+    return {
+        "criteria": criteria,
+        "facts": facts,
+        "ambiguous": ambiguous,
+        "conclusive": not ambiguous,
+        "score": round(sum(c["points"] for c in criteria.values()), 1),
+        "elapsed_us": round((time.perf_counter() - started) * 1e6, 1),
+    }
+
+
+def relevant_excerpt(transcript: str, topics: List[str], max_chars: int = 2000) -> str:
+    """Only the exchanges about `topics` ('Agent: q / Candidate: a'), for a shorter LLM prompt."""
+    exchanges, labelled = split_turns(transcript)
+    if not labelled:
+        return str(transcript or "")[:max_chars * 2]
+    keep = []
+    for q, a in exchanges:
+        if topics_of(f"{q} {a}") & set(topics):
+            keep.append(f"Agent: {q}\nCandidate: {a}" if q else f"Candidate: {a}")
+    return "\n".join(keep)[:max_chars] if keep else str(transcript or "")[:max_chars * 2]
+
+
+def recommendation(score: float) -> str:
+    if score >= 7:
+        return "yes"
+    if score >= 5:
+        return "maybe"
+    return "no"
+
+
+_NEXT_QUESTIONS = {
+    "location": "Confirm current city and willingness to relocate",
+    "salary": "Confirm current and expected CTC against the budget",
+    "shift": "Confirm shift acceptance and notice period",
+    "tech": "Verify hands-on depth in the required skills",
+}
+
+
+def to_assessment(findings: Dict[str, Any], note: str = "") -> Dict[str, Any]:
+    """screening_assess result shape built from the deterministic findings alone."""
+    criteria = findings["criteria"]
+    score = findings["score"]
+    risks = [c["summary"] for c in criteria.values() if c["status"] in ("mismatch", "partial", "ambiguous")]
+    questions = [_NEXT_QUESTIONS[n] for n, c in criteria.items() if c["status"] in ("not_discussed", "ambiguous", "partial")]
+    summary = "; ".join(f"{n}: {c['points']}/{c['max_points']:g}" for n, c in criteria.items())
+    return {
+        "assessment": (note + " " if note else "") + f"Deterministic transcript analysis ({summary}).",
+        "hire_recommendation": recommendation(score),
+        "score": score,
+        "criteria_breakdown": {n: c["summary"] for n, c in criteria.items()},
+        "risks": risks,
+        "next_questions": questions or ["Schedule technical interview"],
+    }
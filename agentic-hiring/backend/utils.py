@@ -1,19 +1,70 @@
 import os
 import json
 import shutil
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import re
+import math
+import random
+import time
 
 # Import llm - handle both relative and absolute imports
 try:
     from . import llm
+    from . import llm_metrics
+    from . import semantic
+    from . import taxonomy
+    from . import score_cache
+    from . import jd_analysis
+    from . import resume_index
+    from . import scorers
+    from . import distilled
+    from . import rules
+    from . import score_stats
+    from . import facets
+    from . import shortlist
+    from . import highlights
+    from . import transcript_facts
+    from . import prompt_budget
+    from . import prompt_templates
 except ImportError:
     import llm
+    import llm_metrics
+    import semantic
+    import taxonomy
+    import score_cache
+    import jd_analysis
+    import resume_index
+    import scorers
+    import distilled
+    import rules
+    import score_stats
+    import facets
+    import shortlist
+    import highlights
+    import transcript_facts
+    import prompt_budget
+    import prompt_templates
 
 JOBS_DIR = "jobs"
 JOB_META_FILENAME = "job_meta.json"
 
+# Canonical taxonomy skills that carry extra weight in the heuristic scorer
+CORE_SKILLS = {"python", "java", "selenium", "playwright", "test automation", "quality assurance"}
+
+# Scorer ids/versions used in score cache keys. Bump a version when its scoring logic changes.
+KEYWORD_SCORER_ID = "keyword"
+KEYWORD_SCORER_VERSION = "2"
+HEURISTIC_SCORER_ID = "heuristic"
+HEURISTIC_SCORER_VERSION = "2"
+LLM_SCORER_ID = "llm"
+LLM_SCORER_VERSION = "1"
+SEMANTIC_SCORER_ID = "semantic"
+DISTILLED_SCORER_ID = "distilled"
+KEYWORD_SCORE_COLUMN = "score_keyword"
+SCORE_SOURCE_COLUMN = "score_source"  # which scorer produced each candidate's 'score'
+
 # --- CORE UTILS ---
 
 def ensure_jobs_dir():
@@ -138,6 +189,7 @@ def create_new_job_with_resumes(title, jd_text, uploaded_files):
     # Write JD
     with open(os.path.join(job_dir, "jd.txt"), "w") as f:
         f.write(jd_text)
+    refresh_jd_analysis(job_id)
 
     # Save job metadata (source of truth for title/archived)
     now = datetime.now()
@@ -189,7 +241,7 @@ def create_new_job_with_resumes(title, jd_text, uploaded_files):
             } 
             for i, f in enumerate(saved_files)
         ])
-        initial_csv.to_csv(os.path.join(job_dir, "cv_scores.csv"), index=False)
+        _save_candidates(initial_csv, os.path.join(job_dir, "cv_scores.csv"))
 
     with open(os.path.join(job_dir, "activity_log.json"), "w") as f:
         json.dump(init_log, f, indent=4)
@@ -206,6 +258,8 @@ def ingest_resumes(job_id, uploaded_files):
     saved_files = []
     
     new_rows = []
+    embed_items = []
+    index_items = []
     # Save files and extract contact info
     for uploaded_file in uploaded_files:
         file_path = os.path.join(resumes_dir, uploaded_file.name)
@@ -217,6 +271,10 @@ def ingest_resumes(job_id, uploaded_files):
         except Exception:
             txt = ""
         email, phone = extract_contacts(txt)
+        content_hash = score_cache.file_hash(file_path)
+        if txt.strip():
+            embed_items.append((uploaded_file.name.split('.')[0], content_hash, txt))
+        index_items.append((uploaded_file.name.split('.')[0], file_path, content_hash, txt))
         new_rows.append({
             "name": uploaded_file.name.split('.')[0],
             "score": 0.0,
@@ -228,6 +286,26 @@ def ingest_resumes(job_id, uploaded_files):
         })
         
     _append_log(job_id, "RESUMES_INGESTED", f"Added {len(saved_files)} resumes: {', '.join(saved_files)}")
+
+    # Embed once at ingest so semantic scoring/top-k never re-reads the files
+    try:
+        embedded = semantic.upsert_resumes(job_dir, embed_items)
+        if embedded:
+            _append_log(job_id, "RESUMES_EMBEDDED", f"Embedded {embedded} resumes into semantic index")
+    except Exception as e:
+        _append_log(job_id, "WARN", f"Semantic embedding failed: {e}")
+
+    # Token postings for incremental rescoring on JD edits
+    try:
+        resume_index.upsert_resumes(job_dir, index_items)
+    except Exception as e:
+        _append_log(job_id, "WARN", f"Resume token indexing failed: {e}")
+
+    # Text + word/skill offsets so candidate views never re-parse the file
+    try:
+        highlights.upsert(job_dir, index_items)
+    except Exception as e:
+        _append_log(job_id, "WARN", f"Resume highlight caching failed: {e}")
     
     # Update CSV
     csv_path = os.path.join(job_dir, "cv_scores.csv")
@@ -244,11 +322,11 @@ def ingest_resumes(job_id, uploaded_files):
             # Concat and dedup by name for simulation simplicity
             combined_df = pd.concat([old_df, new_data], ignore_index=True)
             combined_df.drop_duplicates(subset=['name'], keep='last', inplace=True)
-            combined_df.to_csv(csv_path, index=False)
+            _save_candidates(combined_df, csv_path)
         except:
-             new_data.to_csv(csv_path, index=False)
+             _save_candidates(new_data, csv_path)
     else:
-        new_data.to_csv(csv_path, index=False)
+        _save_candidates(new_data, csv_path)
 
     # If a JD exists, automatically score/rescore against it so uploads immediately "work"
     try:
@@ -278,6 +356,13 @@ def load_job_artifact(job_id, filename):
              return pd.read_csv(path)
     return None
 
+def _save_candidates(df, csv_path):
+    """Write cv_scores.csv and refresh the job's score sketch and top-K lists from the frame just written."""
+    df.to_csv(csv_path, index=False)
+    job_dir = os.path.dirname(csv_path)
+    score_stats.record_write(job_dir, df["score"] if "score" in df.columns else None, csv_path)
+    shortlist.record_write(job_dir, df, csv_path)
+
 def save_job_artifact(job_id, filename, data):
     path = os.path.join(JOBS_DIR, job_id, filename)
     if filename.endswith(".json"):
@@ -287,6 +372,31 @@ def save_job_artifact(job_id, filename, data):
          with open(path, 'w') as f:
             f.write(data)
 
+def refresh_jd_analysis(job_id):
+    """
+    Recompute and persist jd_analysis.json from jd.txt (+ jd_keywords.json).
+    Called whenever the JD is saved: create job, save/PUT JD, improve JD.
+    """
+    jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    kw_data = load_job_artifact(job_id, "jd_keywords.json")
+    keywords = kw_data.get("must_have_keywords", []) if isinstance(kw_data, dict) else []
+    analysis = jd_analysis.analyze_jd(jd_text, keywords)
+    save_job_artifact(job_id, jd_analysis.JD_ANALYSIS_FILENAME, analysis)
+    return analysis
+
+def load_jd_analysis(job_id):
+    """
+    Return the job's JD analysis, rebuilding it if jd.txt/keywords changed behind our back
+    (older jobs, edits from the Streamlit dashboard) or the analysis version moved on.
+    """
+    analysis = load_job_artifact(job_id, jd_analysis.JD_ANALYSIS_FILENAME)
+    jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    kw_data = load_job_artifact(job_id, "jd_keywords.json")
+    keywords = kw_data.get("must_have_keywords", []) if isinstance(kw_data, dict) else []
+    if jd_analysis.is_current(analysis, jd_text, keywords):
+        return analysis
+    return refresh_jd_analysis(job_id)
+
 def update_candidate_status(job_id, candidate_name, new_status, new_score=None, screening_score=None):
     csv_path = os.path.join(JOBS_DIR, job_id, "cv_scores.csv")
     if os.path.exists(csv_path):
@@ -323,7 +433,7 @@ def update_candidate_status(job_id, candidate_name, new_status, new_score=None,
                 
                 # Cleanup temporary column before saving
                 df.drop(columns=['name_norm'], inplace=True)
-                df.to_csv(csv_path, index=False)
+                _save_candidates(df, csv_path)
             else:
                 existing_names = df['name'].tolist()[:5]
                 print(f"DEBUG: ERROR - No match found for '{candidate_name}' (norm: '{target_norm}'). CSV (norm sample): {[normalize(n) for n in existing_names]}")
@@ -332,13 +442,42 @@ def update_candidate_status(job_id, candidate_name, new_status, new_score=None,
                 if 'screening_score' not in df.columns:
                     df['screening_score'] = None
                     df.drop(columns=['name_norm'], inplace=True)
-                    df.to_csv(csv_path, index=False)
+                    _save_candidates(df, csv_path)
                 else:
                     df.drop(columns=['name_norm'], inplace=True)
             
             # Log it
             _append_log(job_id, "STATUS_UPDATE", f"{candidate_name} moved to {new_status}")
 
+def bulk_update_candidate_status(job_id, updates, event="STATUS_BULK_UPDATE"):
+    """
+    Apply many status changes ({candidate_name: new_status}) with one CSV read and
+    write and one log entry. Names match like update_candidate_status (underscores
+    vs spaces, case-insensitive). Returns the number of rows changed.
+    """
+    csv_path = os.path.join(JOBS_DIR, job_id, "cv_scores.csv")
+    if not updates or not os.path.exists(csv_path):
+        return 0
+    df = pd.read_csv(csv_path)
+    if df.empty or 'name' not in df.columns:
+        return 0
+
+    def normalize(s):
+        return str(s or "").replace("_", " ").strip().lower()
+
+    wanted = {normalize(n): status for n, status in updates.items()}
+    new_status = df['name'].map(normalize).map(wanted)
+    if 'status' not in df.columns:
+        df['status'] = "New"
+    mask = new_status.notna() & (new_status != df['status'])
+    if not mask.any():
+        return 0
+    df.loc[mask, 'status'] = new_status[mask]
+    _save_candidates(df, csv_path)
+    counts = new_status[mask].value_counts().to_dict()
+    _append_log(job_id, event, ", ".join(f"{n} moved to {status}" for status, n in counts.items()))
+    return int(mask.sum())
+
 def _append_log(job_id, event, details):
     log_path = os.path.join(JOBS_DIR, job_id, "activity_log.json")
     logs = []
@@ -421,77 +560,69 @@ def extract_contacts(text: str):
         pass
     return email, phone
 
-def calculate_score(resume_text, jd_text):
+def calculate_score(resume_text, jd_text, jd_view=None):
     """
     Improved scoring: Extracts key skills from JD and scores based on matches.
     Gives higher weight to technical skills and experience requirements.
+    jd_view: precomputed jd_analysis view; derived from jd_text when omitted.
     """
     if not resume_text or not jd_text:
         return 0.0
-    
-    STOP_WORDS = {
-        "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have",
-        "looking", "team", "work", "year", "years", "experience", "skills", "knowledge",
-        "strong", "proficient", "ability", "using", "from", "role", "responsibility",
-        "description", "requirements", "about", "what", "must", "should", "good", "data",
-        "them", "their", "they", "there", "here", "such", "including", "include", "ensure", "ensuring",
-        "per", "each", "other", "our", "your", "his", "her", "its",
-        "maintain", "maintaining", "maintenance", "test", "tests", "testing",
-        "seeking", "ideal", "candidate", "should", "have", "expertise", "proficiency", "relevant"
-    }
-
-    def tokenize(text):
-        words = re.findall(r"\b[a-zA-Z]{3,}\b", text.lower())
-        return [w for w in words if w not in STOP_WORDS]
-
-    # Extract key technical skills and terms from JD (higher weight)
-    TECH_SKILLS = ['python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node', 'sql', 
-                   'mongodb', 'postgresql', 'mysql', 'aws', 'azure', 'docker', 'kubernetes', 'jenkins', 
-                   'git', 'selenium', 'playwright', 'cypress', 'pytest', 'junit', 'testng', 'maven', 'gradle',
-                   'automation', 'manual', 'testing', 'qa', 'quality', 'assurance']
-    
-    # Extract experience requirement
-    exp_match = re.search(r'(\d+)\s*\+?\s*(?:yrs?|years?)', jd_text.lower())
-    required_exp = int(exp_match.group(1)) if exp_match else None
-    
-    # Tokenize JD and resume
-    jd_tokens = tokenize(jd_text)
-    resume_tokens = set(tokenize(resume_text))
-    
-    # Get unique JD tokens
-    seen = set()
-    jd_unique = []
-    for t in jd_tokens:
-        if t not in seen:
-            seen.add(t)
-            jd_unique.append(t)
+    view = jd_view or jd_analysis.text_view(jd_text)
+    required_exp = view["required_experience"]
+    jd_unique = view["tokens"]
     
     if not jd_unique:
         return 0.0
     
     # Calculate base score from token matches
+    resume_tokens = set(jd_analysis.scoring_tokens(resume_text))
     common = [t for t in jd_unique if t in resume_tokens]
-    base_score = (len(common) / max(len(jd_unique), 5)) * 10.0
     
-    # Bonus for technical skills matches (weighted higher)
-    tech_matches = sum(1 for skill in TECH_SKILLS if skill in resume_tokens and skill in [t.lower() for t in jd_unique])
-    tech_bonus = min(tech_matches * 1.5, 3.0)  # Max 3 points bonus
+    # Bonus for technical skills matches (weighted higher), via the shared skill taxonomy
+    jd_skills = set(view["skills"])
+    tech_matches = sum(1 for skill in taxonomy.extract_skills(resume_text) if skill in jd_skills)
     
     # Bonus for experience match
-    exp_bonus = 0.0
-    if required_exp:
-        resume_exp_match = re.search(r'(\d+)\s*\+?\s*(?:yrs?|years?)', resume_text.lower())
-        if resume_exp_match:
-            resume_exp = int(resume_exp_match.group(1))
-            if resume_exp >= required_exp:
-                exp_bonus = 2.0
-            elif resume_exp >= required_exp - 1:
-                exp_bonus = 1.0
+    exp_bonus = _experience_bonus(jd_analysis.required_experience(resume_text), required_exp)
     
+    return _keyword_score(len(common), len(jd_unique), tech_matches, exp_bonus)
+
+def _keyword_score(common_count, jd_token_count, tech_matches, exp_bonus):
+    """Keyword scorer formula; shared by calculate_score and the incremental rescore path."""
+    base_score = (common_count / max(jd_token_count, 5)) * 10.0
+    tech_bonus = min(tech_matches * 1.5, 3.0)  # Max 3 points bonus
     total_score = base_score + tech_bonus + exp_bonus
-    
     return round(min(total_score, 10.0), 1)
 
+def _experience_bonus(resume_exp, required_exp):
+    if not required_exp:
+        return 0.0
+    if resume_exp is None:
+        return 0.0
+    if resume_exp >= required_exp:
+        return 2.0
+    if resume_exp >= required_exp - 1:
+        return 1.0
+    return 0.0
+
+def _keyword_score_array(common, jd_token_counts, tech_matches, resume_exp, required_exps):
+    """
+    _keyword_score + _experience_bonus over arrays: rows are resumes, columns JDs.
+    resume_exp uses -1 for "not stated"; required_exps uses 0/None for "no requirement".
+    """
+    common = np.asarray(common, dtype=np.float64)
+    jd_counts = np.asarray(jd_token_counts, dtype=np.float64)
+    exp = np.asarray(resume_exp, dtype=np.float64)[:, None]
+    req = np.asarray([r or 0 for r in required_exps], dtype=np.float64)[None, :]
+    base = common / np.maximum(jd_counts, 5)[None, :] * 10.0
+    tech = np.minimum(np.asarray(tech_matches, dtype=np.float64) * 1.5, 3.0)
+    known = (exp >= 0) & (req > 0)
+    exp_bonus = np.where(known & (exp >= req), 2.0, np.where(known & (exp >= req - 1), 1.0, 0.0))
+    scores = np.round(np.minimum(base + tech + exp_bonus, 10.0), 1)
+    # Empty JDs score 0, as calculate_score does
+    return np.where((jd_counts > 0)[None, :], scores, 0.0)
+
 def get_resume_path(job_id, candidate_name):
     job_dir = os.path.join(JOBS_DIR, job_id)
     resumes_dir = os.path.join(job_dir, "resumes")
@@ -502,103 +633,48 @@ def get_resume_path(job_id, candidate_name):
                 return os.path.join(resumes_dir, f)
     return None
 
-def _heuristic_score_resume(resume_text, jd_text):
+def _heuristic_score_resume(resume_text, jd_text, jd_view=None):
     """
     Enhanced heuristic scoring for when LLM is unavailable.
     This is different from keyword-based scoring - it uses a more nuanced approach.
+    jd_view: precomputed jd_analysis view; derived from jd_text when omitted.
     """
     if not resume_text or not jd_text:
         return 0.0
-    
-    # Extract key skills from JD
-    TECH_SKILLS = ['python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node',
-                   'sql', 'mongodb', 'postgresql', 'mysql', 'aws', 'azure', 'docker', 'kubernetes',
-                   'jenkins', 'git', 'selenium', 'playwright', 'cypress', 'pytest', 'junit', 'testng',
-                   'automation', 'manual', 'testing', 'qa', 'quality', 'assurance']
-    
-    # Extract experience requirement
-    exp_match = re.search(r'(\d+)\s*\+?\s*(?:yrs?|years?)', jd_text.lower())
-    required_exp = int(exp_match.group(1)) if exp_match else None
-    
-    resume_lower = resume_text.lower()
-    jd_lower = jd_text.lower()
+    view = jd_view or jd_analysis.text_view(jd_text)
     
     # Score based on skill matches (weighted)
+    resume_skills = set(taxonomy.extract_skills(resume_text))
     skill_score = 0.0
-    for skill in TECH_SKILLS:
-        if skill in jd_lower:
-            if skill in resume_lower:
-                # Give more weight to technical skills
-                if skill in ['python', 'java', 'selenium', 'playwright', 'automation', 'testing']:
-                    skill_score += 1.5
-                else:
-                    skill_score += 1.0
+    for skill in view["skills"]:
+        if skill in resume_skills:
+            # Give more weight to core skills
+            skill_score += 1.5 if skill in CORE_SKILLS else 1.0
     
     # Cap skill score at 6.0
     skill_score = min(skill_score, 6.0)
     
     # Experience bonus
-    exp_bonus = 0.0
-    if required_exp:
-        resume_exp_match = re.search(r'(\d+)\s*\+?\s*(?:yrs?|years?)', resume_lower)
-        if resume_exp_match:
-            resume_exp = int(resume_exp_match.group(1))
-            if resume_exp >= required_exp:
-                exp_bonus = 2.0
-            elif resume_exp >= required_exp - 1:
-                exp_bonus = 1.0
+    exp_bonus = _experience_bonus(jd_analysis.required_experience(resume_text), view["required_experience"])
     
     # Overall relevance (simple keyword matching)
-    jd_words = set(re.findall(r'\b[a-z]{4,}\b', jd_lower))
-    resume_words = set(re.findall(r'\b[a-z]{4,}\b', resume_lower))
-    stop_words = {'that', 'this', 'with', 'from', 'have', 'will', 'can', 'are', 'was', 'were', 'been', 'being', 'has', 'had', 'does', 'did', 'do', 'is', 'am', 'an', 'as', 'at', 'be', 'by', 'if', 'in', 'it', 'of', 'on', 'or', 'to', 'we', 'you', 'your', 'our', 'their', 'they', 'them', 'these', 'those', 'which', 'who', 'what', 'when', 'where', 'why', 'how', 'all', 'any', 'but', 'not', 'only', 'some', 'such', 'than', 'then', 'there', 'very', 'would', 'years', 'yrs', 'experience', 'testing', 'manual', 'automation', 'engineer', 'engineers', 'candidate', 'candidates', 'should', 'must', 'required', 'requirements', 'include', 'includes', 'including', 'proficiency', 'expertise', 'strong', 'ideal', 'seeking', 'qualified'}
-    jd_words = jd_words - stop_words
-    resume_words = resume_words - stop_words
+    jd_words = set(view["relevance_words"])
+    resume_words = jd_analysis.relevance_words(resume_text)
     common_words = jd_words & resume_words
     relevance_score = min((len(common_words) / max(len(jd_words), 10)) * 2.0, 2.0)
     
     total = skill_score + exp_bonus + relevance_score
     return round(min(total, 10.0), 1)
 
-def get_matching_keywords(resume_text, jd_text):
-    STOP_WORDS = {
-        "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have",
-        "looking", "team", "work", "year", "years", "experience", "skills", "knowledge",
-        "strong", "proficient", "ability", "using", "from", "role", "responsibility",
-        "description", "requirements", "about", "what", "must", "should", "good", "data",
-        "them", "their", "they", "there", "here", "such", "including", "include", "ensure", "ensuring",
-        "per", "each", "other", "our", "your", "his", "her", "its",
-        "maintain", "maintaining", "maintenance", "test", "tests", "testing"
-    }
-
-    def tokenize(text):
-        words = re.findall(r"\b[a-zA-Z]{3,}\b", text.lower())
-        return [w for w in words if w not in STOP_WORDS]
-
-    jd_tokens = tokenize(jd_text)
-    # preserve unique JD tokens in order
-    seen = set()
-    jd_unique = []
-    for t in jd_tokens:
-        if t not in seen:
-            seen.add(t)
-            jd_unique.append(t)
-
-    cv_tokens = set(tokenize(resume_text))
-
+def get_matching_keywords(resume_text, jd_text, jd_view=None):
+    view = jd_view or jd_analysis.text_view(jd_text)
+    jd_unique = view["match_tokens"]
     if not jd_unique:
         return []
 
-    # Preserve JD order for explainability
-    matches = [t for t in jd_unique if t in cv_tokens]
-    # Deduplicate while preserving order
-    seen = set()
-    ordered = []
-    for t in matches:
-        if t not in seen:
-            seen.add(t)
-            ordered.append(t)
-    return ordered
+    cv_tokens = set(jd_analysis.keyword_tokens(resume_text))
+    # Preserve JD order for explainability (JD tokens are already unique)
+    return [t for t in jd_unique if t in cv_tokens]
 
 # --- LLM Agent Helpers ---
 
@@ -647,7 +723,7 @@ def _update_candidate_contact(job_id: str, candidate_name: str, email: str = Non
         if phone:
             df.loc[mask, "phone"] = df.loc[mask, "phone"].fillna("").replace("", phone)
             df.loc[mask, "phone"] = phone  # overwrite with latest
-        df.to_csv(csv_path, index=False)
+        _save_candidates(df, csv_path)
     except Exception as e:
         _append_log(job_id, "WARN", f"Contact persistence failed for {candidate_name}: {e}")
 
@@ -686,8 +762,22 @@ def _get_contact(job_id: str, candidate_name: str):
         _update_candidate_contact(job_id, candidate_name, ext_email, ext_phone)
     return ext_email, ext_phone
 
-def generate_interview_guide(job_id: str, candidate_name: str, round_type: str):
+def _llm_json(prompt, on_partial=None, **kwargs):
+    """llm.call_llm_json, or when on_partial is given, its stream with each partially parsed object passed to on_partial."""
+    if on_partial is None:
+        return llm.call_llm_json(prompt, **kwargs)
+    result = None
+    for kind, value in llm.stream_llm_json(prompt, **kwargs):
+        if kind == "partial":
+            on_partial(value)
+        else:
+            result = value
+    return result
+
+@llm_metrics.for_job
+def generate_interview_guide(job_id: str, candidate_name: str, round_type: str, on_partial=None):
     jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    jd_facts = jd_analysis.facts_block(load_jd_analysis(job_id))
     resume_excerpt = _read_resume_text(job_id, candidate_name)
     cand = _get_candidate_row(job_id, candidate_name)
     score = cand.get("score")
@@ -729,47 +819,32 @@ def generate_interview_guide(job_id: str, candidate_name: str, round_type: str):
             ]
         }
 
-    prompt = f"""
-You are an interview co-pilot. Create a tailored question set for round: {round_type}.
-Ground questions in both the JD and THIS candidate's resume. Avoid generic repeats; cite tools/skills seen in the resume.
-Return JSON only:
-{{
-  "fundamentals": [ "..." ],
-  "depth": [ "..." ],
-  "design_or_system": [ "..." ],
-  "behavioral": [ "..." ],
-  "red_flags": [ "..." ]
-}}
-Context:
-JD (truncated):
-{jd_text[:3000]}
-
-Candidate snapshot:
-score: {score}
-matches: {matches_readable}
-contact_email: {contact_email}
-contact_phone: {contact_phone}
-
-Resume excerpt (truncate to what you need):
-{resume_excerpt[:1400]}
-"""
-    guide = None
+    prompt, _ = prompt_templates.render("interview_guide", [
+        prompt_budget.Block("jd_text", jd_text, priority=1, min_tokens=300, max_tokens=900),
+        prompt_budget.Block("resume_excerpt", resume_excerpt, priority=2, min_tokens=200, max_tokens=600),
+    ], values={"round_type": round_type, "jd_facts": jd_facts, "score": score, "matches_readable": matches_readable,
+               "contact_email": contact_email, "contact_phone": contact_phone})
+    guide = llm_error = None
     systems = [
         "Be concise. JSON only. Keep lists <= 6 items. No trailing commas.",
         "Return strict JSON only. Lists max 5 items. No extra commentary.",
     ]
     for sys_prompt in systems:
         try:
-            guide = llm.call_llm_json(
+            guide = _llm_json(
                 prompt,
+                on_partial=on_partial,
                 system=sys_prompt,
                 max_tokens=480,
                 temperature=0.12,
+                site="interview_guide",
             )
             break
-        except llm.LLMError:
+        except llm.LLMError as e:
+            llm_error = e
             continue
     if not guide or not isinstance(guide, dict):
+        llm_metrics.record_fallback("interview_guide", llm_error if guide is None else "invalid response")
         guide = _basic_fallback()
 
     # persist
@@ -780,39 +855,23 @@ Resume excerpt (truncate to what you need):
         json.dump(guide, f, indent=2)
     return guide
 
+@llm_metrics.for_job
 def evaluate_interview(job_id: str, candidate_name: str, round_type: str, transcript: str):
     jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    jd_facts = jd_analysis.facts_block(load_jd_analysis(job_id))
     cand = _get_candidate_row(job_id, candidate_name)
     score = cand.get("score")
     matches = cand.get("matching_keywords", "")
 
-    prompt = f"""
-You are an interview evaluator for round: {round_type}.
-Return JSON with:
-{{
-  "overall_score_0_10": number,
-  "skill_scores": {{"skill": number}},
-  "strengths": ["..."],
-  "concerns": ["..."],
-  "hire_recommendation": "yes|maybe|no",
-  "rationale": "short paragraph",
-  "matched_keywords": ["..."]
-}}
-
-JD:
-{jd_text[:3000]}
-
-Candidate snapshot:
-score: {score}
-matches: {matches}
-
-Transcript/Q&A:
-{transcript[:4000]}
-"""
+    prompt, _ = prompt_templates.render("interview_evaluation", [
+        prompt_budget.Block("transcript", transcript, priority=1, min_tokens=600),
+        prompt_budget.Block("jd_text", jd_text, priority=2, min_tokens=300, max_tokens=600),
+    ], values={"round_type": round_type, "jd_facts": jd_facts, "score": score, "matches": matches})
     try:
-        evaluation = llm.call_llm_json(prompt, system="Be concise. JSON only. Scores 0-10.")
+        evaluation = llm.call_llm_json(prompt, system="Be concise. JSON only. Scores 0-10.", site="interview_evaluation")
     except Exception as e:
         print(f"Evaluate interview LLM failed: {e}")
+        llm_metrics.record_fallback("interview_evaluation", e)
         evaluation = {
             "overall_score_0_10": 5.0,
             "skill_scores": {"communication": 5, "technical": 5},
@@ -830,6 +889,7 @@ Transcript/Q&A:
         json.dump(evaluation, f, indent=2)
     return evaluation
 
+@llm_metrics.for_job
 def summarize_interviews(job_id: str, candidate_name: str):
     folder = os.path.join(JOBS_DIR, job_id, "interviews")
     summaries = []
@@ -842,25 +902,15 @@ def summarize_interviews(job_id: str, candidate_name: str):
                 except Exception:
                     continue
 
-    prompt = f"""
-You are summarizing multi-round interviews. Create a concise rollup.
-Return JSON:
-{{
-  "final_recommendation": "yes|maybe|no",
-  "overall_score_0_10": number,
-  "strengths": ["..."],
-  "concerns": ["..."],
-  "risks": ["..."],
-  "next_steps": ["..."]
-}}
-
-Round evaluations:
-{json.dumps(summaries)[:4000]}
-"""
+    # One evaluation per section, so truncation drops whole rounds
+    prompt, _ = prompt_templates.render("interview_summary", [
+        prompt_budget.Block("evaluations", "\n\n".join(json.dumps(s) for s in summaries)),
+    ])
     try:
-        summary = llm.call_llm_json(prompt, system="Be concise. JSON only.")
+        summary = llm.call_llm_json(prompt, system="Be concise. JSON only.", site="interview_summary")
     except Exception as e:
         print(f"Summarize interviews LLM failed: {e}")
+        llm_metrics.record_fallback("interview_summary", e)
         summary = {
             "final_recommendation": "maybe",
             "overall_score_0_10": 5.0,
@@ -891,20 +941,8 @@ def _heuristic_improve_jd(jd_text: str):
     experience_match = re.search(r'(\d+)\s*\+?\s*(?:yrs?|years?|years?\s+experience)', text, re.IGNORECASE)
     experience = experience_match.group(0) if experience_match else None
     
-    # Extract technologies/skills (common patterns)
-    tech_patterns = [
-        r'\b(python|java|javascript|typescript|react|angular|vue|node\.?js|sql|mongodb|postgresql|mysql|aws|azure|docker|kubernetes|jenkins|git|selenium|playwright|cypress|pytest|junit|testng)\b',
-        r'\b(manual\s+testing|automation\s+testing|api\s+testing|ui\s+testing|performance\s+testing|security\s+testing)\b',
-        r'\b(agile|scrum|kanban|ci/cd|devops|qa|quality\s+assurance)\b'
-    ]
-    
-    skills = []
-    for pattern in tech_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        skills.extend([m.lower() if isinstance(m, str) else m[0].lower() for m in matches])
-    
-    # Remove duplicates and sort
-    skills = sorted(list(set(skills)))
+    # Extract technologies/skills via the shared skill taxonomy
+    skills = sorted(taxonomy.extract_skills(text))
     
     # Build improved JD
     improved_parts = []
@@ -963,7 +1001,7 @@ def _heuristic_improve_jd(jd_text: str):
         overview_parts.append(f"We are seeking a qualified {role.lower()}.")
     
     if skills:
-        skills_list = [s.title() for s in skills[:8]]
+        skills_list = [taxonomy.skill_name(s) for s in skills[:8]]
         if len(skills_list) > 1:
             skills_text = ", ".join(skills_list[:-1]) + f", and {skills_list[-1]}"
         else:
@@ -983,7 +1021,7 @@ def _heuristic_improve_jd(jd_text: str):
     # Add technical skills as bullet points
     if skills:
         for skill in skills[:8]:
-            improved_lines.append(f"• Proficiency in {skill.title()}")
+            improved_lines.append(f"• Proficiency in {taxonomy.skill_name(skill)}")
     
     # Add any additional unique requirements from original text (if not already covered)
     cleaned_original = re.sub(r'\s+', ' ', text.strip())
@@ -1013,7 +1051,8 @@ def _heuristic_improve_jd(jd_text: str):
     
     return improved_jd, kw_list
 
-def improve_jd(job_id: str):
+@llm_metrics.for_job
+def improve_jd(job_id: str, on_partial=None):
     jd_text = load_job_artifact(job_id, "jd.txt") or ""
     jt = str(jd_text or "").strip()
     PLACEHOLDER_MARKERS = [
@@ -1044,17 +1083,7 @@ def improve_jd(job_id: str):
             "must_have_keywords": ["role summary", "must-have skills", "experience", "location", "impact"],
             "risks": ["No JD provided yet; add content to get an improved draft."]
         }
-    prompt = f"""
-You are a JD improvement assistant. Given the JD, tighten it, highlight must-have skills, and return improved text plus a keyword list.
-Return JSON:
-{{
-  "improved_jd": "...",
-  "must_have_keywords": ["..."],
-  "risks": ["..."]
-}}
-JD:
-{jd_text[:4000]}
-"""
+    prompt, _ = prompt_templates.render("improve_jd", [prompt_budget.Block("jd_text", jd_text)])
     def _strip_fences(text: str) -> str:
         if not isinstance(text, str):
             return text
@@ -1070,17 +1099,24 @@ JD:
     # Plain-text rewrite with inline keywords to avoid brittle JSON parsing
     llm_success = False
     raw = ""
+    rewrite = dict(
+        system=(
+            "Rewrite the JD concisely in plain text. No markdown, no code fences. "
+            "STRICT: keep all hard constraints (years of experience, location, remote/on-site, certifications, tech stack) verbatim; do not drop numbers like '4 years'. "
+            "At the end add a line starting exactly with 'Keywords:' followed by comma-separated must-have skills, including any numeric/tenure requirements."
+        ),
+        max_tokens=800,
+        temperature=0.25,
+        site="improve_jd",
+    )
     try:
-        raw = llm.call_llm(
-            prompt,
-            system=(
-                "Rewrite the JD concisely in plain text. No markdown, no code fences. "
-                "STRICT: keep all hard constraints (years of experience, location, remote/on-site, certifications, tech stack) verbatim; do not drop numbers like '4 years'. "
-                "At the end add a line starting exactly with 'Keywords:' followed by comma-separated must-have skills, including any numeric/tenure requirements."
-            ),
-            max_tokens=800,
-            temperature=0.25,
-        )
+        if on_partial is None:
+            raw = llm.call_llm(prompt, **rewrite)
+        else:
+            # Forward the draft as it is written (the Keywords line is parsed at the end)
+            for delta in llm.stream_llm(prompt, **rewrite):
+                raw += delta
+                on_partial({"improved_jd": _strip_fences(raw).split("Keywords:", 1)[0].strip()})
         llm_success = True
     except Exception as e:
         # LLM failed - use heuristic improvement as fallback
@@ -1090,6 +1126,7 @@ JD:
     
     # If LLM failed, use heuristic improvement
     if not llm_success:
+        llm_metrics.record_fallback("improve_jd", llm_error)
         improved_jd, kw_list = _heuristic_improve_jd(jd_text)
         result = {
             "improved_jd": improved_jd,
@@ -1100,6 +1137,7 @@ JD:
         if not _is_empty(jt):
             save_job_artifact(job_id, "jd.txt", improved_jd)
             save_job_artifact(job_id, "jd_keywords.json", result)
+            refresh_jd_analysis(job_id)
         return result
 
     raw = _strip_fences(raw or "")
@@ -1118,7 +1156,9 @@ JD:
         tail = keywords_line.split(":", 1)[1] if ":" in keywords_line else ""
         kw_list = [k.strip() for k in tail.split(",") if k.strip()]
 
-    # Heuristic keywords if none extracted
+    # Heuristic keywords if none extracted: taxonomy skills first, then frequent tokens
+    if not kw_list:
+        kw_list = taxonomy.extract_skills(jd_text)[:8]
     if not kw_list:
         import re as _re
         STOP = {"and","the","with","for","a","an","of","to","in","on","at","by","from","that","this","these","those","you","your","our","we","will","can","is","are","be","as","or","if","but"}
@@ -1139,11 +1179,124 @@ JD:
     if not _is_empty(jt):
         save_job_artifact(job_id, "jd.txt", result.get("improved_jd", jd_text))
         save_job_artifact(job_id, "jd_keywords.json", result)
+        refresh_jd_analysis(job_id)
     return result
 
 # --- LLM Resume Scoring Agent ---
-def llm_score_candidates(job_id: str):
-    jd_text = load_job_artifact(job_id, "jd.txt") or ""
+RESUME_SCORE_JD_TOKENS = 800
+RESUME_SCORE_RESUME_TOKENS = 900
+_LLM_SCORE_SYSTEM = "Be strict when scoring. Only give 8-10 for excellent matches. Most candidates should score 4-7. Return JSON only."
+
+def _llm_score_prompt(resume_text, jd_view):
+    prompt, _ = prompt_templates.render("resume_score", [
+        prompt_budget.Block("scoring_jd", jd_view["text"], priority=1, min_tokens=300, max_tokens=RESUME_SCORE_JD_TOKENS),
+        prompt_budget.Block("resume_text", resume_text, priority=2, min_tokens=400, max_tokens=RESUME_SCORE_RESUME_TOKENS),
+    ])
+    return prompt
+
+def _llm_score_result(res):
+    llm_score = res.get("score_0_10")
+    if llm_score is None or not isinstance(llm_score, (int, float)):
+        raise ValueError("Invalid score from LLM")
+    return {"score": float(llm_score), "matching_keywords": res.get("matched_keywords", [])}
+
+def _llm_score_resume(resume_text, jd_view):
+    res = llm.call_llm_json(_llm_score_prompt(resume_text, jd_view), system=_LLM_SCORE_SYSTEM, site="resume_score")
+    return _llm_score_result(res)
+
+async def _allm_score_resume(resume_text, jd_view):
+    res = await llm.acall_llm_json(_llm_score_prompt(resume_text, jd_view), system=_LLM_SCORE_SYSTEM, site="resume_score")
+    return _llm_score_result(res)
+
+# Batched LLM scoring: K resumes per call share one copy of the JD block
+LLM_SCORE_BATCH_SIZE = int(os.getenv("LLM_SCORE_BATCH_SIZE", "1"))  # 1 = one resume per call
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))  # resume tokens per call
+
+def _llm_score_group_prompt(items, jd_view):
+    # Item ids are generated (c1, c2...), so they are safe to splice into the template
+    resumes = "\n\n".join(f"### {item_id}\n{{r{i}}}" for i, (item_id, _) in enumerate(items))
+    blocks = [prompt_budget.Block("scoring_jd", jd_view["text"], priority=1, min_tokens=300, max_tokens=RESUME_SCORE_JD_TOKENS)]
+    blocks += [prompt_budget.Block(f"r{i}", text, priority=2, min_tokens=200, max_tokens=RESUME_SCORE_RESUME_TOKENS)
+               for i, (_, text) in enumerate(items)]
+    budget = prompt_budget.site_budget("resume_score") + RESUME_SCORE_RESUME_TOKENS * (len(items) - 1)
+    prompt, _ = prompt_templates.render("resume_score_batch", blocks, values={"ids": ", ".join(item_id for item_id, _ in items)},
+                                        budget=budget, call_template=resumes)
+    return prompt
+
+async def _allm_score_group(items, jd_view):
+    """{item_id: result} for the items the model scored validly; the rest are left out for a retry."""
+    res = await llm.acall_llm_json(
+        _llm_score_group_prompt(items, jd_view), system=_LLM_SCORE_SYSTEM, site="resume_score",
+        max_tokens=200 + 150 * len(items),
+    )
+    entries = res.get("results") if isinstance(res, dict) else res
+    if isinstance(entries, dict):
+        entries = [{"id": k, **v} for k, v in entries.items() if isinstance(v, dict)]
+    wanted = {item_id for item_id, _ in items}
+    out = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or str(entry.get("id")) not in wanted:
+            continue
+        try:
+            out[str(entry["id"])] = _llm_score_result(entry)
+        except ValueError:
+            continue
+    return out
+
+# Gated LLM scoring: rank everyone with a cheap scorer, send only the top N / top X%
+# (plus a small random exploration sample) to the LLM; the rest keep the cheap score
+LLM_GATE_TOP_N = int(os.getenv("LLM_GATE_TOP_N", "0"))
+LLM_GATE_TOP_PERCENT = float(os.getenv("LLM_GATE_TOP_PERCENT", "20"))
+LLM_GATE_EXPLORE = float(os.getenv("LLM_GATE_EXPLORE", "0.05"))  # fraction of the gated-out candidates
+
+# Bulk requisitions: the distilled scorer pre-ranks (LLM only for the top K) or replaces the LLM
+DISTILLED_MODE = os.getenv("DISTILLED_MODE", "prerank")  # prerank | replace | off
+DISTILLED_BULK_THRESHOLD = int(os.getenv("DISTILLED_BULK_THRESHOLD", "200"))
+DISTILLED_PRERANK_TOP = int(os.getenv("DISTILLED_PRERANK_TOP", "50"))
+DISTILLED_MAX_MAE = float(os.getenv("DISTILLED_MAX_MAE", "1.5"))
+
+def _distilled_bulk_mode(candidate_count: int):
+    """'prerank' / 'replace' when this run should lean on the distilled scorer, else None."""
+    if DISTILLED_MODE not in ("prerank", "replace") or candidate_count < DISTILLED_BULK_THRESHOLD:
+        return None
+    model = distilled.load_model()
+    if model is None:
+        return None
+    mae = model.meta.get("calibration", {}).get("mae")
+    if mae is None or mae > DISTILLED_MAX_MAE:
+        return None
+    if DISTILLED_MODE == "prerank" and candidate_count <= DISTILLED_PRERANK_TOP:
+        return None
+    return DISTILLED_MODE
+
+def _gate_candidates(ranked_names, top_n=None, top_percent=None, explore=None, seed=""):
+    """
+    Split candidates (best first) into (top, explored, gated_out). top_n and top_percent
+    may both be given (the larger cut wins); explore is a fraction of the remainder,
+    sampled with a seed so reruns against the same JD pick the same candidates.
+    """
+    total = len(ranked_names)
+    cut = max(int(top_n or 0), int(math.ceil(total * float(top_percent or 0) / 100.0)))
+    cut = min(max(cut, 1), total) if total else 0
+    top = list(ranked_names[:cut])
+    rest = list(ranked_names[cut:])
+    explore_count = int(round(len(rest) * float(explore or 0)))
+    if explore and rest and explore_count == 0:
+        explore_count = 1
+    explored = random.Random(seed).sample(rest, min(explore_count, len(rest)))
+    picked = set(explored)
+    return top, explored, [n for n in rest if n not in picked]
+
+@llm_metrics.for_job
+def llm_score_candidates(job_id: str, gated: bool = False, top_n=None, top_percent=None, explore=None, batch_size=None):
+    """
+    LLM-score a job's candidates. gated=True (or a bulk requisition with a calibrated
+    distilled scorer) ranks everyone with a cheap scorer first and sends only the top
+    N / top X% plus an exploration sample to the LLM; the rest keep the cheap score,
+    flagged in the score_source column. batch_size > 1 packs up to that many resumes
+    (within LLM_BATCH_TOKEN_BUDGET) into each LLM call.
+    """
+    batch_size = max(int(LLM_SCORE_BATCH_SIZE if batch_size is None else batch_size), 1)
     csv_path = os.path.join(JOBS_DIR, job_id, "cv_scores.csv")
     if not os.path.exists(csv_path):
         _append_log(job_id, "LLM_SCORE_ERROR", "No candidates CSV found")
@@ -1154,86 +1307,365 @@ def llm_score_candidates(job_id: str):
         return {"updated": 0}
 
     _append_log(job_id, "LLM_SCORE_START", f"Starting LLM scoring for {len(df)} candidates")
-    updated = 0
-    for idx, row in df.iterrows():
-        candidate = row.get("name")
-        resume_text = _read_resume_text(job_id, candidate, max_chars=3500)
-        if not resume_text.strip():
-            _append_log(job_id, "LLM_SCORE_SKIP", f"Skipping {candidate} - no resume text")
+    bulk_mode = _distilled_bulk_mode(len(df))
+    if bulk_mode == "replace":
+        distilled_result = run_job_scorers(job_id, scorer_ids=[DISTILLED_SCORER_ID], primary=DISTILLED_SCORER_ID)
+        _append_log(job_id, "LLM_SCORE_COMPLETE", f"Bulk requisition: distilled scorer replaced LLM scoring for {distilled_result['updated']}/{len(df)} candidates")
+        _auto_apply_rules(job_id)
+        return {"updated": distilled_result["updated"], "cache_hits": distilled_result["cache_hits"],
+                "cache_misses": distilled_result["cache_misses"], "distilled": bulk_mode,
+                "llm_calls": 0, "llm_calls_saved": len(df)}
+
+    names = None
+    gate = None
+    if gated or bulk_mode == "prerank":
+        # Cheap pass first: its score stays on every candidate the LLM does not see
+        ranker = DISTILLED_SCORER_ID if bulk_mode == "prerank" else HEURISTIC_SCORER_ID
+        cheap = run_job_scorers(job_id, scorer_ids=[ranker], primary=ranker)
+        ranked = pd.read_csv(csv_path)
+        ranked["_rank"] = pd.to_numeric(ranked.get(scorers.get_scorer(ranker).column), errors="coerce").fillna(-1)
+        order = ranked.sort_values("_rank", ascending=False, kind="stable")["name"].astype(str).tolist()
+        if not gated:
+            top_n, top_percent = DISTILLED_PRERANK_TOP, 0
+        elif top_n is None and top_percent is None:
+            top_n, top_percent = LLM_GATE_TOP_N, LLM_GATE_TOP_PERCENT
+        top, explored, gated_out = _gate_candidates(
+            order, top_n=top_n, top_percent=top_percent,
+            explore=LLM_GATE_EXPLORE if explore is None else explore,
+            seed=f"{job_id}:{load_jd_analysis(job_id)['analysis_hash']}",
+        )
+        names = top + explored
+        gate = {"ranker": ranker, "top": len(top), "explored": len(explored), "gated_out": len(gated_out),
+                "ranker_cache_hits": cheap["cache_hits"], "ranker_cache_misses": cheap["cache_misses"]}
+        _append_log(job_id, "LLM_SCORE_GATE", f"Ranked {len(order)} candidates by {ranker}: LLM scoring top {len(top)} + {len(explored)} exploration, {len(gated_out)} keep {ranker} scores")
+
+    # LLM scorer (heuristic fallback when the LLM fails) written to 'score' for this run
+    started = time.time()
+    result = run_job_scorers(job_id, scorer_ids=[LLM_SCORER_ID], primary=LLM_SCORER_ID, names=names, group_size=batch_size)
+    llm_elapsed = time.time() - started
+    llm_report = result["scorers"].get(LLM_SCORER_ID, {})
+    if llm_report.get("fallbacks"):
+        _append_log(job_id, "LLM_SCORE_FALLBACK", f"Used heuristic scoring for {llm_report['fallbacks']} candidates (LLM unavailable or invalid response)")
+    if llm_report.get("skipped"):
+        _append_log(job_id, "LLM_SCORE_SKIP", f"Skipped {llm_report['skipped']} candidates - no resume text")
+    updated = llm_report.get("scored", 0)
+    if batch_size > 1:
+        _append_log(job_id, "LLM_SCORE_BATCHED", f"Packed up to {batch_size} resumes per call: {llm_report.get('groups', 0)} batched calls, {llm_report.get('retried', 0)} resumes retried individually")
+    _append_log(job_id, "LLM_SCORE_COMPLETE", f"LLM scoring complete. Updated {updated}/{len(df)} candidates (cache hits: {result['cache_hits']}, misses: {result['cache_misses']})")
+    if updated > llm_report.get("fallbacks", 0):
+        # Collect this JD's LLM scores for the distilled scorer while they can still be featurized
+        try:
+            harvest_distilled_samples(job_id)
+        except Exception as e:
+            _append_log(job_id, "DISTILLED_SAMPLES_WARN", f"Could not harvest samples: {str(e)}")
+
+    out = {"updated": updated, "cache_hits": result["cache_hits"], "cache_misses": result["cache_misses"]}
+    if batch_size > 1:
+        out.update(batch_size=batch_size, batched_calls=llm_report.get("groups", 0), retried=llm_report.get("retried", 0))
+    if gate is not None:
+        # Savings are estimated from this run's own LLM calls (batched calls hold up to batch_size resumes)
+        calls = llm_report.get("calls", 0)
+        per_call = llm_elapsed / calls if calls else 0.0
+        saved = -(-gate["gated_out"] // batch_size)
+        gate.update({
+            "llm_calls": calls,
+            "llm_calls_saved": saved,
+            "est_time_saved_s": round(saved * per_call, 2),
+            "llm_elapsed_s": round(llm_elapsed, 2),
+        })
+        _append_log(job_id, "LLM_SCORE_SAVINGS", f"Gating saved {saved} LLM calls (~{gate['est_time_saved_s']}s)")
+        out.update(gate)
+        if bulk_mode == "prerank":
+            out["distilled"] = bulk_mode
+    applied = _auto_apply_rules(job_id)
+    if applied is not None:
+        out["rules_changed"] = applied["changed"]
+    return out
+
+# --- Scorer Registry ---
+def _keyword_scorer(resume_text, jd_view):
+    return {
+        "score": float(calculate_score(resume_text, jd_view["text"], jd_view=jd_view)),
+        "matching_keywords": get_matching_keywords(resume_text, jd_view["text"], jd_view=jd_view),
+    }
+
+def _heuristic_scorer(resume_text, jd_view):
+    return {
+        "score": float(_heuristic_score_resume(resume_text, jd_view["text"], jd_view=jd_view)),
+        "matching_keywords": get_matching_keywords(resume_text, jd_view["text"], jd_view=jd_view),
+    }
+
+def _semantic_batch_scorer(job_dir, jd_view):
+    return {name: {"score": score} for name, score in semantic.score_all(job_dir, jd_view["text"]).items()}
+
+def _distilled_scorer(resume_text, jd_view):
+    model = distilled.load_model()
+    if model is None:
+        raise ValueError("Distilled scorer has not been trained")
+    return {
+        "score": model.predict(resume_text, jd_view),
+        "matching_keywords": get_matching_keywords(resume_text, jd_view["text"], jd_view=jd_view),
+    }
+
+scorers.register(scorers.Scorer(
+    KEYWORD_SCORER_ID, f"{KEYWORD_SCORER_VERSION}:{taxonomy.taxonomy_version()}", scorers.COST_CHEAP,
+    fn=_keyword_scorer, jd_view="keyword_view",
+    description="JD token overlap + taxonomy skill and experience bonuses",
+))
+scorers.register(scorers.Scorer(
+    HEURISTIC_SCORER_ID, f"{HEURISTIC_SCORER_VERSION}:{taxonomy.taxonomy_version()}", scorers.COST_CHEAP,
+    fn=_heuristic_scorer, jd_view="llm_view", max_chars=3500,
+    description="Weighted skill matches, experience and relevance against the requirements section",
+))
+scorers.register(scorers.Scorer(
+    SEMANTIC_SCORER_ID, semantic.SEMANTIC_VERSION, scorers.COST_CHEAP,
+    batch_fn=_semantic_batch_scorer, jd_view="keyword_view", column="semantic_score",
+    description="Offline hashed n-gram embedding similarity",
+))
+scorers.register(scorers.Scorer(
+    DISTILLED_SCORER_ID, distilled.model_version, scorers.COST_CHEAP,
+    fn=_distilled_scorer, jd_view="llm_view", max_chars=3500, fallback=HEURISTIC_SCORER_ID,
+    description="Local model distilled from cached LLM scores (heuristic until trained)",
+))
+scorers.register(scorers.Scorer(
+    LLM_SCORER_ID, f"{LLM_SCORER_VERSION}:{llm.LITELLM_MODEL}", scorers.COST_LLM,
+    fn=_llm_score_resume, async_fn=_allm_score_resume, async_group_fn=_allm_score_group, jd_view="llm_view", max_chars=3500, fallback=HEURISTIC_SCORER_ID,
+    description="LLM judgement against the requirements section",
+))
+
+def get_scoring_config(job_id: str):
+    meta = load_job_meta(job_id) or {}
+    try:
+        return scorers.normalize_config(meta.get("scoring"))
+    except ValueError:
+        # A scorer named in an old config is no longer registered
+        return scorers.normalize_config(None)
+
+def set_scoring_config(job_id: str, config: dict):
+    """Validate and persist which scorers run for a job, the primary one and the shadows."""
+    config = scorers.normalize_config(config)
+    meta = load_job_meta(job_id) or {}
+    meta["scoring"] = config
+    meta["updated_at"] = datetime.now().isoformat()
+    save_job_meta(job_id, meta)
+    _append_log(job_id, "SCORING_CONFIG_UPDATED", f"primary={config['primary']} scorers={config['scorers']} shadow={config['shadow']}")
+    return config
+
+def _resume_paths(job_id: str, names):
+    """Candidate name -> resume path, same first-prefix-match rule as get_resume_path, one listdir."""
+    resumes_dir = os.path.join(_job_dir(job_id), "resumes")
+    files = os.listdir(resumes_dir) if os.path.exists(resumes_dir) else []
+    paths = {}
+    for name in names:
+        low = str(name).lower()
+        for f in files:
+            if f.lower().startswith(low):
+                paths[name] = os.path.join(resumes_dir, f)
+                break
+    return paths
+
+def _compare_scores(primary, shadow):
+    """Agreement between a shadow scorer and the primary over candidates both scored."""
+    both = pd.DataFrame({"p": pd.to_numeric(primary, errors="coerce"), "s": pd.to_numeric(shadow, errors="coerce")}).dropna()
+    if both.empty:
+        return {"paired": 0}
+    top_n = min(10, len(both))
+    top_p = set(both["p"].nlargest(top_n).index)
+    top_s = set(both["s"].nlargest(top_n).index)
+    stats = {
+        "paired": int(len(both)),
+        "mean_abs_diff": round(float((both["p"] - both["s"]).abs().mean()), 3),
+        "mean_shift": round(float((both["s"] - both["p"]).mean()), 3),
+        "top10_overlap": round(len(top_p & top_s) / top_n, 3),
+    }
+    if len(both) > 1 and both["p"].nunique() > 1 and both["s"].nunique() > 1:
+        stats["pearson"] = round(float(both["p"].corr(both["s"])), 3)
+        stats["spearman"] = round(float(both["p"].rank().corr(both["s"].rank())), 3)
+    return stats
+
+@llm_metrics.for_job
+def run_job_scorers(job_id: str, scorer_ids=None, primary=None, skip=(), names=None, group_size=1):
+    """
+    Run a job's configured scorers (or scorer_ids) concurrently, persist one score
+    column per scorer and copy the primary scorer's result into 'score' (and its
+    keywords into 'matching_keywords'). Shadow scorers only get their own column
+    plus an agreement report against the primary (scoring_report.json).
+    skip: scorers whose column the caller has just refreshed itself.
+    names: score only these candidates; other rows keep 'score' and drop stale
+    values in the scorers' columns.
+    group_size: resumes per call for scorers that support multi-resume prompts.
+    """
+    job_dir = _job_dir(job_id)
+    csv_path = os.path.join(job_dir, "cv_scores.csv")
+    config = get_scoring_config(job_id)
+    primary = primary or config["primary"]
+    scorers.get_scorer(primary)
+    ids = list(dict.fromkeys(scorer_ids or (config["scorers"] + config["shadow"])))
+    run_ids = [sid for sid in ids if sid not in skip]
+    empty = {"updated": 0, "scorers": {}, "shadow": {}, "cache_hits": 0, "cache_misses": 0}
+    if not os.path.exists(csv_path):
+        return empty
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        return empty
+
+    started = time.time()
+    analysis = load_jd_analysis(job_id)
+    all_names = df["name"].astype(str)
+    selected = all_names.tolist() if names is None else [n for n in all_names if n in set(names)]
+    paths = _resume_paths(job_id, selected)
+    candidates = [(n, score_cache.file_hash(paths[n])) for n in selected if n in paths]
+    cache = score_cache.open_cache(job_dir)
+    report = scorers.run_scorers(run_ids, candidates, analysis, lambda n: extract_text(paths[n]), cache, job_dir,
+                                 group_size=group_size, group_chars=LLM_BATCH_TOKEN_BUDGET * prompt_budget.CHARS_PER_TOKEN)
+    cache.save()
+
+    for sid in run_ids:
+        scorer = scorers.get_scorer(sid)
+        results = report[sid]["results"]
+        fresh = all_names.map({n: r["score"] for n, r in results.items()})
+        if names is not None or scorer.column not in df.columns:
+            df[scorer.column] = fresh
+        else:
+            df[scorer.column] = fresh.where(fresh.notna(), df[scorer.column])
+        if sid == primary:
+            keywords = {n: json.dumps(r["matching_keywords"]) for n, r in results.items() if "matching_keywords" in r}
+            if keywords:
+                kw = all_names.map(keywords)
+                df["matching_keywords"] = kw.where(kw.notna(), df.get("matching_keywords"))
+
+    primary_col = scorers.get_scorer(primary).column
+    if primary_col in df.columns and primary_col != "score":
+        primary_scores = pd.to_numeric(df[primary_col], errors="coerce")
+        df["score"] = primary_scores.where(primary_scores.notna(), df["score"])
+        source = df[SCORE_SOURCE_COLUMN] if SCORE_SOURCE_COLUMN in df.columns else pd.Series(None, index=df.index, dtype=object)
+        df[SCORE_SOURCE_COLUMN] = source.where(primary_scores.isna(), primary)
+        # Rows the primary's fallback scored are labelled with the scorer that actually scored them
+        fell_back = report.get(primary, {}).get("fell_back") or []
+        if fell_back:
+            df.loc[all_names.isin(fell_back), SCORE_SOURCE_COLUMN] = scorers.get_scorer(primary).fallback
+
+    shadow = {}
+    for sid in config["shadow"]:
+        if sid in ids and sid != primary:
+            shadow[sid] = _compare_scores(df[primary_col], df[scorers.get_scorer(sid).column])
+    _save_candidates(df, csv_path)
+
+    elapsed = round(time.time() - started, 3)
+    summary = {sid: {k: v for k, v in report[sid].items() if k not in ("results", "fell_back")} for sid in run_ids}
+    if shadow or len(ids) > 1:
+        save_job_artifact(job_id, "scoring_report.json", {
+            "created_at": datetime.now().isoformat(),
+            "primary": primary,
+            "scorers": summary,
+            "shadow": shadow,
+            "elapsed_s": elapsed,
+        })
+    stats = cache.stats()
+    _append_log(job_id, "SCORERS_RUN", f"primary={primary} ran={run_ids} in {elapsed}s (cache hits: {stats['cache_hits']}, misses: {stats['cache_misses']})")
+    return {
+        "updated": report[primary]["scored"] if primary in report else 0,
+        "scorers": summary,
+        "shadow": shadow,
+        **stats,
+    }
+
+# --- Distilled Scorer Training ---
+def harvest_distilled_samples(job_id: str):
+    """
+    Turn the job's cached LLM scores into distilled-scorer training samples.
+    Only entries for the current JD analysis can be featurized (older JD text is gone),
+    so llm_score_candidates harvests after each LLM scoring run to let samples accumulate.
+    """
+    job_dir = _job_dir(job_id)
+    if not os.path.exists(os.path.join(job_dir, "jd.txt")):
+        return 0
+    analysis = load_jd_analysis(job_id)
+    marker = f"|{analysis['analysis_hash']}|"
+    cache = score_cache.open_cache(job_dir)
+    known = distilled.load_samples()
+    entries = [(k, v) for k, v in cache.entries(f"{LLM_SCORER_ID}@")
+               if marker in k and k not in known and isinstance(v.get("score"), (int, float))]
+    if not entries:
+        return 0
+    resumes_dir = os.path.join(job_dir, "resumes")
+    by_hash = {}
+    for f in sorted(os.listdir(resumes_dir)) if os.path.exists(resumes_dir) else []:
+        path = os.path.join(resumes_dir, f)
+        by_hash.setdefault(score_cache.file_hash(path), path)
+    jd_view = analysis["llm_view"]
+    samples = []
+    for key, value in entries:
+        path = by_hash.get(key.rsplit("|", 1)[-1])
+        if path is None:
             continue
-        # Extract key requirements from improved JD format for LLM scoring
-        scoring_jd = jd_text
-        if "Key Requirements:" in jd_text:
-            # Extract the key requirements section
-            key_req_match = re.search(r'Key Requirements:\s*(.+?)(?:\n\n|\Z)', jd_text, re.IGNORECASE | re.DOTALL)
-            if key_req_match:
-                key_req_text = key_req_match.group(1)
-                # Also try to get keywords from jd_keywords.json
-                jd_keywords_path = os.path.join(JOBS_DIR, job_id, "jd_keywords.json")
-                if os.path.exists(jd_keywords_path):
-                    try:
-                        with open(jd_keywords_path, 'r') as f:
-                            jd_keywords = json.load(f)
-                            keywords = jd_keywords.get("must_have_keywords", [])
-                            if keywords:
-                                scoring_jd = f"Required skills: {', '.join(keywords)}. {key_req_text}"
-                            else:
-                                scoring_jd = key_req_text
-                    except:
-                        scoring_jd = key_req_text
-                else:
-                    scoring_jd = key_req_text
-        
-        prompt = f"""
-Score this resume against the JD requirements. Be strict - only high scores for strong matches.
-Return JSON:
-{{
-  "score_0_10": number (0-10, be conservative),
-  "matched_keywords": ["..."],
-  "rationale": "short explanation"
-}}
-JD Requirements:
-{scoring_jd[:3000]}
-
-Resume:
-{resume_text[:3000]}
-"""
+        text = (extract_text(path) or "")[:3500]
+        if not text.strip():
+            continue
+        heuristic = float(_heuristic_score_resume(text, jd_view["text"], jd_view=jd_view))
+        samples.append(distilled.make_sample(key, text, jd_view, value["score"], heuristic))
+    added = distilled.append_samples(samples)
+    if added:
+        _append_log(job_id, "DISTILLED_SAMPLES", f"Harvested {added} new LLM-scored samples for the distilled scorer")
+    return added
+
+def train_distilled_scorer(job_ids=None):
+    """Harvest samples from every job (or job_ids), retrain the distilled scorer and return its report."""
+    ensure_jobs_dir()
+    job_ids = job_ids or [d for d in sorted(os.listdir(JOBS_DIR)) if os.path.isdir(os.path.join(JOBS_DIR, d))]
+    harvested = 0
+    for job_id in job_ids:
         try:
-            res = llm.call_llm_json(prompt, system="Be strict when scoring. Only give 8-10 for excellent matches. Most candidates should score 4-7. Return JSON only.")
-            llm_score = res.get("score_0_10", row.get("score", 0))
-            if llm_score is None or not isinstance(llm_score, (int, float)):
-                raise ValueError("Invalid score from LLM")
-            df.at[idx, "score"] = float(llm_score)
-            df.at[idx, "matching_keywords"] = json.dumps(res.get("matched_keywords", []))
-            updated += 1
-            _append_log(job_id, "LLM_SCORE_SUCCESS", f"Scored {candidate}: {llm_score}/10 (LLM)")
+            harvested += harvest_distilled_samples(job_id)
         except Exception as e:
-            # LLM failed - use enhanced heuristic scoring as fallback (different from keyword-based)
-            error_msg = str(e)
-            _append_log(job_id, "LLM_SCORE_FALLBACK", f"Using heuristic scoring for {candidate} (LLM error: {error_msg[:50]})")
-            # Use enhanced heuristic scoring that's different from keyword-based
-            try:
-                heuristic_score = _heuristic_score_resume(resume_text, scoring_jd)
-                df.at[idx, "score"] = float(heuristic_score)
-                # Extract keywords heuristically
-                matches = get_matching_keywords(resume_text, scoring_jd)
-                df.at[idx, "matching_keywords"] = json.dumps(matches)
-                updated += 1
-                _append_log(job_id, "LLM_SCORE_SUCCESS", f"Scored {candidate}: {heuristic_score}/10 (Heuristic)")
-            except Exception as e2:
-                _append_log(job_id, "HEURISTIC_SCORE_ERROR", f"Failed to score {candidate} even with heuristic: {str(e2)}")
-                # Keep existing score if both methods fail
-                pass
-    
-    # Write to CSV and ensure it's flushed
-    df.to_csv(csv_path, index=False)
-    _append_log(job_id, "LLM_SCORE_COMPLETE", f"LLM scoring complete. Updated {updated}/{len(df)} candidates")
-    
-    return {"updated": updated}
+            _append_log(job_id, "DISTILLED_SAMPLES_WARN", f"Could not harvest samples: {str(e)}")
+    model = distilled.train()
+    return {"harvested": harvested, **distilled_scorer_report(model)}
+
+def distilled_scorer_report(model=None):
+    """Model id, training size and calibration report of the current distilled scorer."""
+    if model is None:
+        current = distilled.load_model()
+        model = current.to_dict() if current else None
+    if model is None:
+        return {"trained": False, "samples": len(distilled.load_samples()), "min_samples": distilled.MIN_TRAIN_SAMPLES}
+    return {
+        "trained": True,
+        "version": distilled.model_version(),
+        "trained_at": model.get("trained_at"),
+        "train_samples": model.get("train_samples"),
+        "calibration": model.get("calibration"),
+        "features": dict(zip(model["feature_names"], [round(w, 4) for w in model["weights"]])),
+        "bulk": {
+            "mode": DISTILLED_MODE,
+            "threshold": DISTILLED_BULK_THRESHOLD,
+            "prerank_top": DISTILLED_PRERANK_TOP,
+            "max_mae": DISTILLED_MAX_MAE,
+        },
+    }
 
 # --- Screening Assessment Agent ---
-def screening_assess(job_id: str, candidate_name: str, transcript: str):
+# Skip the LLM when the transcript extractor settles every criterion
+SCREEN_SKIP_LLM = os.getenv("SCREEN_SKIP_LLM", "true").lower() in ("1", "true", "yes")
+
+def screening_facts(job_id: str, transcript: str):
+    """Deterministic per-criterion findings for a call transcript (see transcript_facts)."""
     jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    return transcript_facts.extract(transcript, load_jd_analysis(job_id), jd_text)
+
+def heuristic_screening_assess(job_id: str, candidate_name: str, transcript: str, note: str = ""):
+    """screening_assess result from the transcript extractor alone (ambiguous criteria get neutral points)."""
+    findings = screening_facts(job_id, transcript)
+    result = transcript_facts.to_assessment(findings, note)
+    result["extracted"] = findings
+    update_candidate_status(job_id, candidate_name, "AI Screened", screening_score=result["score"])
+    return result
+
+@llm_metrics.for_job
+def screening_assess(job_id: str, candidate_name: str, transcript: str, on_partial=None):
+    jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    analysis = load_jd_analysis(job_id)
+    jd_facts = jd_analysis.facts_block(analysis)
     cand = _get_candidate_row(job_id, candidate_name)
     score = cand.get("score", 0) if cand else 0
     matches = cand.get("matching_keywords", "") if cand else ""
@@ -1246,95 +1678,91 @@ def screening_assess(job_id: str, candidate_name: str, transcript: str):
                 matches = ", ".join(matches_parsed[:5])
         except:
             pass
-    
-    prompt = f"""
-You are an expert recruitment assessor. Evaluate the candidate based on the JD and the Call Transcript.
-Calculate a 'score' (0-10) using these strict criteria:
-1. Location Match (3 points): Full points if candidate is in the job location or open to relocate. Subtract points for mismatches (e.g. Job is Gurgaon, Candidate is Pune and won't relocate).
-2. Salary & Benefits (2 points): Align expectations with JD budget.
-3. Shift & Availability (2 points): Check if candidate accepts the job's shift (Night/Day/Rotational) and notice period.
-4. Technical/Job Requirements (3 points): Verify if the candidate's responses in the transcript confirm the required tech skills mentioned in JD.
-
-Return JSON:
-{{
-  "assessment": "concise summary of findings",
-  "hire_recommendation": "yes|maybe|no",
-  "score": 0.0,
-  "criteria_breakdown": {{
-     "location": "...",
-     "salary": "...",
-     "shift": "...",
-     "tech": "..."
-  }},
-  "risks": ["list of concerns"],
-  "next_questions": ["questions for next round"]
-}}
-
-JD:
-{jd_text[:2500]}
-
-Candidate Resume Snapshot:
-Initial Score: {score}/10
-Key Keywords: {matches}
-
-Call Transcript:
-{transcript[:4000]}
-"""
+
+    # Location, salary, shift/notice and skill answers are parsed deterministically first
+    findings = transcript_facts.extract(transcript, analysis, jd_text)
+    criteria = findings["criteria"]
+    if findings["conclusive"] and SCREEN_SKIP_LLM:
+        result = transcript_facts.to_assessment(findings)
+        result["extracted"] = findings
+        result["method"] = "deterministic"
+        update_candidate_status(job_id, candidate_name, "AI Screened", screening_score=result["score"])
+        _append_log(job_id, "SCREENING_ASSESSED", f"{candidate_name}: {result['score']}/10 from transcript facts (LLM skipped)")
+        return result
+
+    ambiguous = findings["ambiguous"] or list(criteria)
+    settled = "\n".join(
+        f"- {name} ({c['points']}/{c['max_points']:g}): {c['summary']}"
+        for name, c in criteria.items() if name not in ambiguous
+    ) or "- none"
+    open_items = "\n".join(f"- {name} (max {criteria[name]['max_points']:g} points): {criteria[name]['summary']}" for name in ambiguous)
+    prompt, _ = prompt_templates.render("screening_assess", values={
+        "jd_facts": jd_facts, "settled": settled, "open_items": open_items, "score": score, "matches": matches,
+        "excerpt": transcript_facts.relevant_excerpt(transcript, ambiguous),
+    })
     try:
-        result = llm.call_llm_json(prompt, system="Be concise. JSON only.")
-        if result and "score" in result:
-            update_candidate_status(job_id, candidate_name, "AI Screened", screening_score=result["score"])
+        result = _llm_json(prompt, on_partial=on_partial, system="Be concise. JSON only.", site="screening_assess")
+        judged = result.get("criteria") if isinstance(result, dict) else None
+        if not isinstance(judged, dict):
+            raise llm.LLMError("Assessment response has no criteria")
+        breakdown = {name: c["summary"] for name, c in criteria.items()}
+        total = 0.0
+        for name, c in criteria.items():
+            item = judged.get(name) if name in ambiguous else None
+            if isinstance(item, dict):
+                try:
+                    points = min(max(float(item.get("points", c["points"])), 0.0), c["max_points"])
+                except (TypeError, ValueError):
+                    points = c["points"]
+                breakdown[name] = str(item.get("finding") or c["summary"])
+            else:
+                points = c["points"]
+            total += points
+        total = round(total, 1)
+        risks = [c["summary"] for c in criteria.values() if c["status"] in ("mismatch", "partial")]
+        result = {
+            "assessment": result.get("assessment", ""),
+            "hire_recommendation": result.get("hire_recommendation") or transcript_facts.recommendation(total),
+            "score": total,
+            "criteria_breakdown": breakdown,
+            "risks": risks + list(result.get("risks") or []),
+            "next_questions": list(result.get("next_questions") or []),
+            "extracted": findings,
+            "method": "llm+deterministic",
+        }
+        update_candidate_status(job_id, candidate_name, "AI Screened", screening_score=result["score"])
         return result
     except Exception as e:
-        # Return basic fallback if LLM fails
-        return {
-            "assessment": f"Candidate scored {score}/10. Metadata analysis suggests further review.",
-            "hire_recommendation": "maybe",
-            "score": score,
-            "risks": ["LLM unavailable for detailed assessment"],
-            "next_questions": ["Verify experience", "Confirm availability"]
-        }
+        # LLM unavailable: the deterministic findings still carry a neutral score for the open criteria
+        llm_metrics.record_fallback("screening_assess", e)
+        result = transcript_facts.to_assessment(findings, f"LLM unavailable ({e}); resume score {score}/10.")
+        result["risks"].append("LLM unavailable for detailed assessment")
+        result["extracted"] = findings
+        result["method"] = "heuristic"
+        return result
 
 # --- Offer Draft Agent ---
+@llm_metrics.for_job
 def offer_assist(job_id: str, candidate_name: str, salary: int = None):
     jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    jd_facts = jd_analysis.facts_block(load_jd_analysis(job_id))
     cand = _get_candidate_row(job_id, candidate_name)
     score = cand.get("score")
     matches = cand.get("matching_keywords", "")
-    prompt = f"""
-Draft a concise offer summary. Return JSON:
-{{
-  "summary": "short paragraph",
-  "risks": ["..."],
-  "negotiation_points": ["..."],
-  "salary_recommendation": "..."
-}}
-JD:
-{jd_text[:2500]}
-
-Candidate:
-score: {score}
-matches: {matches}
-target_salary: {salary}
-"""
-    return llm.call_llm_json(prompt, system="Be concise. JSON only.")
+    prompt, _ = prompt_templates.render("offer_assist", [prompt_budget.Block("jd_text", jd_text)],
+                                        values={"jd_facts": jd_facts, "score": score, "matches": matches, "salary": salary})
+    return llm.call_llm_json(prompt, system="Be concise. JSON only.", site="offer_assist")
 
 # --- Slot Suggest Agent ---
+@llm_metrics.for_job
 def suggest_slots(job_id: str, candidate_name: str):
-    prompt = """
-Propose 4 interview slot options in the next 7 days. Return JSON:
-{
-  "slots": [
-    {"day": "Mon", "time": "10:00", "timezone": "local", "note": "..."},
-    ...
-  ]
-}
-Keep concise.
-"""
+    prompt, _ = prompt_templates.render("suggest_slots")
     try:
-        return llm.call_llm_json(prompt, system="Be concise. JSON only.")
+        # Fixed prompt: a cached answer would offer every candidate the same slots
+        return llm.call_llm_json(prompt, system="Be concise. JSON only.", cache=False, site="suggest_slots")
     except Exception as e:
         print(f"Slot suggestion LLM failed: {e}")
+        llm_metrics.record_fallback("suggest_slots", e)
         # Fallback slots
         return {
             "slots": [
@@ -1345,63 +1773,126 @@ Keep concise.
             ]
         }
 
+def _incremental_rescore(job_id, df, csv_path, analysis):
+    """
+    JD-edit fast path for the keyword scorer: apply the token/skill delta between the
+    last scored JD view and the current one to the stored per-resume postings
+    (resume_index) instead of re-reading every resume. Produces the same CSV as a
+    full rescore. Candidates without a resume file are left as they are (as the
+    full rescore does); returns None, so the caller rescores fully, if any other
+    resume is new or changed on disk since it was indexed.
+    """
+    started = time.time()
+    job_dir = _job_dir(job_id)
+    index = resume_index.load_index(job_dir)
+    resumes_dir = os.path.join(job_dir, "resumes")
+    if not len(index) or not os.path.isdir(resumes_dir):
+        return None
+    stamps = {}
+    with os.scandir(resumes_dir) as entries:
+        for entry in entries:
+            st = entry.stat()
+            stamps[entry.name] = f"{st.st_size}:{st.st_mtime_ns}"
+    sem_hashes = semantic.indexed_hashes(job_dir)
+    if not sem_hashes:
+        # No semantic store at all: the full path rebuilds it
+        return None
+    names = df['name'].astype(str).tolist()
+    positions, rows, skipped = [], [], 0
+    for pos, name in enumerate(names):
+        r = index.row_of.get(name)
+        if r is not None and stamps.get(index.files[r]) == index.stamps[r]:
+            # Not embedded (e.g. no extractable text) is fine; an outdated embedding is not
+            if name in sem_hashes and sem_hashes[name] != index.hashes[r]:
+                return None
+            positions.append(pos)
+            rows.append(r)
+        elif any(f.lower().startswith(name.lower()) for f in stamps):
+            # New or replaced resume: needs to be read
+            return None
+        else:
+            skipped += 1
+    if not rows:
+        return None
+
+    jd_view = analysis["keyword_view"]
+    delta = resume_index.apply_jd_delta(job_dir, jd_view, analysis["analysis_hash"], index=index)
+    if delta is None:
+        return None
+
+    jd_count = delta["jd_token_count"]
+    required_exp = delta["required_experience"]
+    # Results go into the score cache too, so a later full rescore of this JD is all hits
+    cache = score_cache.open_cache(job_dir)
+    keyword_version = f"{KEYWORD_SCORER_VERSION}:{taxonomy.taxonomy_version()}"
+    scores = []
+    keywords = []
+    for r in rows:
+        if jd_count:
+            exp = index.exp[r]
+            exp_bonus = _experience_bonus(exp if exp >= 0 else None, required_exp)
+            scores.append(float(_keyword_score(delta["common"][r], jd_count, delta["skill_hits"][r], exp_bonus)))
+        else:
+            scores.append(0.0)
+        keywords.append(delta["keywords"][r])
+        key = score_cache.make_key(index.hashes[r], analysis["analysis_hash"], KEYWORD_SCORER_ID, keyword_version)
+        if cache.get(key) is None:
+            cache.put(key, {"score": scores[-1], "matching_keywords": json.loads(keywords[-1])})
+    cache.save()
+    stats = cache.stats()
+
+    at = df.index[positions]
+    changed = (
+        df.loc[at, 'score'].tolist() != scores
+        or df.loc[at, 'matching_keywords'].tolist() != keywords
+        or KEYWORD_SCORE_COLUMN not in df.columns
+        or df.loc[at, KEYWORD_SCORE_COLUMN].tolist() != scores
+    )
+    df.loc[at, 'score'] = scores
+    df.loc[at, KEYWORD_SCORE_COLUMN] = scores
+    if SCORE_SOURCE_COLUMN in df.columns and (df.loc[at, SCORE_SOURCE_COLUMN] != KEYWORD_SCORER_ID).any():
+        df.loc[at, SCORE_SOURCE_COLUMN] = KEYWORD_SCORER_ID
+        changed = True
+    df.loc[at, 'matching_keywords'] = keywords
+    # Same status rule as the full rescore
+    promote = df.index.isin(at) & df['status'].isin(['New', 'Error (File Missing)', 'Screening'])
+    if promote.any():
+        df.loc[promote, 'status'] = 'Screened'
+        changed = True
+    try:
+        sem_scores = df['name'].astype(str).map(semantic.score_all(job_dir, jd_view["text"]))
+        if 'semantic_score' not in df.columns or not df['semantic_score'].equals(sem_scores):
+            df['semantic_score'] = sem_scores
+            changed = True
+    except Exception as e:
+        _append_log(job_id, "WARN", f"Semantic scoring failed: {e}")
+    if changed:
+        _save_candidates(df, csv_path)
+
+    elapsed_ms = round((time.time() - started) * 1000, 1)
+    _append_log(
+        job_id, "CV_SCORING",
+        f"Incremental rescoring of {len(rows)} candidates: +{delta['tokens_added']}/-{delta['tokens_removed']} JD tokens, "
+        f"+{delta['skills_added']}/-{delta['skills_removed']} skills, {delta['rows_touched']} keyword lists updated ({elapsed_ms} ms)."
+        + (f" {skipped} candidates without a resume file skipped." if skipped else "")
+    )
+    return {
+        **stats,
+        "incremental": True,
+        "rows_touched": delta["rows_touched"],
+        "skipped": skipped,
+        "elapsed_ms": elapsed_ms,
+    }
+
 def trigger_simulation_step(job_id, step_name):
     job_dir = os.path.join(JOBS_DIR, job_id)
     
     if step_name == "score_cvs":
-        # Load JD
-        jd_path = os.path.join(job_dir, "jd.txt")
-        if os.path.exists(jd_path):
-            with open(jd_path, 'r') as f:
-                jd_text = f.read()
-        else:
-            jd_text = ""
-        
-        # Extract key requirements from improved JD format for better scoring
-        # If JD has "Key Requirements:" section, extract skills from it
-        if "Key Requirements:" in jd_text:
-            # Try to get keywords from jd_keywords.json first (most reliable)
-            jd_keywords_path = os.path.join(job_dir, "jd_keywords.json")
-            if os.path.exists(jd_keywords_path):
-                try:
-                    with open(jd_keywords_path, 'r') as f:
-                        jd_keywords = json.load(f)
-                        keywords = jd_keywords.get("must_have_keywords", [])
-                        if keywords:
-                            # Use keywords as primary JD text for scoring
-                            jd_text = " ".join(keywords)
-                            # Also extract skills from bullet points
-                            key_req_match = re.search(r'Key Requirements:\s*(.+?)(?:\n\n|\Z)', jd_text, re.IGNORECASE | re.DOTALL)
-                            if key_req_match:
-                                key_req_text = key_req_match.group(1)
-                                bullet_points = re.findall(r'•\s*(.+?)(?:\n|$)', key_req_text)
-                                # Extract skills from bullet points (remove "Proficiency in" etc.)
-                                skills = []
-                                for bp in bullet_points:
-                                    # Extract skill name from "Proficiency in X" or just "X"
-                                    skill_match = re.search(r'(?:Proficiency in|Experience with|Knowledge of)?\s*([A-Za-z\s]+?)(?:\s*$|\.)', bp, re.IGNORECASE)
-                                    if skill_match:
-                                        skills.append(skill_match.group(1).strip())
-                                if skills:
-                                    jd_text = " ".join(keywords) + " " + " ".join(skills)
-                except:
-                    pass
-            
-            # Fallback: extract from bullet points if keywords not available
-            if not jd_text or len(jd_text) < 20:
-                key_req_match = re.search(r'Key Requirements:\s*(.+?)(?:\n\n|\Z)', jd_text, re.IGNORECASE | re.DOTALL)
-                if key_req_match:
-                    key_req_text = key_req_match.group(1)
-                    bullet_points = re.findall(r'•\s*(.+?)(?:\n|$)', key_req_text)
-                    # Extract skills from bullet points
-                    skills = []
-                    for bp in bullet_points:
-                        # Extract skill/requirement
-                        skill_match = re.search(r'(?:Proficiency in|Experience with|Knowledge of|years? of)?\s*([A-Za-z\s]+?)(?:\s*$|\.)', bp, re.IGNORECASE)
-                        if skill_match:
-                            skills.append(skill_match.group(1).strip())
-                    if skills:
-                        jd_text = " ".join(skills)
+        # JD is parsed once per version (jd_analysis.json); for improved JDs the
+        # keyword view scores against must-have keywords + requirement bullets
+        analysis = load_jd_analysis(job_id)
+        jd_view = analysis["keyword_view"]
+        jd_text = jd_view["text"]
 
         # Process Resumes
         csv_path = os.path.join(job_dir, "cv_scores.csv")
@@ -1410,9 +1901,27 @@ def trigger_simulation_step(job_id, step_name):
             # Ensure matching_keywords column exists
             if 'matching_keywords' not in df.columns:
                 df['matching_keywords'] = ""
+            if KEYWORD_SCORE_COLUMN not in df.columns:
+                df[KEYWORD_SCORE_COLUMN] = None
+            # Resumes unchanged since the last rescore: apply only the JD delta
+            stats = _incremental_rescore(job_id, df, csv_path, analysis)
+            if stats is not None:
+                return _run_configured_scorers(job_id, stats)
             resumes_dir = os.path.join(job_dir, "resumes")
+            resume_files = os.listdir(resumes_dir) if os.path.exists(resumes_dir) else []
+
+            # Unchanged resume + unchanged scoring JD + same scorer version => cache hit, no re-extraction
+            cache = score_cache.open_cache(job_dir)
+            jd_hash = analysis["analysis_hash"]
+            keyword_version = f"{KEYWORD_SCORER_VERSION}:{taxonomy.taxonomy_version()}"
+            indexed = semantic.indexed_hashes(job_dir)
+            token_indexed = resume_index.indexed_hashes(job_dir)
+            highlighted = highlights.stored_hashes(job_dir)
             
             updated = False
+            changed = False
+            embed_items = []
+            index_items = []
             for index, row in df.iterrows():
                 # Allow re-scoring of ANY candidate if the Score Agent is triggered
                 # This fixes the issue where previous dry-runs locked the status
@@ -1421,34 +1930,381 @@ def trigger_simulation_step(job_id, step_name):
                 
                 # Find file (Robust search)
                 found_file = None
-                if os.path.exists(resumes_dir):
-                    for f in os.listdir(resumes_dir):
-                        # Match if filename starts with candidate name (ignoring case/extension differences)
-                        if f.lower().startswith(candidate_name.lower()):
-                            found_file = os.path.join(resumes_dir, f)
-                            break
+                for f in resume_files:
+                    # Match if filename starts with candidate name (ignoring case/extension differences)
+                    if f.lower().startswith(candidate_name.lower()):
+                        found_file = os.path.join(resumes_dir, f)
+                        break
                 
                 if found_file:
-                    cv_text = extract_text(found_file)
-                    # ALWAYS recalculate score - don't skip if score already exists
-                    score = calculate_score(cv_text, jd_text)
-                    matches = get_matching_keywords(cv_text, jd_text)
-                    
-                    # Force update score regardless of existing value
-                    df.at[index, 'score'] = float(score)
-                    df.at[index, 'matching_keywords'] = json.dumps(matches)
+                    resume_hash = score_cache.file_hash(found_file)
+                    key = score_cache.make_key(resume_hash, jd_hash, KEYWORD_SCORER_ID, keyword_version)
+                    cached = cache.get(key)
+                    cv_text = None
+                    if cached is not None:
+                        score = cached["score"]
+                        matches = cached["matching_keywords"]
+                    else:
+                        cv_text = extract_text(found_file)
+                        score = calculate_score(cv_text, jd_text, jd_view=jd_view)
+                        matches = get_matching_keywords(cv_text, jd_text, jd_view=jd_view)
+                        cache.put(key, {"score": float(score), "matching_keywords": matches})
+                        _append_log(job_id, "DEBUG", f"Rescored {candidate_name}: {score}/10 (File: {os.path.basename(found_file)})")
+                    if indexed.get(candidate_name) != resume_hash:
+                        if cv_text is None:
+                            cv_text = extract_text(found_file)
+                        embed_items.append((candidate_name, resume_hash, cv_text))
+                    stale = token_indexed.get(candidate_name) != resume_hash or highlighted.get(candidate_name) != resume_hash
+                    if stale and cv_text is None:
+                        cv_text = extract_text(found_file)
+                    index_items.append((candidate_name, found_file, resume_hash, cv_text))
+
+                    keywords_json = json.dumps(matches)
+                    if row['score'] != float(score) or row['matching_keywords'] != keywords_json or row[KEYWORD_SCORE_COLUMN] != float(score):
+                        df.at[index, 'score'] = float(score)
+                        df.at[index, KEYWORD_SCORE_COLUMN] = float(score)
+                        df.at[index, 'matching_keywords'] = keywords_json
+                        changed = True
+                    if SCORE_SOURCE_COLUMN in df.columns and row[SCORE_SOURCE_COLUMN] != KEYWORD_SCORER_ID:
+                        df.at[index, SCORE_SOURCE_COLUMN] = KEYWORD_SCORER_ID
+                        changed = True
                     # Only update status if it was New/Error, otherwise keep it (e.g. if already Interviewing)
                     if row['status'] in ['New', 'Error (File Missing)', 'Screening']:
                         df.at[index, 'status'] = 'Screened'
+                        changed = True
                         
                     updated = True
-                    _append_log(job_id, "DEBUG", f"Rescored {candidate_name}: {score}/10 (File: {os.path.basename(found_file)})")
                 else:
                     _append_log(job_id, "ERROR", f"Could not find resume file for {candidate_name} in {resumes_dir}")
             
+            stats = cache.stats()
             if updated:
-                df.to_csv(csv_path, index=False)
-                _append_log(job_id, "CV_SCORING", "Executed Real-time Scoring Analysis (Forced Refresh).")
+                # Semantic scorer runs alongside keyword scoring; 'score' stays keyword-based
+                try:
+                    semantic.upsert_resumes(job_dir, embed_items)
+                    sem_scores = df['name'].astype(str).map(semantic.score_all(job_dir, jd_text))
+                    if 'semantic_score' not in df.columns or not df['semantic_score'].equals(sem_scores):
+                        df['semantic_score'] = sem_scores
+                        changed = True
+                except Exception as e:
+                    _append_log(job_id, "WARN", f"Semantic scoring failed: {e}")
+                # Snapshot per-resume postings + keyword results so the next JD edit rescores incrementally
+                try:
+                    resume_index.upsert_resumes(job_dir, index_items)
+                    resume_index.build_state(job_dir, jd_view, analysis["analysis_hash"])
+                except Exception as e:
+                    _append_log(job_id, "WARN", f"Resume token indexing failed: {e}")
+                try:
+                    highlights.upsert(job_dir, index_items)
+                except Exception as e:
+                    _append_log(job_id, "WARN", f"Resume highlight caching failed: {e}")
+                cache.save()
+                if changed:
+                    _save_candidates(df, csv_path)
+                _append_log(job_id, "CV_SCORING", f"Executed Real-time Scoring Analysis (cache hits: {stats['cache_hits']}, misses: {stats['cache_misses']}).")
+            return _run_configured_scorers(job_id, stats)
+    return None
+
+def _run_configured_scorers(job_id, stats):
+    """
+    After the keyword pass: run the job's other configured/shadow scorers,
+    re-apply its primary score, then the job's candidate rules. The keyword and
+    semantic columns were just refreshed.
+    """
+    config = get_scoring_config(job_id)
+    if config != scorers.normalize_config(None):
+        try:
+            result = run_job_scorers(job_id, skip=(KEYWORD_SCORER_ID, SEMANTIC_SCORER_ID))
+            stats = {**stats, "primary": config["primary"], "scorers": result["scorers"], "shadow": result["shadow"]}
+        except Exception as e:
+            _append_log(job_id, "WARN", f"Configured scorers failed: {e}")
+    applied = _auto_apply_rules(job_id)
+    if applied is not None:
+        stats = {**stats, "rules_changed": applied["changed"]}
+    return stats
+
+def semantic_top_matches(job_id: str, k: int = 10):
+    """Approximate top-k candidates for the job's JD from the semantic index."""
+    jd_text = load_job_artifact(job_id, "jd.txt") or ""
+    return semantic.top_k(_job_dir(job_id), jd_text, k=k)
+
+# --- Candidate Rules ---
+def get_candidate_rules(job_id: str):
+    meta = load_job_meta(job_id) or {}
+    try:
+        return rules.normalize_rules(meta.get("rules"))
+    except ValueError:
+        return rules.normalize_rules(None)
+
+def set_candidate_rules(job_id: str, config: dict):
+    """Validate and persist a job's knockout / auto-shortlist rules."""
+    config = rules.normalize_rules(config)
+    meta = load_job_meta(job_id) or {}
+    meta["rules"] = config
+    meta["updated_at"] = datetime.now().isoformat()
+    save_job_meta(job_id, meta)
+    _append_log(job_id, "RULES_UPDATED", f"{len(config['rules'])} rules (auto_apply={config['auto_apply']})")
+    return config
+
+def apply_candidate_rules(job_id: str, dry_run: bool = False, config: dict = None):
+    """
+    Evaluate the job's rules (or a draft config) over all candidates in one pass.
+    dry_run returns the per-rule counts and transitions without touching the CSV;
+    otherwise the transitions go through bulk_update_candidate_status.
+    """
+    config = rules.normalize_rules(config) if config is not None else get_candidate_rules(job_id)
+    df = load_job_artifact(job_id, "cv_scores.csv")
+    if df is None or df.empty or not config["rules"]:
+        return {"dry_run": dry_run, "candidates": 0 if df is None else len(df), "changed": 0, "transitions": {}, "by_status": {}, "rules": []}
+    index = _sync_resume_stores(job_id, df["name"].astype(str).tolist())
+    result = rules.evaluate(config, df, index)
+    transitions = result["transitions"]
+    by_status = {}
+    for status in transitions.values():
+        by_status[status] = by_status.get(status, 0) + 1
+    changed = 0
+    if not dry_run and transitions:
+        changed = bulk_update_candidate_status(job_id, transitions, event="RULES_APPLIED")
+    return {
+        "dry_run": dry_run,
+        "candidates": len(df),
+        "changed": len(transitions) if dry_run else changed,
+        "by_status": by_status,
+        "rules": result["rules"],
+        "transitions": transitions,
+    }
+
+def _auto_apply_rules(job_id: str):
+    """Run after ingest/rescore; never fails the scoring run."""
+    try:
+        config = get_candidate_rules(job_id)
+        if config["rules"] and config["auto_apply"]:
+            return apply_candidate_rules(job_id)
+    except Exception as e:
+        _append_log(job_id, "WARN", f"Candidate rules failed: {e}")
+    return None
+
+# --- Score Distribution ---
+def get_score_sketch(job_id: str):
+    job_dir = _job_dir(job_id)
+    return score_stats.load_sketch(job_dir, os.path.join(job_dir, "cv_scores.csv"))
+
+def score_distribution(job_id: str, bucket: float = 1.0, score: float = None):
+    """Count, mean, quantiles and histogram of a job's scores, from its sketch (no CSV read)."""
+    return get_score_sketch(job_id).summary(bucket=bucket, score=score)
+
+# --- Top-K Shortlist ---
+def top_candidates(job_id: str, k: int = 10, column: str = "score", statuses=None, exclude=None):
+    """Best k candidates by a score column (iterator), from the job's maintained top-K lists; ValueError for an unknown column."""
+    job_dir = _job_dir(job_id)
+    return shortlist.top_k(job_dir, os.path.join(job_dir, "cv_scores.csv"), k, column=column,
+                           statuses=statuses, exclude=exclude)
+
+# --- Skill Facets ---
+def _facet_stamp(job_dir: str) -> str:
+    # The resume index is rewritten whenever a resume is (re)indexed, so its stamp versions the facets
+    return score_stats.csv_stamp(os.path.join(resume_index._store_dir(job_dir), resume_index.INDEX_FILENAME)) or ""
+
+def get_facet_store(job_id: str):
+    """The job's skill bitsets, rebuilt from the resume index only when it changed."""
+    job_dir = _job_dir(job_id)
+    store = facets.load(job_dir, _facet_stamp(job_dir))
+    if store is not None:
+        return store
+    df = load_job_artifact(job_id, "cv_scores.csv")
+    names = df["name"].astype(str).tolist() if df is not None and not df.empty else []
+    index = _sync_resume_stores(job_id, names)
+    return facets.build(job_dir, index.names, index, _facet_stamp(job_dir))
+
+def skill_facets(job_id: str, all_skills=None, any_skills=None, none_skills=None, limit: int = 50, include_candidates: int = 0):
+    """Skill counts over the job's candidates, optionally within an AND / OR / NOT skill filter."""
+    store = get_facet_store(job_id)
+    analysis = load_job_artifact(job_id, jd_analysis.JD_ANALYSIS_FILENAME) or {}
+    return facets.query(
+        store,
+        all_skills=facets.resolve_skills(all_skills),
+        any_skills=facets.resolve_skills(any_skills),
+        none_skills=facets.resolve_skills(none_skills),
+        limit=limit,
+        jd_skills=analysis.get("skills") or [],
+        include_candidates=include_candidates,
+    )
+
+# --- Resume Highlights ---
+def resume_highlights(job_id: str, candidate_name: str, context: int = None, limit: int = None, full: bool = False):
+    """
+    Pre-highlighted snippets of a candidate's resume for the job's current JD, from the
+    text and offsets stored at scoring time. A candidate never scored is extracted
+    once here and stored. None if the candidate has no resume file.
+    """
+    job_dir = _job_dir(job_id)
+    record = highlights.load(job_dir, candidate_name)
+    if record is None:
+        path = get_resume_path(job_id, candidate_name)
+        if not path:
+            return None
+        highlights.upsert(job_dir, [(candidate_name, path, score_cache.file_hash(path), extract_text(path) or "")])
+        record = highlights.load(job_dir, candidate_name)
+        if record is None:
+            return None
+    jd_view = load_jd_analysis(job_id)["keyword_view"]
+    return highlights.render(
+        record,
+        jd_view["match_tokens"],
+        jd_view["skills"],
+        context=highlights.SNIPPET_CONTEXT if context is None else context,
+        limit=highlights.MAX_SNIPPETS if limit is None else limit,
+        full=full,
+    )
+
+# --- Cross-Requisition Matching ---
+MATCH_TOP_ALTERNATIVES = int(os.getenv("MATCH_TOP_ALTERNATIVES", "3"))
+MATCH_MIN_SCORE = float(os.getenv("MATCH_MIN_SCORE", "5.0"))
+ALTERNATIVE_MATCHES_FILENAME = "alternative_matches.json"
+
+def _sync_resume_stores(job_id: str, names):
+    """
+    Index and embed candidates the resume index / semantic store do not know yet
+    (jobs created before they existed, or never rescored). Returns the resume index.
+    """
+    job_dir = _job_dir(job_id)
+    index = resume_index.load_index(job_dir)
+    embedded = semantic.indexed_hashes(job_dir)
+    missing = [n for n in names if n not in index.row_of or n not in embedded]
+    if missing:
+        index_items, embed_items = [], []
+        for name, path in _resume_paths(job_id, missing).items():
+            resume_hash = score_cache.file_hash(path)
+            text = extract_text(path)
+            index_items.append((name, path, resume_hash, text))
+            embed_items.append((name, resume_hash, text))
+        if index_items:
+            resume_index.upsert_resumes(job_dir, index_items)
+            semantic.upsert_resumes(job_dir, embed_items)
+            index = resume_index.load_index(job_dir)
+    return index
+
+def build_match_matrix(top: int = None, min_score: float = None):
+    """
+    Score every resume of every open (non-archived) job against every open JD with the
+    keyword scorer, computed from the per-job resume indexes (one count-matrix product per
+    job, no resume is re-read), and persist each candidate's best alternative requisitions
+    in the job's alternative_matches.json. Jobs the candidate already applied to (same
+    resume content) are never suggested. Semantic similarity breaks ties.
+    """
+    top = MATCH_TOP_ALTERNATIVES if top is None else top
+    min_score = MATCH_MIN_SCORE if min_score is None else min_score
+    started = time.time()
+    jobs = [j for j in get_all_jobs() if not j.get("archived")]
+
+    # Target JDs (columns of the matrix)
+    targets, views = [], []
+    for job in jobs:
+        try:
+            view = load_jd_analysis(job["id"])["keyword_view"]
+        except Exception:
+            continue
+        if view["tokens"]:
+            targets.append(job)
+            views.append(view)
+    col_of = {job["id"]: j for j, job in enumerate(targets)}
+    if not targets:
+        return {"jobs": 0, "candidates": 0, "with_alternatives": 0, "elapsed_s": 0.0}
+    token_lists = [v["tokens"] for v in views]
+    skill_lists = [v["skills"] for v in views]
+    jd_counts = [len(t) for t in token_lists]
+    required = [v["required_experience"] for v in views]
+    jd_vectors = np.stack([semantic.embed_text(v["text"]) for v in views])
+
+    # Source candidates (rows): one resume index per job, CSV decides who is still a candidate
+    sources = []
+    applied = {}
+    for job in jobs:
+        df = load_job_artifact(job["id"], "cv_scores.csv")
+        if df is None or df.empty:
+            continue
+        names = df["name"].astype(str).tolist()
+        index = _sync_resume_stores(job["id"], names)
+        rows = [index.row_of[n] for n in names if n in index.row_of]
+        if not rows:
+            continue
+        sources.append((job, index, rows))
+        for r in rows:
+            applied.setdefault(index.hashes[r], set()).add(job["id"])
+
+    candidates = 0
+    with_alternatives = 0
+    for job, index, rows in sources:
+        rows = np.asarray(rows, dtype=np.int64)
+        common = index.count_matrix(token_lists, resume_index.WORD_PREFIX)[rows]
+        skills = index.count_matrix(skill_lists, resume_index.SKILL_PREFIX)[rows]
+        exp = np.asarray(index.exp, dtype=np.int64)[rows]
+        scores = _keyword_score_array(common, jd_counts, skills, exp, required)
+
+        sem = np.zeros_like(scores)
+        sem_index, vectors, _ = semantic.load_vectors(_job_dir(job["id"]))
+        if vectors is not None:
+            sem_row = {n: i for i, n in enumerate(sem_index["names"])}
+            have = [(k, sem_row[index.names[r]]) for k, r in enumerate(rows.tolist()) if index.names[r] in sem_row]
+            if have:
+                at, vec_rows = zip(*have)
+                sem[list(at)] = semantic.cosine_to_score(np.asarray(vectors[list(vec_rows)]) @ jd_vectors.T)
+
+        # Never suggest the candidate's own requisition(s)
+        rank = scores + sem / 100.0
+        own_col = col_of.get(job["id"])
+        for k, r in enumerate(rows.tolist()):
+            for other in applied.get(index.hashes[r], ()):
+                if other in col_of:
+                    rank[k, col_of[other]] = -np.inf
+        rank[scores < min_score] = -np.inf
+
+        matches = {}
+        kth = min(top, len(targets))
+        if kth > 0:
+            best = np.argpartition(-rank, kth - 1, axis=1)[:, :kth]
+            for k, r in enumerate(rows.tolist()):
+                cols = sorted(best[k].tolist(), key=lambda c: -rank[k, c])
+                alts = [{
+                    "job_id": targets[c]["id"],
+                    "title": targets[c]["title"],
+                    "score": float(scores[k, c]),
+                    "semantic_score": float(sem[k, c]),
+                } for c in cols if np.isfinite(rank[k, c])]
+                if alts:
+                    matches[index.names[r]] = {
+                        "current_score": float(scores[k, own_col]) if own_col is not None else None,
+                        "alternatives": alts,
+                    }
+        candidates += len(rows)
+        with_alternatives += len(matches)
+        # Compact json.dumps: the indented artifact writer is several times slower at 100k candidates
+        payload = json.dumps({
+            "created_at": datetime.now().isoformat(),
+            "jobs_compared": len(targets),
+            "min_score": min_score,
+            "matches": matches,
+        })
+        with open(os.path.join(_job_dir(job["id"]), ALTERNATIVE_MATCHES_FILENAME), "w") as f:
+            f.write(payload)
+        _append_log(job["id"], "MATCH_MATRIX", f"{len(matches)}/{len(rows)} candidates match another open requisition (min score {min_score})")
+
+    return {
+        "jobs": len(targets),
+        "candidates": candidates,
+        "with_alternatives": with_alternatives,
+        "elapsed_s": round(time.time() - started, 2),
+    }
+
+def get_alternative_matches(job_id: str, candidate_name: str = None):
+    """Persisted alternative requisitions for a job's candidates (or one candidate)."""
+    data = load_job_artifact(job_id, ALTERNATIVE_MATCHES_FILENAME)
+    if not isinstance(data, dict):
+        return {"created_at": None, "matches": {}}
+    if candidate_name is not None:
+        match = data.get("matches", {}).get(candidate_name)
+        data = {**data, "matches": {candidate_name: match} if match else {}}
+    return data
 
 def schedule_interview(job_id, candidate_name, date, time, interviewer):
     payload_file = "schedule_payload.json"
@@ -1614,7 +2470,7 @@ def conduct_agent_call(job_id, candidate_name):
         if not idx.empty:
             df.loc[idx, 'status'] = "AI Screened"
             df.loc[idx, 'screening_score'] = final_screen_score
-            df.to_csv(csv_path, index=False)
+            _save_candidates(df, csv_path)
     
     _append_log(job_id, "AI_CALL_COMPLETED", f"Agent called {candidate_name}. Score: {final_screen_score}")
     
@@ -241,8 +241,11 @@ elif st.session_state['job_id']:
         with c_tool_3:
             st.write("") # Spacer
             if st.button("🤖 Auto-Score All"):
-                utils.trigger_simulation_step(job_id, "score_cvs")
-                st.success("Analysis Complete")
+                stats = utils.trigger_simulation_step(job_id, "score_cvs")
+                if stats:
+                    st.success(f"Analysis Complete ({stats['cache_hits']} cached, {stats['cache_misses']} rescored)")
+                else:
+                    st.success("Analysis Complete")
                 st.rerun()
 
         # --- Data Loading ---
@@ -272,6 +275,7 @@ elif st.session_state['job_id']:
                         "score": st.column_config.ProgressColumn("Fit Score", min_value=0, max_value=10, format="%.1f"),
                         "status": st.column_config.SelectboxColumn("Status", width="medium", options=["New", "Screened", "Shortlisted", "Interview Scheduled", "Offer Pending", "Rejected"]),
                         "name": st.column_config.TextColumn("Candidate Name", width="large"),
+                        "matching_keywords": None,
                         "id": None
                     },
                     use_container_width=True,
@@ -338,15 +342,19 @@ elif st.session_state['job_id']:
                         resume_path = utils.get_resume_path(job_id, cand_name)
                         if resume_path:
                             try:
-                                cv_text = utils.extract_text(resume_path)
-                                jd_text = utils.load_job_artifact(job_id, "jd.txt") or ""
-                                matches = utils.get_matching_keywords(cv_text, jd_text)
+                                # Keywords + offsets were stored at scoring time: no PDF parsing per rerun
+                                stored = head.get('matching_keywords')
+                                keywords = json.loads(stored) if isinstance(stored, str) and stored.strip() else None
+                                hl = utils.get_resume_highlights(job_id, cand_name, keywords)
+                                matches = hl["matched_keywords"] if hl else []
                                 
                                 if matches:
                                     # Vibrant Tags
                                     html_tags = "".join([f"<span class='badge' style='background:linear-gradient(90deg, #4338ca 0%, #6366f1 100%); color:white; margin:3px; padding:5px 10px; border-radius:15px;'>{m}</span> " for m in matches[:15]])
                                     if len(matches) > 15: html_tags += f"... (+{len(matches)-15})"
                                     st.markdown(html_tags, unsafe_allow_html=True)
+                                    for snippet in hl["snippets"][:3]:
+                                        st.markdown(f"<div style='font-size:0.85rem; color:#ccc; margin:6px 0;'>{snippet['html']}</div>", unsafe_allow_html=True)
                                 else:
                                     st.warning("No specific keyword matches found.")
                             except:
@@ -4,7 +4,14 @@ import shutil
 import pandas as pd
 from datetime import datetime
 
+# Resume highlight records (text + match offsets) share the backend's format
+from backend import highlights
+from backend import score_cache
+
 JOBS_DIR = "jobs"
+# Score cache entries for the dashboard's keyword heuristic (its own stop words, so its own id)
+DASHBOARD_SCORER_ID = "dashboard_keyword"
+DASHBOARD_SCORER_VERSION = "1"
 
 # --- CORE UTILS ---
 
@@ -263,6 +270,27 @@ def get_resume_path(job_id, candidate_name):
                 return os.path.join(resumes_dir, f)
     return None
 
+def get_resume_highlights(job_id, candidate_name, keywords=None):
+    """
+    Matched keywords and highlighted snippets from the record stored at scoring time.
+    keywords: the candidate's matching_keywords; a candidate not scored since the
+    file changed is extracted once here (and stored). None if the resume is missing.
+    """
+    job_dir = os.path.join(JOBS_DIR, job_id)
+    record = highlights.load(job_dir, candidate_name)
+    if record is None:
+        resume_path = get_resume_path(job_id, candidate_name)
+        if not resume_path:
+            return None
+        highlights.upsert(job_dir, [(candidate_name, resume_path, score_cache.file_hash(resume_path), extract_text(resume_path))])
+        record = highlights.load(job_dir, candidate_name)
+        if record is None:
+            return None
+        keywords = None
+    if keywords is None:
+        keywords = sorted(get_matching_keywords(record["text"], load_job_artifact(job_id, "jd.txt") or ""))
+    return highlights.render(record, keywords)
+
 def get_matching_keywords(resume_text, jd_text):
     STOP_WORDS = {
         "and", "the", "for", "with", "you", "that", "this", "are", "will", "can", "have", 
@@ -299,9 +327,17 @@ def trigger_simulation_step(job_id, step_name):
         csv_path = os.path.join(job_dir, "cv_scores.csv")
         if os.path.exists(csv_path):
             df = pd.read_csv(csv_path)
+            if 'matching_keywords' not in df.columns:
+                df['matching_keywords'] = ""
             resumes_dir = os.path.join(job_dir, "resumes")
             
+            # Unchanged resume + unchanged JD + same scorer version => cache hit, no re-extraction
+            cache = score_cache.open_cache(job_dir)
+            jd_hash = score_cache.text_hash(jd_text)
+            highlighted = highlights.stored_hashes(job_dir)
+
             updated = False
+            highlight_items = []
             for index, row in df.iterrows():
                 # Allow re-scoring of ANY candidate if the Score Agent is triggered
                 # This fixes the issue where previous dry-runs locked the status
@@ -318,10 +354,25 @@ def trigger_simulation_step(job_id, step_name):
                             break
                 
                 if found_file:
-                    cv_text = extract_text(found_file)
-                    score = calculate_score(cv_text, jd_text)
+                    resume_hash = score_cache.file_hash(found_file)
+                    key = score_cache.make_key(resume_hash, jd_hash, DASHBOARD_SCORER_ID, DASHBOARD_SCORER_VERSION)
+                    cached = cache.get(key)
+                    cv_text = None
+                    if cached is not None:
+                        score = cached["score"]
+                        matches = cached["matching_keywords"]
+                    else:
+                        cv_text = extract_text(found_file)
+                        score = calculate_score(cv_text, jd_text)
+                        matches = sorted(get_matching_keywords(cv_text, jd_text))
+                        cache.put(key, {"score": float(score), "matching_keywords": matches})
+                    if highlighted.get(candidate_name) != resume_hash and cv_text is None:
+                        cv_text = extract_text(found_file)
                     
                     df.at[index, 'score'] = score
+                    # Stored for the detail pane: keywords here, text + offsets in the highlight record
+                    df.at[index, 'matching_keywords'] = json.dumps(matches)
+                    highlight_items.append((candidate_name, found_file, resume_hash, cv_text))
                     # Only update status if it was New/Error, otherwise keep it (e.g. if already Interviewing)
                     if row['status'] in ['New', 'Error (File Missing)', 'Screening']:
                         df.at[index, 'status'] = 'Screened'
@@ -331,9 +382,17 @@ def trigger_simulation_step(job_id, step_name):
                 else:
                     _append_log(job_id, "ERROR", f"Could not find resume file for {candidate_name} in {resumes_dir}")
             
+            stats = cache.stats()
             if updated:
                 df.to_csv(csv_path, index=False)
-                _append_log(job_id, "CV_SCORING", "Executed Real-time Scoring Analysis (Forced Refresh).")
+                try:
+                    highlights.upsert(job_dir, highlight_items)
+                except Exception as e:
+                    _append_log(job_id, "WARN", f"Resume highlight caching failed: {e}")
+                cache.save()
+                _append_log(job_id, "CV_SCORING", f"Executed Real-time Scoring Analysis (cache hits: {stats['cache_hits']}, misses: {stats['cache_misses']}).")
+            return stats
+    return None
 
 def schedule_interview(job_id, candidate_name, date, time, interviewer):
     # Append to schedule payload